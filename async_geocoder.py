@@ -0,0 +1,161 @@
+import asyncio
+import random
+import time
+import aiohttp
+from http_resilience import (RETRY_STATUSES, THROTTLE_STATUSES, AsyncAIMDLimiter, CircuitBreaker,
+                             backoff_delay, retry_after_seconds)
+
+NOMINATIM_REVERSE_URL = "https://nominatim.openstreetmap.org/reverse"
+USER_AGENT = 'Makassar_UMKM_Cleaner/1.0'
+
+class TokenBucket:
+    """
+    Rate limiter global (token bucket) yang dipakai bersama oleh semua request yang sedang berjalan
+    """
+
+    def __init__(self, rate_per_second, capacity=None):
+        self.rate = float(rate_per_second)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate_per_second))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """
+        Tunggu sampai satu token tersedia
+        """
+        while True:
+            async with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            await asyncio.sleep(wait)
+
+async def reverse_geocode_async(session, bucket, limiter, breaker, lat, lng, classify,
+                                base_url=NOMINATIM_REVERSE_URL, max_retries=3, timeout=15):
+    """
+    Reverse geocode satu titik lewat session bersama (koneksi keep-alive).
+    classify(json) mengembalikan (is_makassar, location_info) atau None jika respons tidak lengkap.
+    limiter (AsyncAIMDLimiter) dan breaker (CircuitBreaker) dipakai bersama semua request,
+    dengan aturan yang sama seperti ResilientSession.
+    """
+    params = {'format': 'json', 'lat': lat, 'lon': lng, 'zoom': 10, 'addressdetails': 1}
+
+    for attempt in range(max_retries):
+        # Breaker terbuka: tunggu sampai reset_timeout, tidak dihitung sebagai percobaan
+        while not breaker.allow():
+            await asyncio.sleep(breaker.retry_in())
+
+        await limiter.acquire()
+        delay = None
+        try:
+            await bucket.acquire()
+            async with session.get(base_url, params=params,
+                                   timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                if response.status not in RETRY_STATUSES:
+                    limiter.on_success()
+                    breaker.record_success()
+                else:
+                    if response.status in THROTTLE_STATUSES:
+                        limiter.on_throttle()
+                    breaker.record_failure()
+
+                if response.status == 200:
+                    result = classify(await response.json(content_type=None))
+                    if result is not None:
+                        return result
+                else:
+                    print(f"Geocoding attempt {attempt + 1} failed for {lat},{lng}: HTTP {response.status}")
+                    delay = retry_after_seconds(response.headers)
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            limiter.on_throttle()
+            breaker.record_failure()
+            print(f"Geocoding attempt {attempt + 1} failed for {lat},{lng}: {e!r}")
+        finally:
+            limiter.release()
+
+        # Retry-After dari server jika ada, selain itu backoff eksponensial dengan jitter;
+        # rate global tetap diatur oleh bucket. Tidak perlu menunggu setelah percobaan terakhir.
+        if attempt < max_retries - 1:
+            await asyncio.sleep(delay if delay is not None else backoff_delay(attempt, cap=30.0))
+
+    return None, "Geocoding failed"
+
+async def geocode_points_async(points, classify, on_result=None, base_url=NOMINATIM_REVERSE_URL,
+                               concurrency=10, rate_per_second=1.0, max_retries=3, timeout=15):
+    """
+    Reverse geocode banyak titik dengan `concurrency` worker coroutine, satu connection
+    pool keep-alive, satu token bucket global, dan AIMD + circuit breaker bersama:
+    `concurrency` hanya batas atas, jumlah request paralel menyesuaikan respons server.
+    points: iterable (key, lat, lng). on_result(key, is_makassar, location_info) dipanggil
+    setiap hasil selesai. Mengembalikan dict key -> (is_makassar, location_info).
+    """
+    bucket = TokenBucket(rate_per_second)
+    limiter = AsyncAIMDLimiter(initial=min(2, concurrency), maximum=concurrency)
+    breaker = CircuitBreaker(failure_threshold=10, reset_timeout=60.0)
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    results = {}
+
+    connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=60, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector, headers={'User-Agent': USER_AGENT}) as session:
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    queue.task_done()
+                    return
+                key, lat, lng = item
+                try:
+                    results[key] = await reverse_geocode_async(
+                        session, bucket, limiter, breaker, lat, lng, classify, base_url, max_retries, timeout)
+                except Exception as e:
+                    print(f"Error processing row: {e!r}")
+                    results[key] = (None, "Geocoding failed")
+                if on_result is not None:
+                    on_result(key, *results[key])
+                queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+
+        # Antrian terbatas: titik diumpankan sedikit demi sedikit, bukan dibuat task semua sekaligus
+        for point in points:
+            await queue.put(point)
+        for _ in workers:
+            await queue.put(None)
+
+        await asyncio.gather(*workers)
+
+    print(f"Concurrency geocoding akhir (AIMD): {int(limiter.limit)}")
+    return results
+
+def geocode_points(points, classify, **kwargs):
+    """
+    Versi sinkron dari geocode_points_async
+    """
+    return asyncio.run(geocode_points_async(points, classify, **kwargs))
+
+def benchmark_geocoder(base_url, n_points=500, concurrency=32, rate_per_second=1000.0):
+    """
+    Ukur throughput engine terhadap server stub lokal (mis. http://127.0.0.1:8080/reverse)
+    """
+    points = [(i, -5.15 + random.uniform(-0.05, 0.05), 119.43 + random.uniform(-0.05, 0.05))
+              for i in range(n_points)]
+
+    start_time = time.time()
+    results = geocode_points(points, lambda data: (True, 'stub'), base_url=base_url,
+                             concurrency=concurrency, rate_per_second=rate_per_second)
+    elapsed = time.time() - start_time
+
+    failed = sum(1 for is_makassar, _ in results.values() if is_makassar is None)
+    print(f"{n_points} request dalam {elapsed:.2f} detik - {n_points / elapsed:.1f} req/s "
+          f"(concurrency={concurrency}, rate={rate_per_second}/s, gagal={failed})")
+    return n_points / elapsed
@@ -1,12 +1,70 @@
 import pandas as pd
-import ast
-import requests
+import numpy as np
+import os
+import glob
+import json
 import time
+import sqlite3
+import shapely
 from shapely.geometry import Point, Polygon
 import geopandas as gpd
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import threading
-from functools import partial
+from functools import partial, lru_cache
+from scipy.spatial import cKDTree
+from itertools import islice
+import requests
+from lokasi_parser import parse_lokasi_column, format_lokasi
+from async_geocoder import geocode_points, USER_AGENT
+from http_resilience import ResilientSession, AIMDLimiter, CircuitBreaker, UpstreamUnavailable, backoff_delay
+from columnar_io import is_columnar_path, read_columnar, write_columnar, dataframe_to_table
+
+# True: bersihkan hanya delta dari ingestion incremental megi4 lalu gabungkan
+# ke data bersih sebelumnya, bukan seluruh kuliner_makassar_osm.csv
+DELTA_MODE = False
+
+# Mode cleaning: "full" (reverse geocoding untuk semua data) atau "hybrid" (polygon +
+# reverse geocoding hanya dekat garis batas). Polygon create_makassar_boundary masih kasar
+# (belum mencakup Manggala/Biringkanaya/Tamalanrea timur), jadi default tetap "full".
+CLEANING_MODE = "full"
+
+# Lebar band di sekitar garis batas Makassar yang tetap dicek ke Nominatim
+BOUNDARY_BAND_METERS = 500
+
+# Bounding box Makassar (min_lat, min_lng, max_lat, max_lng), sama dengan megi4.
+# Mode hybrid hanya menolak lokal titik di luar bbox ini; titik di luar polygon
+# tapi masih di dalam bbox tetap dicek ke Nominatim
+MAKASSAR_BBOX = (-5.28, 119.35, -5.05, 119.55)
+
+# Endpoint reverse geocoding (bisa diarahkan ke server Nominatim sendiri atau stub lokal)
+NOMINATIM_REVERSE_URL = "https://nominatim.openstreetmap.org/reverse"
+
+# Engine geocoding: "threads" (ThreadPoolExecutor), "async" (asyncio + connection pool)
+# atau "offline" (batas kabupaten/kota lokal, tanpa jaringan)
+GEOCODER_ENGINE = "async"
+
+# Batas kabupaten/kota (GeoJSON/shapefile) untuk reverse geocoder offline
+ADMIN_BOUNDARIES_FILE = "C:/Users/ASUS/OneDrive/Documents/Skripsi_Megi/skripsi_baru/batas_kabupaten_kota_sulsel.geojson"
+ADMIN_NAME_FIELDS = ('WADMKK', 'NAMOBJ', 'NAME_2', 'kabupaten', 'kab_kota', 'name')
+
+# Batas atas request paralel engine threads; jumlah sebenarnya menyesuaikan respons server (AIMD)
+NOMINATIM_MAX_CONCURRENCY = 10
+
+# Batas request per detik untuk engine async, dibagi bersama semua request.
+# Server publik Nominatim mengizinkan 1 req/s; naikkan untuk server sendiri.
+GEOCODE_RATE_PER_SECOND = 1.0
+
+# Cache reverse geocoding persisten (SQLite)
+GEOCODE_CACHE_DB = "C:/Users/ASUS/OneDrive/Documents/Skripsi_Megi/skripsi_baru/geocode_cache.sqlite"
+
+# Titik unclear diberi label dari tetangga terkonfirmasi terdekat: minimal
+# UNCLEAR_MIN_NEIGHBORS dari UNCLEAR_NEIGHBORS tetangga dalam radius ini harus sepakat
+UNCLEAR_NEIGHBORS = 5
+UNCLEAR_MIN_NEIGHBORS = 3
+UNCLEAR_MAX_DISTANCE_METERS = 250
+
+# Journal JSONL hasil geocoding per baris, untuk melanjutkan run yang terputus
+GEOCODE_JOURNAL = "C:/Users/ASUS/OneDrive/Documents/Skripsi_Megi/skripsi_baru/geocode_journal.jsonl"
 
 def load_data(file_path):
     """
@@ -14,7 +72,11 @@ def load_data(file_path):
     """
     print("Loading data from CSV...")
     try:
-        data = pd.read_csv(file_path)
+        if is_columnar_path(file_path):
+            # Parquet/Arrow: Lat/Lng sudah bertipe float64, tidak perlu parse Lokasi
+            data = read_columnar(file_path)
+        else:
+            data = pd.read_csv(file_path)
         print(f"Data loaded: {len(data)} records")
         
         # Check data kosong
@@ -35,10 +97,12 @@ def load_data(file_path):
         # Remove rows with critical empty data
         initial_count = len(data)
                                                           
-        # Remove rows with empty Nama or Lokasi
-        data = data.dropna(subset=['Nama', 'Lokasi'])
+        # Remove rows with empty Nama or Lokasi (Lat/Lng untuk data kolumnar)
+        location_columns = ['Lokasi'] if 'Lokasi' in data.columns else ['Lat', 'Lng']
+        data = data.dropna(subset=['Nama'] + location_columns)
         data = data[data['Nama'].str.strip() != '']
-        data = data[data['Lokasi'].str.strip() != '']
+        if 'Lokasi' in data.columns:
+            data = data[data['Lokasi'].str.strip() != '']
         
         after_cleaning = len(data)
         removed = initial_count - after_cleaning
@@ -60,30 +124,37 @@ def extract_coordinates(data):
     print("Extracting coordinates...")
     
     initial_count = len(data)
-    valid_coords = []
     
-    for idx, row in data.iterrows():
-        try:
-            # Parse lokasi string
-            lokasi_dict = ast.literal_eval(row['Lokasi'])
-            lat = lokasi_dict['lat']
-            lng = lokasi_dict['lng']
-            
-            # Validate coordinates range
-            if -90 <= lat <= 90 and -180 <= lng <= 180:
-                valid_coords.append(idx)
-            else:
-                print(f"Invalid coordinates for {row['Nama']}: lat={lat}, lng={lng}")
-                
-        except Exception as e:
-            print(f"Error parsing coordinates for {row['Nama']}: {e}")
+    if 'Lat' in data.columns and 'Lng' in data.columns:
+        # Data kolumnar: koordinat sudah numerik, cukup validasi range
+        valid = data['Lat'].between(-90, 90) & data['Lng'].between(-180, 180)
+        for _, row in data[~valid].iterrows():
+            print(f"Invalid coordinates for {row['Nama']}: lat={row['Lat']}, lng={row['Lng']}")
+        data = data[valid].copy()
+        
+        removed = initial_count - len(data)
+        if removed > 0:
+            print(f"Removed {removed} rows with invalid coordinates")
+        
+        print(f"Coordinates extracted for {len(data)} records")
+        return data
     
-    # Keep only valid coordinates
-    data = data.loc[valid_coords].copy()
+    # Parse seluruh kolom Lokasi sekaligus (satu pass, tanpa literal_eval per baris)
+    parsed = parse_lokasi_column(data['Lokasi'])
+    
+    # Laporkan hanya baris yang tidak valid
+    invalid = parsed[~parsed['Valid']]
+    for idx, row in invalid.iterrows():
+        name = data.at[idx, 'Nama']
+        if row['Error'] == "coordinates out of range":
+            print(f"Invalid coordinates for {name}: lat={row['Lat']}, lng={row['Lng']}")
+        else:
+            print(f"Error parsing coordinates for {name}: {row['Error']}")
     
-    # Extract coordinates
-    data['Lat'] = data['Lokasi'].apply(lambda x: ast.literal_eval(x)['lat'])
-    data['Lng'] = data['Lokasi'].apply(lambda x: ast.literal_eval(x)['lng'])
+    # Keep only valid coordinates
+    data = data[parsed['Valid'].to_numpy()].copy()
+    data['Lat'] = parsed['Lat'].to_numpy()[parsed['Valid'].to_numpy()]
+    data['Lng'] = parsed['Lng'].to_numpy()[parsed['Valid'].to_numpy()]
     
     removed = initial_count - len(data)
     if removed > 0:
@@ -92,10 +163,12 @@ def extract_coordinates(data):
     print(f"Coordinates extracted for {len(data)} records")
     return data
 
+@lru_cache(maxsize=None)
 def create_makassar_boundary():
     """
     Definisi batas administratif Kota Makassar yang lebih akurat
     Menggunakan polygon boundaries yang lebih detail
+    (dibuat sekali, pemanggilan berikutnya memakai polygon yang sama)
     """
     print("Creating Makassar city boundary...")
     
@@ -145,6 +218,94 @@ def create_makassar_boundary():
     print("Makassar boundary created")
     return makassar_polygon
 
+@lru_cache(maxsize=None)
+def create_gowa_boundary():
+    """
+    Perkiraan kasar Kabupaten Gowa: hanya area yang pasti di luar Kota Makassar
+    (selatan polygon Makassar, dan timur Manggala/Biringkanaya). Celah antara polygon
+    ini dan polygon Makassar sengaja tidak diberi label.
+    """
+    gowa_coords = [
+        (119.380, -5.240),
+        (119.560, -5.240),
+        (119.560, -5.150),
+        (119.800, -5.150),
+        (119.800, -5.350),
+        (119.740, -5.460),
+        (119.560, -5.460),
+        (119.420, -5.340),
+    ]
+    return Polygon(gowa_coords)
+
+@lru_cache(maxsize=None)
+def create_maros_boundary():
+    """
+    Perkiraan kasar Kabupaten Maros: hanya area yang pasti di luar Kota Makassar
+    (utara Untia dan timur Biringkanaya). Celah antara polygon ini dan polygon
+    Makassar sengaja tidak diberi label.
+    """
+    maros_coords = [
+        (119.400, -5.000),
+        (119.560, -5.000),
+        (119.560, -5.150),
+        (119.800, -5.150),
+        (119.800, -4.860),
+        (119.760, -4.750),
+        (119.520, -4.780),
+        (119.450, -4.950),
+    ]
+    return Polygon(maros_coords)
+
+def build_boundary_engine(boundaries=None):
+    """
+    Siapkan boundary sebagai prepared geometry beserta bbox-nya, sekali saja.
+    boundaries: dict nama -> Polygon; urutan menentukan prioritas jika overlap.
+    Default: Makassar, Gowa, Maros.
+    """
+    if boundaries is None:
+        boundaries = {
+            'Makassar': create_makassar_boundary(),
+            'Gowa': create_gowa_boundary(),
+            'Maros': create_maros_boundary(),
+        }
+    
+    engine = []
+    for name, polygon in boundaries.items():
+        shapely.prepare(polygon)
+        engine.append({'name': name, 'polygon': polygon, 'bounds': polygon.bounds})
+    
+    return engine
+
+def points_in_boundary(boundary, lats, lngs):
+    """
+    Mask titik yang berada di dalam satu boundary: tes bbox dulu,
+    lalu contains_xy vectorized hanya untuk kandidat di dalam bbox
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    min_lng, min_lat, max_lng, max_lat = boundary['bounds']
+    
+    inside = (lngs >= min_lng) & (lngs <= max_lng) & (lats >= min_lat) & (lats <= max_lat)
+    candidates = np.flatnonzero(inside)
+    inside[candidates] = shapely.contains_xy(boundary['polygon'], lngs[candidates], lats[candidates])
+    
+    return inside
+
+def label_points(engine, lats, lngs):
+    """
+    Label setiap titik dengan nama boundary pertama yang memuatnya (None jika tidak ada)
+    dalam satu pass per boundary
+    """
+    labels = np.full(len(lats), None, dtype=object)
+    unlabeled = np.ones(len(lats), dtype=bool)
+    
+    for boundary in engine:
+        inside = unlabeled & points_in_boundary(boundary, lats, lngs)
+        labels[inside] = boundary['name']
+        unlabeled &= ~inside
+    
+    return labels
+
 def check_location_validity(lat, lng, boundary_polygon):
     """
     Check apakah koordinat berada dalam batas Kota Makassar
@@ -158,17 +319,12 @@ def filter_by_boundary(data, boundary_polygon):
     """
     print("Filtering data by Makassar boundary...")
     
-    # Tambah kolom validasi
-    data['In_Makassar'] = data.apply(
-        lambda row: check_location_validity(row['Lat'], row['Lng'], boundary_polygon), 
-        axis=1
-    )
+    # Tambah kolom validasi (vectorized, prepared geometry)
+    engine = build_boundary_engine({'Makassar': boundary_polygon})
+    in_makassar = points_in_boundary(engine[0], data['Lat'].to_numpy(), data['Lng'].to_numpy())
     
     # Filter data yang berada di dalam Makassar
-    filtered_data = data[data['In_Makassar'] == True].copy()
-    
-    # Hapus kolom temporary
-    filtered_data = filtered_data.drop('In_Makassar', axis=1)
+    filtered_data = data[in_makassar].copy()
     
     print(f"Data sebelum filtering: {len(data)} records")
     print(f"Data setelah filtering: {len(filtered_data)} records")
@@ -176,100 +332,409 @@ def filter_by_boundary(data, boundary_polygon):
     
     return filtered_data
 
-def reverse_geocode_check(lat, lng, max_retries=3):
+def label_by_boundaries(data, engine=None):
+    """
+    Tambah kolom Boundary (Makassar/Gowa/Maros/None) untuk setiap titik dalam satu pass.
+    Polygon kasar: hanya untuk laporan, bukan untuk memutuskan data dihapus.
+    """
+    if engine is None:
+        engine = build_boundary_engine()
+    
+    data = data.copy()
+    data['Boundary'] = label_points(engine, data['Lat'].to_numpy(), data['Lng'].to_numpy())
+    
+    print("Distribusi titik per boundary:")
+    for name, count in data['Boundary'].fillna('Tidak terpetakan').value_counts().items():
+        print(f"  {name}: {count} tempat")
+    
+    return data
+
+def classify_nominatim_response(data):
+    """
+    Klasifikasi respons JSON Nominatim menjadi (is_makassar, location_info),
+    atau None jika respons tidak berisi alamat
+    """
+    if 'address' not in data:
+        return None
+    
+    address = data['address']
+    
+    # Check berbagai level administratif
+    city = address.get('city', '').lower()
+    county = address.get('county', '').lower()
+    state = address.get('state', '').lower()
+    municipality = address.get('municipality', '').lower()
+    city_district = address.get('city_district', '').lower()
+    suburb = address.get('suburb', '').lower()
+    
+    # Gabungkan semua informasi lokasi
+    location_text = f"{city} {county} {state} {municipality} {city_district} {suburb}".lower()
+    
+    # Check apakah benar-benar di Kota Makassar
+    if 'makassar' in location_text and 'kota' in location_text:
+        return True, f"Kota Makassar"
+    elif 'makassar' in city or city == 'makassar':
+        return True, f"Kota Makassar"
+    else:
+        return False, detect_outside_location(location_text)
+
+def detect_outside_location(location_text):
+    """
+    Nama wilayah di luar Kota Makassar berdasarkan teks lokasi (lowercase)
+    """
+    # Bukan Kota Makassar - bisa Gowa, Maros, Takalar, dll
+    if 'gowa' in location_text:
+        return "Kabupaten Gowa"
+    elif 'maros' in location_text:
+        return "Kabupaten Maros"
+    elif 'takalar' in location_text:
+        return "Kabupaten Takalar"
+    elif 'bantaeng' in location_text:
+        return "Kabupaten Bantaeng"
+    elif 'jeneponto' in location_text:
+        return "Kabupaten Jeneponto"
+    elif 'pangkep' in location_text or 'pangkajene' in location_text:
+        return "Kabupaten Pangkep"
+    elif 'barru' in location_text:
+        return "Kabupaten Barru"
+    elif 'bone' in location_text:
+        return "Kabupaten Bone"
+    elif 'pare' in location_text and 'pare' in location_text:
+        return "Kota Parepare"
+    else:
+        return f"Area lain: {location_text.strip()}"
+
+@lru_cache(maxsize=None)
+def load_admin_boundaries(path=ADMIN_BOUNDARIES_FILE, name_fields=ADMIN_NAME_FIELDS):
+    """
+    Load batas kabupaten/kota dari GeoJSON/shapefile lokal (sekali saja) dan bangun spatial index
+    """
+    print(f"Loading batas administratif dari {path}...")
+    admin = gpd.read_file(path)
+    
+    if admin.crs is not None and admin.crs.to_epsg() != 4326:
+        admin = admin.to_crs(epsg=4326)
+    
+    name_field = next((field for field in name_fields if field in admin.columns), None)
+    if name_field is None:
+        raise ValueError(f"Kolom nama wilayah tidak ditemukan (dicari: {', '.join(name_fields)})")
+    
+    admin = admin[[name_field, 'geometry']].rename(columns={name_field: 'admin_name'})
+    admin = admin[admin.geometry.notna()].reset_index(drop=True)
+    admin.sindex  # bangun spatial index sekarang, bukan saat query pertama
+    
+    print(f"Batas administratif dimuat: {len(admin)} wilayah")
+    return admin
+
+def classify_admin_name(admin_name):
+    """
+    Ubah nama kabupaten/kota menjadi (is_makassar, location_info) seperti reverse_geocode_check
+    """
+    location_text = str(admin_name).lower()
+    if 'makassar' in location_text:
+        return True, "Kota Makassar"
+    return False, detect_outside_location(location_text)
+
+def offline_reverse_geocode_batch(lats, lngs, admin=None):
+    """
+    Reverse geocoding offline untuk array koordinat: spatial join titik ke polygon
+    kabupaten/kota. Mengembalikan list (is_makassar, location_info); titik di luar
+    semua polygon (mis. di laut) menjadi (None, "Di luar batas administratif").
+    """
+    if admin is None:
+        admin = load_admin_boundaries()
+    
+    points = gpd.GeoDataFrame(geometry=gpd.points_from_xy(lngs, lats), crs="EPSG:4326")
+    joined = gpd.sjoin(points, admin, how='left', predicate='intersects')
+    
+    # Titik tepat di perbatasan bisa cocok dengan dua polygon; ambil yang pertama
+    admin_names = joined[~joined.index.duplicated(keep='first')]['admin_name'].reindex(points.index)
+    
+    # Klasifikasi hanya sekali per nama wilayah, bukan per titik
+    classified = {name: classify_admin_name(name) for name in admin_names.dropna().unique()}
+    outside_all = (None, "Di luar batas administratif")
+    
+    return [classified.get(name, outside_all) if isinstance(name, str) else outside_all
+            for name in admin_names.to_numpy()]
+
+def offline_reverse_geocode(lat, lng, admin=None):
+    """
+    Versi satu titik: mengembalikan tuple (is_makassar, location_info) yang sama
+    dengan reverse_geocode_check, tanpa akses jaringan
+    """
+    return offline_reverse_geocode_batch([lat], [lng], admin)[0]
+
+# Session bersama semua thread: concurrency adaptif, Retry-After, backoff berjitter, circuit breaker
+NOMINATIM_SESSION = ResilientSession(
+    "Nominatim",
+    limiter=AIMDLimiter(initial=2, maximum=NOMINATIM_MAX_CONCURRENCY),
+    breaker=CircuitBreaker(failure_threshold=10, reset_timeout=60.0),
+    max_retries=3, base_delay=1.0, max_delay=30.0,
+    headers={'User-Agent': USER_AGENT})
+
+def reverse_geocode_check(lat, lng, max_retries=3, base_url=NOMINATIM_REVERSE_URL):
     """
     Double check menggunakan reverse geocoding
     untuk memastikan alamat benar-benar di Kota Makassar
     """
+    params = {'format': 'json', 'lat': lat, 'lon': lng, 'zoom': 10, 'addressdetails': 1}
+    
     for attempt in range(max_retries):
         try:
-            # Menggunakan Nominatim API
-            url = f"https://nominatim.openstreetmap.org/reverse?format=json&lat={lat}&lon={lng}&zoom=10&addressdetails=1"
-            
-            headers = {
-                'User-Agent': 'Makassar_UMKM_Cleaner/1.0'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=15)
+            # Retry 429/5xx/timeout ditangani NOMINATIM_SESSION
+            response = NOMINATIM_SESSION.get(base_url, params=params, timeout=15,
+                                             max_retries=max_retries)
+        except (UpstreamUnavailable, requests.RequestException) as e:
+            print(f"Geocoding failed for {lat},{lng}: {e}")
+            break
+        
+        if response.status_code == 200:
+            try:
+                result = classify_nominatim_response(response.json())
+            except ValueError:
+                result = None
+            if result is not None:
+                return result
+            error = "respons tanpa alamat"
+        else:
+            error = f"HTTP {response.status_code}"
+        
+        # Respons 200 tanpa alamat (atau 4xx) dicoba ulang dengan backoff, sama seperti
+        # mode async; tidak perlu menunggu setelah percobaan terakhir
+        print(f"Geocoding attempt {attempt + 1} failed for {lat},{lng}: {error}")
+        if attempt < max_retries - 1:
+            time.sleep(backoff_delay(attempt, cap=30.0))
+    
+    return None, "Geocoding failed"
+
+class GeocodeCache:
+    """
+    Cache reverse geocoding di SQLite, dengan key koordinat yang dibulatkan.
+    Menyimpan hasil klasifikasi (is_makassar, location_info), dengan TTL dan
+    batas jumlah entry (entry yang paling lama tidak diakses dibuang dulu).
+    Update last_access saat hit dikumpulkan dan ditulis per batch lewat flush().
+    """
+    
+    def __init__(self, db_path=GEOCODE_CACHE_DB, precision=4, ttl_days=90, max_entries=200000,
+                 touch_batch_size=5000):
+        self.precision = precision
+        self.ttl_seconds = ttl_days * 86400 if ttl_days else None
+        self.max_entries = max_entries
+        self.touch_batch_size = touch_batch_size
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # (last_access, coord_key) yang belum ditulis ke SQLite
+        self.touched = []
+        
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocode_cache (
+                coord_key TEXT PRIMARY KEY,
+                is_makassar INTEGER NOT NULL,
+                location_info TEXT,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_geocode_last_access ON geocode_cache (last_access)")
+        self.conn.commit()
+    
+    def key(self, lat, lng):
+        """
+        Key cache: koordinat dibulatkan ke `precision` desimal (4 desimal ~ 11 m)
+        """
+        return f"{round(float(lat), self.precision):.{self.precision}f},{round(float(lng), self.precision):.{self.precision}f}"
+    
+    def get(self, lat, lng):
+        """
+        Ambil hasil (is_makassar, location_info) dari cache, atau None jika miss/kedaluwarsa
+        """
+        coord_key = self.key(lat, lng)
+        now = time.time()
+        
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT is_makassar, location_info, created_at FROM geocode_cache WHERE coord_key = ?",
+                (coord_key,)).fetchone()
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                if 'address' in data:
-                    address = data['address']
-                    
-                    # Check berbagai level administratif
-                    city = address.get('city', '').lower()
-                    county = address.get('county', '').lower()
-                    state = address.get('state', '').lower()
-                    municipality = address.get('municipality', '').lower()
-                    city_district = address.get('city_district', '').lower()
-                    suburb = address.get('suburb', '').lower()
-                    
-                    # Gabungkan semua informasi lokasi
-                    location_text = f"{city} {county} {state} {municipality} {city_district} {suburb}".lower()
-                    
-                    # Check apakah benar-benar di Kota Makassar
-                    if 'makassar' in location_text and 'kota' in location_text:
-                        return True, f"Kota Makassar"
-                    elif 'makassar' in city or city == 'makassar':
-                        return True, f"Kota Makassar"
-                    else:
-                        # Bukan Kota Makassar - bisa Gowa, Maros, Takalar, dll
-                        detected_location = ""
-                        if 'gowa' in location_text:
-                            detected_location = "Kabupaten Gowa"
-                        elif 'maros' in location_text:
-                            detected_location = "Kabupaten Maros"
-                        elif 'takalar' in location_text:
-                            detected_location = "Kabupaten Takalar"
-                        elif 'bantaeng' in location_text:
-                            detected_location = "Kabupaten Bantaeng"
-                        elif 'jeneponto' in location_text:
-                            detected_location = "Kabupaten Jeneponto"
-                        elif 'pangkep' in location_text or 'pangkajene' in location_text:
-                            detected_location = "Kabupaten Pangkep"
-                        elif 'barru' in location_text:
-                            detected_location = "Kabupaten Barru"
-                        elif 'bone' in location_text:
-                            detected_location = "Kabupaten Bone"
-                        elif 'pare' in location_text and 'pare' in location_text:
-                            detected_location = "Kota Parepare"
-                        else:
-                            detected_location = f"Area lain: {location_text.strip()}"
-                        
-                        return False, detected_location
+            if row is None or (self.ttl_seconds and now - row[2] > self.ttl_seconds):
+                self.misses += 1
+                return None
             
-            # Rate limiting dengan jitter untuk parallelization
-            time.sleep(1 + (attempt * 0.5))
+            self.touched.append((now, coord_key))
+            self.hits += 1
+            if len(self.touched) >= self.touch_batch_size:
+                self._flush_touched()
+        
+        return bool(row[0]), row[1]
+    
+    def _flush_touched(self):
+        # Dipanggil dengan self.lock sudah dipegang
+        if self.touched:
+            self.conn.executemany(
+                "UPDATE geocode_cache SET last_access = ? WHERE coord_key = ?", self.touched)
+            self.conn.commit()
+            self.touched = []
+    
+    def flush(self):
+        """
+        Tulis semua update last_access yang tertunda dengan satu transaksi
+        """
+        with self.lock:
+            self._flush_touched()
+    
+    def put(self, lat, lng, is_makassar, location_info):
+        """
+        Simpan hasil klasifikasi; hasil gagal (is_makassar None) tidak di-cache
+        """
+        if is_makassar is None:
+            return
+        
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO geocode_cache "
+                "(coord_key, is_makassar, location_info, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (self.key(lat, lng), int(bool(is_makassar)), location_info, now, now))
+            self.conn.commit()
+    
+    def evict(self):
+        """
+        Buang entry kedaluwarsa, lalu entry paling lama tidak diakses jika melebihi max_entries
+        """
+        with self.lock:
+            if self.ttl_seconds:
+                self.conn.execute(
+                    "DELETE FROM geocode_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
             
-        except Exception as e:
-            print(f"Geocoding attempt {attempt + 1} failed for {lat},{lng}: {e}")
-            time.sleep(2 + attempt)
+            if self.max_entries:
+                count, = self.conn.execute("SELECT COUNT(*) FROM geocode_cache").fetchone()
+                if count > self.max_entries:
+                    self.conn.execute(
+                        "DELETE FROM geocode_cache WHERE coord_key IN ("
+                        "SELECT coord_key FROM geocode_cache ORDER BY last_access ASC LIMIT ?)",
+                        (count - self.max_entries,))
+            self.conn.commit()
     
-    return None, "Geocoding failed"
+    def close(self):
+        # last_access harus tersimpan dulu agar eviction memakai urutan akses terbaru
+        self.flush()
+        self.evict()
+        self.conn.close()
 
 def process_single_row(row_data):
     """
-    Process single row for parallel geocoding
+    Process single row for parallel geocoding.
+    row_data: tuple ringan (idx, name, lat, lng), bukan pandas Series
     """
-    idx, row = row_data
-    is_makassar, location_info = reverse_geocode_check(row['Lat'], row['Lng'])
+    idx, name, lat, lng = row_data
+    is_makassar, location_info = reverse_geocode_check(lat, lng)
     
     return {
         'idx': idx,
-        'name': row['Nama'],
+        'name': name,
+        'lat': lat,
+        'lng': lng,
         'is_makassar': is_makassar,
         'location_info': location_info
     }
 
-def full_parallel_cleaning(data, max_workers=10):
+def iter_geocode_rows(data):
+    """
+    Generator tuple (idx, name, lat, lng) per baris tanpa membuat Series per baris
+    """
+    names = data['Nama'] if 'Nama' in data.columns else pd.Series('', index=data.index)
+    return zip(data.index, names, data['Lat'], data['Lng'])
+
+def load_geocode_journal(journal_path):
+    """
+    Baca journal JSONL hasil run sebelumnya yang terputus.
+    Mengembalikan dict idx -> (lat, lng, is_makassar, location_info); hasil gagal
+    tidak dimuat agar dicoba ulang. Baris terakhir yang terpotong (crash saat menulis) diabaikan.
+    """
+    journaled = {}
+    if not journal_path or not os.path.exists(journal_path):
+        return journaled
+    
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if entry.get('is_makassar') is None:
+                continue
+            journaled[entry['idx']] = (entry['lat'], entry['lng'], entry['is_makassar'], entry['location_info'])
+    
+    return journaled
+
+def label_unclear_by_neighbors(data, confirmed_makassar, confirmed_outside, unclear,
+                               k=UNCLEAR_NEIGHBORS, max_distance_meters=UNCLEAR_MAX_DISTANCE_METERS,
+                               min_neighbors=UNCLEAR_MIN_NEIGHBORS):
+    """
+    Beri label titik unclear dari tetangga terdekat yang sudah terkonfirmasi (KD-tree,
+    proyeksi equirectangular lokal dalam meter). Titik diberi label hanya jika minimal
+    min_neighbors tetangga dalam max_distance_meters dan semuanya sepakat.
+    Mengembalikan (inside, outside, ambiguous) berupa list index.
+    """
+    confirmed = list(confirmed_makassar) + list(confirmed_outside)
+    if not unclear or not confirmed:
+        return [], [], list(unclear)
+    
+    confirmed_inside = np.zeros(len(confirmed), dtype=bool)
+    confirmed_inside[:len(confirmed_makassar)] = True
+    
+    lat_scale = 110540.0
+    lng_scale = 111320.0 * np.cos(np.radians(data['Lat'].mean()))
+    scale = np.array([lat_scale, lng_scale])
+    
+    reference = data.loc[confirmed, ['Lat', 'Lng']].to_numpy(dtype=np.float64) * scale
+    query = data.loc[unclear, ['Lat', 'Lng']].to_numpy(dtype=np.float64) * scale
+    
+    tree = cKDTree(reference)
+    k = min(k, len(confirmed))
+    distances, neighbors = tree.query(query, k=k, distance_upper_bound=max_distance_meters)
+    distances = distances.reshape(len(unclear), k)
+    neighbors = neighbors.reshape(len(unclear), k)
+    
+    # Tetangga di luar radius dikembalikan dengan jarak inf dan index len(reference)
+    found = np.isfinite(distances)
+    neighbor_inside = confirmed_inside[np.where(found, neighbors, 0)] & found
+    n_found = found.sum(axis=1)
+    n_inside = neighbor_inside.sum(axis=1)
+    
+    enough = n_found >= min_neighbors
+    all_inside = enough & (n_inside == n_found)
+    all_outside = enough & (n_inside == 0)
+    
+    unclear = np.asarray(unclear, dtype=object)
+    return list(unclear[all_inside]), list(unclear[all_outside]), list(unclear[~(all_inside | all_outside)])
+
+def full_parallel_cleaning(data, max_workers=10, cache=None, engine=None, journal_path=None,
+                           max_in_flight=None):
     """
     Parallel reverse geocoding untuk SEMUA data tanpa boundary filter
-    Langsung proses semua data dengan parallelization
+    Langsung proses semua data dengan parallelization.
+    Jika cache diberikan, hasil dijawab dari cache dulu dan hanya miss yang dikirim ke Nominatim.
+    engine: "threads" (ThreadPoolExecutor + requests) atau "async" (asyncio, connection
+    pool keep-alive, rate limiter global); default GEOCODER_ENGINE.
+    Setiap hasil ditulis ke journal JSONL (default GEOCODE_JOURNAL) begitu selesai; jika
+    proses mati, run berikutnya melewati baris yang sudah ada di journal. Journal dihapus
+    setelah semua baris selesai. Mode threads hanya menahan max_in_flight future sekaligus.
+    Hasil unclear diberi label dari tetangga terkonfirmasi (label_unclear_by_neighbors);
+    hanya yang tetap ambigu di-geocode ulang.
     """
+    engine = engine or GEOCODER_ENGINE
+    if engine == "offline":
+        return offline_cleaning(data)
+    
+    journal_path = journal_path or GEOCODE_JOURNAL
+    max_in_flight = max_in_flight or max_workers * 4
+    
     print(f"\nMemulai parallel geocoding untuk SEMUA {len(data)} data...")
-    print(f"Menggunakan {max_workers} workers parallel")
+    print(f"Menggunakan {max_workers} workers parallel ({engine})")
     print("Estimasi waktu: 3-5 menit\n")
     
     confirmed_makassar = []
@@ -280,59 +745,204 @@ def full_parallel_cleaning(data, max_workers=10):
     # Lock untuk thread-safe operations
     results_lock = threading.Lock()
     
-    # Prepare data for parallel processing
-    row_data = [(idx, row) for idx, row in data.iterrows()]
+    def record_result(idx, name, is_makassar, location_info):
+        if is_makassar == True:
+            confirmed_makassar.append(idx)
+        elif is_makassar == False:
+            confirmed_outside.append(idx)
+            print(f"  OUTSIDE: {name} -> {location_info}")
+            
+            # Track location statistics (thread-safe)
+            with results_lock:
+                if location_info in outside_locations:
+                    outside_locations[location_info] += 1
+                else:
+                    outside_locations[location_info] = 1
+        else:
+            unclear.append(idx)
+    
+    # Lanjutkan run yang terputus: baris yang sudah di-journal (dengan koordinat sama) dilewati
+    journaled = load_geocode_journal(journal_path)
+    resumed = set()
+    if journaled:
+        for idx, name, lat, lng in iter_geocode_rows(data):
+            entry = journaled.get(str(idx))
+            if entry is not None and entry[0] == float(lat) and entry[1] == float(lng):
+                record_result(idx, name, entry[2], entry[3])
+                resumed.add(idx)
+        print(f"Melanjutkan dari journal {journal_path}: {len(resumed)} data sudah selesai\n")
+    
+    # Tetap iterator: baris dibaca sedikit demi sedikit oleh jendela geocoding
+    row_data = ((idx, name, lat, lng) for idx, name, lat, lng in iter_geocode_rows(data)
+                if idx not in resumed)
+    
+    # Titik dengan key cache yang sama cukup di-geocode sekali
+    duplicates = {}
+    
+    def coalesce_with_cache(rows):
+        duplicates.clear()
+        misses = []
+        hits = 0
+        for idx, name, lat, lng in rows:
+            cached = cache.get(lat, lng)
+            if cached is not None:
+                record_result(idx, name, *cached)
+                hits += 1
+                continue
+            
+            coord_key = cache.key(lat, lng)
+            if coord_key in duplicates:
+                duplicates[coord_key].append((idx, name, lat, lng))
+            else:
+                duplicates[coord_key] = []
+                misses.append((idx, name, lat, lng))
+        cache.flush()
+        
+        duplicate_count = sum(len(rows) for rows in duplicates.values())
+        print(f"Cache geocoding: {hits} hit, "
+              f"{len(misses)} request ke Nominatim, {duplicate_count} titik berbagi hasil request\n")
+        return misses
+    
+    if cache is not None:
+        row_data = coalesce_with_cache(row_data)
+        total = len(row_data)
+    else:
+        total = len(data) - len(resumed)
     
     # Progress tracking
     completed = 0
-    total = len(row_data)
     start_time = time.time()
     
-    # Parallel processing
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks
-        future_to_data = {executor.submit(process_single_row, rd): rd for rd in row_data}
+    journal = open(journal_path, 'a', encoding='utf-8')
+    
+    def write_journal(idx, lat, lng, is_makassar, location_info):
+        journal.write(json.dumps({
+            'idx': str(idx),
+            'lat': float(lat),
+            'lng': float(lng),
+            'is_makassar': is_makassar,
+            'location_info': location_info
+        }) + "\n")
+    
+    def handle_result(result):
+        nonlocal completed
+        with results_lock:
+            completed += 1
+            
+            # Progress update setiap 25 data atau milestone
+            if completed % 25 == 0 or completed == total:
+                elapsed = time.time() - start_time
+                rate = completed / elapsed if elapsed > 0 else 0
+                eta = (total - completed) / rate if rate > 0 else 0
+                print(f"Progress: {completed}/{total} ({completed/total*100:.1f}%) - Rate: {rate:.1f}/s - ETA: {eta:.0f}s")
         
-        # Collect results as they complete
-        for future in as_completed(future_to_data):
-            try:
-                result = future.result()
-                
-                with results_lock:
-                    completed += 1
-                    
-                    # Progress update setiap 25 data atau milestone
-                    if completed % 25 == 0 or completed == total:
-                        elapsed = time.time() - start_time
-                        rate = completed / elapsed if elapsed > 0 else 0
-                        eta = (total - completed) / rate if rate > 0 else 0
-                        print(f"Progress: {completed}/{total} ({completed/total*100:.1f}%) - Rate: {rate:.1f}/s - ETA: {eta:.0f}s")
-                
-                idx = result['idx']
-                name = result['name']
-                is_makassar = result['is_makassar']
-                location_info = result['location_info']
+        is_makassar = result['is_makassar']
+        location_info = result['location_info']
+        record_result(result['idx'], result['name'], is_makassar, location_info)
+        
+        with results_lock:
+            write_journal(result['idx'], result['lat'], result['lng'], is_makassar, location_info)
+            
+            shared = []
+            if cache is not None:
+                cache.put(result['lat'], result['lng'], is_makassar, location_info)
+                shared = duplicates.get(cache.key(result['lat'], result['lng']), [])
+            for idx, name, lat, lng in shared:
+                write_journal(idx, lat, lng, is_makassar, location_info)
+            
+            # Flush per hasil: crash hanya kehilangan request yang sedang berjalan
+            journal.flush()
+        
+        for idx, name, lat, lng in shared:
+            record_result(idx, name, is_makassar, location_info)
+    
+    def geocode_rows(rows):
+        # Setiap hasil lewat handle_result: dicatat, di-journal dan di-cache
+        if engine == "async":
+            # Hanya baris yang sedang diproses yang disimpan
+            rows_by_idx = {}
+            
+            def iter_points():
+                for idx, name, lat, lng in rows:
+                    rows_by_idx[idx] = (name, lat, lng)
+                    yield idx, lat, lng
+            
+            def on_async_result(idx, is_makassar, location_info):
+                name, lat, lng = rows_by_idx.pop(idx)
+                handle_result({
+                    'idx': idx,
+                    'name': name,
+                    'lat': lat,
+                    'lng': lng,
+                    'is_makassar': is_makassar,
+                    'location_info': location_info
+                })
+            
+            geocode_points(
+                iter_points(), classify_nominatim_response, on_result=on_async_result,
+                base_url=NOMINATIM_REVERSE_URL, concurrency=max_workers,
+                rate_per_second=GEOCODE_RATE_PER_SECOND)
+        else:
+            # Parallel processing dengan jendela future terbatas (bukan submit semua sekaligus)
+            rows = iter(rows)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                in_flight = {executor.submit(process_single_row, rd): rd for rd in islice(rows, max_in_flight)}
                 
-                if is_makassar == True:
-                    confirmed_makassar.append(idx)
-                elif is_makassar == False:
-                    confirmed_outside.append(idx)
-                    print(f"  OUTSIDE: {name} -> {location_info}")
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        idx, name, lat, lng = in_flight.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            # Baris (dan duplikatnya) tetap tercatat sebagai unclear, tidak hilang
+                            print(f"Error processing row: {e}")
+                            result = {
+                                'idx': idx,
+                                'name': name,
+                                'lat': lat,
+                                'lng': lng,
+                                'is_makassar': None,
+                                'location_info': "Geocoding failed"
+                            }
+                        handle_result(result)
                     
-                    # Track location statistics (thread-safe)
-                    with results_lock:
-                        if location_info in outside_locations:
-                            outside_locations[location_info] += 1
-                        else:
-                            outside_locations[location_info] = 1
-                else:
-                    unclear.append(idx)
-                    
-            except Exception as e:
-                print(f"Error processing row: {e}")
+                    for rd in islice(rows, len(done)):
+                        in_flight[executor.submit(process_single_row, rd)] = rd
+    
+    try:
+        geocode_rows(row_data)
+        
+        # Unclear tidak langsung dibuang: label dari tetangga terkonfirmasi terdekat
+        if unclear:
+            inside, outside, ambiguous = label_unclear_by_neighbors(
+                data, confirmed_makassar, confirmed_outside, unclear)
+            print(f"\nUnclear diberi label dari tetangga terdekat: {len(inside)} di Makassar, "
+                  f"{len(outside)} di luar Makassar, {len(ambiguous)} tetap ambigu")
+            confirmed_makassar.extend(inside)
+            confirmed_outside.extend(outside)
+            unclear = []
+            
+            # Hanya titik yang benar-benar ambigu yang di-geocode ulang, tetap lewat journal
+            # agar geocoding ulang juga bisa dilanjutkan jika proses mati
+            if ambiguous:
+                print(f"Geocoding ulang {len(ambiguous)} titik ambigu...")
+                retry_rows = list(iter_geocode_rows(data.loc[ambiguous]))
+                if cache is not None:
+                    retry_rows = coalesce_with_cache(retry_rows)
+                completed = 0
+                total = len(retry_rows)
+                geocode_rows(retry_rows)
+    finally:
+        journal.close()
+    
+    # Semua baris selesai (termasuk geocoding ulang): journal tidak diperlukan lagi untuk resume
+    os.remove(journal_path)
     
     total_time = time.time() - start_time
     print(f"\nParallel processing completed in {total_time:.1f} seconds")
+    if engine == "threads":
+        print(f"Concurrency Nominatim akhir (AIMD): {int(NOMINATIM_SESSION.limiter.limit)}")
     
     print(f"\nHasil parallel geocoding:")
     print(f"Confirmed Kota Makassar: {len(confirmed_makassar)}")
@@ -359,6 +969,113 @@ def full_parallel_cleaning(data, max_workers=10):
     
     return data
 
+def offline_cleaning(data, admin=None):
+    """
+    Cleaning dengan reverse geocoder offline (batas kabupaten/kota lokal), tanpa Nominatim
+    """
+    print(f"\nMemulai reverse geocoding offline untuk {len(data)} data...")
+    start_time = time.time()
+    
+    results = offline_reverse_geocode_batch(data['Lat'].to_numpy(), data['Lng'].to_numpy(), admin)
+    is_makassar = pd.Series([result[0] for result in results], index=data.index, dtype=object)
+    location_info = pd.Series([result[1] for result in results], index=data.index)
+    
+    confirmed_outside = data.index[is_makassar == False]
+    unclear = data.index[is_makassar.isna()]
+    
+    total_time = time.time() - start_time
+    print(f"Reverse geocoding offline selesai dalam {total_time:.1f} detik "
+          f"({len(data) / max(total_time, 1e-9):.0f} titik/detik)")
+    
+    print(f"\nHasil reverse geocoding offline:")
+    print(f"Confirmed Kota Makassar: {(is_makassar == True).sum()}")
+    print(f"Confirmed di luar Kota Makassar: {len(confirmed_outside)}")
+    print(f"Unclear/Failed: {len(unclear)}")
+    
+    outside_locations = location_info[confirmed_outside].value_counts()
+    if len(outside_locations) > 0:
+        print(f"\nDistribusi lokasi di luar Kota Makassar:")
+        for location, count in outside_locations.items():
+            print(f"  {location}: {count} tempat")
+    
+    # Aturan penghapusan sama dengan full_parallel_cleaning
+    if len(confirmed_outside) > 0:
+        print(f"\nMenghapus {len(confirmed_outside)} data yang terdeteksi di luar Kota Makassar...")
+        data_clean = data.drop(confirmed_outside).copy()
+        
+        if len(unclear) > 0:
+            print(f"Menghapus {len(unclear)} data yang unclear untuk keamanan...")
+            data_clean = data_clean.drop(unclear, errors='ignore').copy()
+        
+        return data_clean
+    
+    return data
+
+def distance_to_boundary_meters(boundary_polygon, lats, lngs):
+    """
+    Jarak (meter) setiap titik ke garis batas polygon, dengan proyeksi
+    equirectangular lokal (cukup akurat untuk skala satu kota)
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    
+    min_lng, min_lat, max_lng, max_lat = boundary_polygon.bounds
+    lng_scale = 111320.0 * np.cos(np.radians((min_lat + max_lat) / 2))
+    lat_scale = 110540.0
+    
+    boundary_line = shapely.transform(
+        boundary_polygon.boundary, lambda coords: coords * np.array([lng_scale, lat_scale]))
+    points = shapely.points(lngs * lng_scale, lats * lat_scale)
+    
+    return shapely.distance(points, boundary_line)
+
+def classify_by_boundary_band(data, boundary_polygon, band_meters=500, bbox=MAKASSAR_BBOX):
+    """
+    Klasifikasi lokal berdasarkan polygon: titik yang jelas di dalam polygon (lebih jauh
+    dari band_meters dari garis batas) dikonfirmasi, titik di luar bbox Makassar ditolak.
+    Sisanya (dekat garis batas, atau di luar polygon tapi dalam bbox) perlu reverse geocoding.
+    Mengembalikan mask (inside, outside, border).
+    """
+    lats = data['Lat'].to_numpy()
+    lngs = data['Lng'].to_numpy()
+    
+    engine = build_boundary_engine({'Makassar': boundary_polygon})
+    in_polygon = points_in_boundary(engine[0], lats, lngs)
+    near_border = distance_to_boundary_meters(boundary_polygon, lats, lngs) <= band_meters
+    
+    min_lat, min_lng, max_lat, max_lng = bbox
+    in_bbox = (lats >= min_lat) & (lats <= max_lat) & (lngs >= min_lng) & (lngs <= max_lng)
+    
+    inside = in_polygon & ~near_border
+    outside = ~in_polygon & ~near_border & ~in_bbox
+    return inside, outside, ~inside & ~outside
+
+def hybrid_boundary_cleaning(data, boundary_polygon, band_meters=500, max_workers=10, cache=None):
+    """
+    Titik jelas di dalam polygon dikonfirmasi lokal, titik di luar bbox Makassar ditolak lokal,
+    dan sisanya (sekitar garis batas atau di luar polygon kasar) dikirim ke reverse_geocode_check
+    """
+    print(f"\nKlasifikasi lokal dengan boundary band {band_meters} m...")
+    inside, outside, border = classify_by_boundary_band(data, boundary_polygon, band_meters)
+    
+    print(f"Jelas di dalam Kota Makassar (lokal): {inside.sum()}")
+    print(f"Jelas di luar Kota Makassar (lokal): {outside.sum()}")
+    print(f"Dekat garis batas / di luar polygon dalam bbox (perlu geocoding): {border.sum()}")
+    
+    border_data = data[border]
+    if len(border_data) > 0:
+        cleaned_border = full_parallel_cleaning(border_data, max_workers=max_workers, cache=cache)
+    else:
+        cleaned_border = border_data
+    
+    cleaned_data = pd.concat([data[inside], cleaned_border])
+    cleaned_data = cleaned_data.loc[data.index.intersection(cleaned_data.index)]
+    
+    print(f"\nRequest geocoding yang dihindari: {len(data) - len(border_data)} dari {len(data)} "
+          f"({(len(data) - len(border_data)) / max(len(data), 1) * 100:.1f}%)")
+    
+    return cleaned_data
+
 def print_cleaning_summary(original_data, cleaned_data):
     """
     Print summary hasil cleaning
@@ -393,6 +1110,12 @@ def print_cleaning_summary(original_data, cleaned_data):
     print(f"Merah (>=500 reviews): {merah} tempat")
     print(f"Orange (100-499 reviews): {orange} tempat")
     print(f"Biru (<100 reviews): {biru} tempat")
+    
+    # Perkiraan asal data yang dihapus dari polygon kasar (tanpa request jaringan)
+    removed_data = original_data.loc[original_data.index.difference(cleaned_data.index)]
+    if len(removed_data) > 0:
+        print(f"\nPerkiraan wilayah data yang dihapus (polygon kasar):")
+        label_by_boundaries(removed_data)
 
 def save_cleaned_data(data, output_file):
     """
@@ -401,6 +1124,16 @@ def save_cleaned_data(data, output_file):
     print(f"\nMenyimpan data bersih ke {output_file}...")
     
     try:
+        if is_columnar_path(output_file):
+            # Format kolumnar menyimpan Lat/Lng apa adanya
+            write_columnar(dataframe_to_table(data), output_file)
+            print(f"Data berhasil disimpan ke {output_file}")
+            return True
+        
+        if 'Lokasi' not in data.columns:
+            # Data dari file kolumnar: bentuk ulang kolom Lokasi untuk CSV
+            data = data.assign(Lokasi=format_lokasi(data['Lat'], data['Lng']))
+        
         # Hapus kolom Lat dan Lng sementara (karena sudah ada di kolom Lokasi)
         data_to_save = data.drop(['Lat', 'Lng'], axis=1)
         
@@ -412,6 +1145,100 @@ def save_cleaned_data(data, output_file):
         print(f"Error menyimpan data: {e}")
         return False
 
+def list_delta_files(delta_file):
+    """
+    File delta yang belum dibersihkan, urut dari run ingestion terlama
+    (megi4.versioned_delta_path: <delta_file tanpa ekstensi>_<waktu>.csv)
+    """
+    base, ext = os.path.splitext(delta_file)
+    delta_files = sorted(glob.glob(f"{glob.escape(base)}_*{ext}"))
+    
+    # File delta lama tanpa versi (ditimpa setiap run) tetap diproses lebih dulu
+    if os.path.exists(delta_file):
+        delta_files.insert(0, delta_file)
+    return delta_files
+
+def split_delta(delta_data):
+    """
+    Pisahkan delta OSM menjadi baris yang perlu dibersihkan (added/changed)
+    dan kumpulan Place_ID yang tersentuh delta
+    """
+    delta_place_ids = set(delta_data['Place_ID'])
+    deleted = delta_data[delta_data['Change'] == 'deleted']
+    to_clean = delta_data[delta_data['Change'] != 'deleted'].drop(
+        columns=['Change', 'OSM_Key'], errors='ignore')
+    
+    print(f"Delta: {len(to_clean)} baru/berubah, {len(deleted)} dihapus")
+    return to_clean, delta_place_ids
+
+def merge_delta_into_clean(previous_clean_file, cleaned_delta, delta_place_ids):
+    """
+    Gabungkan hasil cleaning delta ke data bersih sebelumnya:
+    baris lama dengan Place_ID di delta dibuang, lalu baris delta yang lolos ditambahkan
+    """
+    try:
+        if is_columnar_path(previous_clean_file):
+            previous = read_columnar(previous_clean_file)
+        else:
+            previous = pd.read_csv(previous_clean_file)
+    except FileNotFoundError:
+        print(f"Data bersih sebelumnya tidak ditemukan ({previous_clean_file}), memakai delta saja")
+        return cleaned_delta
+    
+    kept = previous[~previous['Place_ID'].isin(delta_place_ids)]
+    merged = pd.concat([kept, cleaned_delta], ignore_index=True)
+    
+    print(f"Data bersih sebelumnya: {len(previous)} records")
+    print(f"Dibuang karena berubah/dihapus: {len(previous) - len(kept)} records")
+    print(f"Ditambahkan dari delta: {len(cleaned_delta)} records")
+    print(f"Data bersih sekarang: {len(merged)} records")
+    return merged
+
+def run_delta_cleaning(delta_file, output_file, cache=None):
+    """
+    Cleaning incremental: hanya baris delta yang di-geocode, lalu digabung ke data bersih.
+    Semua file delta yang belum diproses digabung (perubahan terakhir per Place_ID yang
+    dipakai) dan baru dihapus setelah data bersih berhasil disimpan.
+    """
+    delta_files = list_delta_files(delta_file)
+    if not delta_files:
+        print("Tidak ada file delta yang belum diproses")
+        return
+    
+    print(f"Memproses {len(delta_files)} file delta")
+    delta_parts = []
+    for path in delta_files:
+        part = load_data(path)
+        if part is None:
+            return
+        delta_parts.append(part)
+    
+    # Perubahan terakhir per element OSM (node dan way bisa berbagi Place_ID);
+    # delta lama tanpa kolom OSM_Key memakai Place_ID
+    delta_data = pd.concat(delta_parts, ignore_index=True)
+    delta_key = 'OSM_Key' if 'OSM_Key' in delta_data.columns else 'Place_ID'
+    if delta_key == 'OSM_Key':
+        delta_data['OSM_Key'] = delta_data['OSM_Key'].fillna(delta_data['Place_ID'])
+    delta_data = delta_data.drop_duplicates(delta_key, keep='last').reset_index(drop=True)
+    
+    to_clean, delta_place_ids = split_delta(delta_data)
+    
+    if len(to_clean) > 0:
+        to_clean = extract_coordinates(to_clean)
+        cleaned_delta = full_parallel_cleaning(to_clean, max_workers=10, cache=cache)
+        print_cleaning_summary(to_clean, cleaned_delta)
+    else:
+        cleaned_delta = to_clean.assign(Lat=pd.Series(dtype=float), Lng=pd.Series(dtype=float))
+    
+    merged = merge_delta_into_clean(output_file, cleaned_delta, delta_place_ids)
+    
+    if save_cleaned_data(merged, output_file):
+        # Delta sudah masuk ke data bersih: file boleh dihapus
+        for path in delta_files:
+            os.remove(path)
+        print(f"\nData cleaning incremental selesai!")
+        print(f"File output: {output_file}")
+
 def main():
     """
     Fungsi utama untuk cleaning data
@@ -422,20 +1249,37 @@ def main():
     # File paths
     input_file = "C:/Users/ASUS/OneDrive/Documents/Skripsi_Megi/skripsi_baru/kuliner_makassar_osm.csv"
     output_file = "C:/Users/ASUS/OneDrive/Documents/Skripsi_Megi/skripsi_baru/kuliner_makassar_clean.csv"
+    delta_file = "C:/Users/ASUS/OneDrive/Documents/Skripsi_Megi/skripsi_baru/kuliner_makassar_osm_delta.csv"
     
-    # 1. Load data dan check data kosong
-    data = load_data(input_file)
-    if data is None:
-        return
-    
-    # 2. Extract coordinates dengan validation
-    data = extract_coordinates(data)
-    
-    # 3. Langsung parallel processing SEMUA data (skip boundary filter)
-    print("\nMenggunakan parallel processing untuk SEMUA data...")
-    print("Tidak menggunakan boundary filter - langsung reverse geocoding")
-    
-    cleaned_data = full_parallel_cleaning(data, max_workers=10)
+    # Cache reverse geocoding antar run
+    cache = GeocodeCache(GEOCODE_CACHE_DB)
+    try:
+        if DELTA_MODE:
+            # Hanya proses delta dari megi4 (INGESTION_MODE = "incremental")
+            run_delta_cleaning(delta_file, output_file, cache=cache)
+            return
+        
+        # 1. Load data dan check data kosong
+        data = load_data(input_file)
+        if data is None:
+            return
+        
+        # 2. Extract coordinates dengan validation
+        data = extract_coordinates(data)
+        
+        if CLEANING_MODE == "hybrid":
+            # 3. Polygon untuk titik yang jelas, reverse geocoding hanya di sekitar garis batas
+            cleaned_data = hybrid_boundary_cleaning(
+                data, create_makassar_boundary(), band_meters=BOUNDARY_BAND_METERS,
+                max_workers=10, cache=cache)
+        else:
+            # 3. Langsung parallel processing SEMUA data (skip boundary filter)
+            print("\nMenggunakan parallel processing untuk SEMUA data...")
+            print("Tidak menggunakan boundary filter - langsung reverse geocoding")
+            
+            cleaned_data = full_parallel_cleaning(data, max_workers=10, cache=cache)
+    finally:
+        cache.close()
     
     # 4. Print summary
     print_cleaning_summary(data, cleaned_data)
@@ -0,0 +1,95 @@
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+# Schema kolumnar data UMKM kuliner: koordinat sebagai float64 asli
+# (bukan string dict 'Lokasi'), jenis tempat dan area sebagai kategori
+COLUMNAR_SCHEMA = pa.schema([
+    ('Nama', pa.string()),
+    ('Alamat', pa.string()),
+    ('Area', pa.dictionary(pa.int16(), pa.string())),
+    ('Place_Type', pa.dictionary(pa.int16(), pa.string())),
+    ('Rating', pa.float64()),
+    ('User_Ratings_Total', pa.int32()),
+    ('Price_Level', pa.int8()),
+    ('Place_ID', pa.string()),
+    ('Lat', pa.float64()),
+    ('Lng', pa.float64()),
+])
+
+PARQUET_EXTENSIONS = ('.parquet',)
+ARROW_EXTENSIONS = ('.arrow', '.feather', '.ipc')
+
+def is_columnar_path(path):
+    """
+    Check apakah path menunjuk ke file Parquet/Arrow IPC
+    """
+    return str(path).lower().endswith(PARQUET_EXTENSIONS + ARROW_EXTENSIONS)
+
+def rows_to_table(rows):
+    """
+    Ubah list dict hasil process_osm_element menjadi Arrow Table dengan COLUMNAR_SCHEMA
+    """
+    columns = {
+        field.name: pa.array([row.get(field.name) for row in rows], type=field.type.value_type
+                             if pa.types.is_dictionary(field.type) else field.type)
+        for field in COLUMNAR_SCHEMA
+    }
+    for field in COLUMNAR_SCHEMA:
+        if pa.types.is_dictionary(field.type):
+            columns[field.name] = columns[field.name].dictionary_encode().cast(field.type)
+
+    return pa.Table.from_pydict(columns, schema=COLUMNAR_SCHEMA)
+
+def dataframe_to_table(data):
+    """
+    Ubah DataFrame (dengan kolom Lat/Lng) menjadi Arrow Table; kolom yang ada di
+    COLUMNAR_SCHEMA di-cast ke tipenya, kolom tambahan tetap ikut disimpan
+    """
+    data = data.drop(columns=['Lokasi'], errors='ignore')
+    table = pa.Table.from_pandas(data, preserve_index=False)
+
+    for field in COLUMNAR_SCHEMA:
+        index = table.schema.get_field_index(field.name)
+        if index != -1:
+            table = table.set_column(index, field, table.column(index).cast(field.type))
+
+    return table
+
+def write_columnar(table, path):
+    """
+    Tulis Arrow Table ke Parquet (terkompresi) atau Arrow IPC (tanpa kompresi,
+    bisa di-memory-map), berdasarkan ekstensi file
+    """
+    if str(path).lower().endswith(PARQUET_EXTENSIONS):
+        pq.write_table(table, path, compression='zstd')
+    else:
+        with ipc.new_file(str(path), table.schema) as writer:
+            writer.write_table(table)
+
+def open_columnar_writer(path, schema=COLUMNAR_SCHEMA):
+    """
+    Writer inkremental (per batch) untuk mode streaming
+    """
+    if str(path).lower().endswith(PARQUET_EXTENSIONS):
+        return pq.ParquetWriter(path, schema, compression='zstd')
+    # Format stream (bukan file) karena dictionary kategori bisa berbeda per batch
+    return ipc.new_stream(str(path), schema)
+
+def read_columnar(path):
+    """
+    Load file Parquet/Arrow IPC ke DataFrame dengan memory map. Kolom numerik
+    tanpa null dipetakan langsung tanpa copy; kolom kategori menjadi pandas Categorical.
+    """
+    if str(path).lower().endswith(PARQUET_EXTENSIONS):
+        table = pq.read_table(path, memory_map=True)
+    else:
+        source = pa.memory_map(str(path), 'r')
+        try:
+            table = ipc.open_file(source).read_all()
+        except pa.ArrowInvalid:
+            # File hasil writer streaming memakai format IPC stream
+            source.seek(0)
+            table = ipc.open_stream(source).read_all()
+
+    return table.to_pandas(split_blocks=True, self_destruct=True)
@@ -0,0 +1,240 @@
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+import requests
+
+# Status yang layak dicoba ulang
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Status yang berarti upstream kewalahan: concurrency diturunkan
+THROTTLE_STATUSES = frozenset({429, 503, 504})
+
+class UpstreamUnavailable(Exception):
+    """
+    Semua percobaan request gagal
+    """
+
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    """
+    Backoff eksponensial dengan full jitter: acak antara 0 dan min(cap, base * 2^attempt)
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def retry_after_seconds(headers, cap=300.0):
+    """
+    Baca header Retry-After (detik atau HTTP-date); None jika tidak ada/tidak valid
+    """
+    value = headers.get('Retry-After') if headers else None
+    if not value:
+        return None
+
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+
+    return min(cap, max(0.0, seconds))
+
+class CircuitBreaker:
+    """
+    Circuit breaker sederhana: setelah failure_threshold kegagalan berturut-turut semua
+    request ditolak selama reset_timeout detik, lalu satu request percobaan dibiarkan lewat
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self):
+        with self.lock:
+            if self.state == 'open':
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = 'half_open'
+                return True
+            # Saat half_open hanya satu request percobaan yang boleh berjalan
+            return self.state == 'closed'
+
+    def retry_in(self, poll=1.0):
+        """
+        Detik sampai request berikutnya boleh dicoba; saat request percobaan (half_open)
+        sedang berjalan, tunggu poll detik lalu cek lagi
+        """
+        with self.lock:
+            if self.state == 'open':
+                return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            return poll
+
+    def record_success(self):
+        with self.lock:
+            self.state = 'closed'
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    print(f"Circuit breaker terbuka selama {self.reset_timeout:.0f} detik")
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+class AIMDLimiter:
+    """
+    Batas request paralel yang menyesuaikan diri (AIMD): naik perlahan setiap request
+    sukses, turun setengah saat upstream membalas 429/503/504 atau timeout
+    """
+
+    def __init__(self, initial=2, minimum=1, maximum=10, increase=1.0, decrease=0.5):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self.completed_since_decrease = self.limit
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def _grow(self):
+        # +increase per "satu jendela" request sukses
+        self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+        self.completed_since_decrease += 1
+
+    def _shrink(self):
+        # Paling banyak satu penurunan per jendela (limit request selesai), agar satu
+        # burst error dari request yang sudah berjalan tidak langsung menjatuhkan ke minimum
+        self.completed_since_decrease += 1
+        if self.completed_since_decrease >= self.limit:
+            self.limit = max(self.minimum, self.limit * self.decrease)
+            self.completed_since_decrease = 0
+
+    def on_success(self):
+        with self.condition:
+            self._grow()
+            self.condition.notify_all()
+
+    def on_throttle(self):
+        with self.condition:
+            self._shrink()
+
+class AsyncAIMDLimiter(AIMDLimiter):
+    """
+    AIMDLimiter untuk asyncio (satu event loop): aturan naik/turun sama,
+    menunggu slot tanpa memblokir event loop
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.changed = asyncio.Event()
+
+    async def acquire(self):
+        while self.in_flight >= int(self.limit):
+            self.changed.clear()
+            await self.changed.wait()
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self.changed.set()
+
+    def on_success(self):
+        self._grow()
+        self.changed.set()
+
+    def on_throttle(self):
+        self._shrink()
+
+class ResilientSession:
+    """
+    Wrapper requests.Session dengan AIMD concurrency, Retry-After, backoff eksponensial
+    berjitter dan circuit breaker. Dipakai bersama oleh semua thread untuk satu upstream.
+    """
+
+    def __init__(self, name, limiter=None, breaker=None, max_retries=4, base_delay=1.0,
+                 max_delay=60.0, headers=None):
+        self.name = name
+        self.limiter = limiter or AIMDLimiter()
+        self.breaker = breaker or CircuitBreaker()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+
+    def request(self, method, url, max_retries=None, **kwargs):
+        """
+        Kirim request; status di RETRY_STATUSES dan error koneksi/timeout dicoba ulang.
+        Response lain (termasuk 4xx) dikembalikan apa adanya.
+        """
+        max_retries = max_retries or self.max_retries
+        last_error = None
+
+        for attempt in range(max_retries):
+            # Breaker terbuka: request ditahan sampai reset_timeout, bukan langsung gagal;
+            # menunggu tidak dihitung sebagai percobaan
+            while not self.breaker.allow():
+                time.sleep(self.breaker.retry_in())
+
+            self.limiter.acquire()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.Timeout, requests.ConnectionError) as e:
+                self.limiter.on_throttle()
+                self.breaker.record_failure()
+                last_error = repr(e)
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+            except requests.RequestException:
+                # Error lain tidak dicoba ulang, tapi tetap dicatat agar request
+                # percobaan half_open tidak membuat breaker macet
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    self.limiter.on_success()
+                    self.breaker.record_success()
+                    return response
+
+                if response.status_code in THROTTLE_STATUSES:
+                    self.limiter.on_throttle()
+                self.breaker.record_failure()
+                last_error = f"HTTP {response.status_code}"
+                delay = retry_after_seconds(response.headers)
+                if delay is None:
+                    delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+                response.close()
+            finally:
+                self.limiter.release()
+
+            if attempt < max_retries - 1:
+                print(f"{self.name}: percobaan {attempt + 1} gagal ({last_error}), "
+                      f"ulang dalam {delay:.1f} detik (concurrency {int(self.limiter.limit)})")
+                time.sleep(delay)
+
+        raise UpstreamUnavailable(f"{self.name}: {last_error} setelah {max_retries} percobaan")
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+# Naikkan jika cara hitung densitas di kde_engine berubah, agar cache lama tidak terpakai
+KDE_CACHE_VERSION = 2
+
+class KDECache:
+    """
+    Cache hasil KDE per layer di disk, dengan key sha256 dari koordinat input dan
+    parameter (bandwidth, grid, padding, mode evaluasi). Disimpan sebagai .npz
+    terkompresi; jika total ukuran melebihi max_bytes, file yang paling lama
+    tidak dipakai dibuang dulu (LRU berdasarkan mtime).
+    """
+
+    def __init__(self, cache_dir, max_bytes=200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, coordinates, **params):
+        digest = hashlib.sha256()
+        coordinates = np.ascontiguousarray(coordinates, dtype=np.float64)
+        digest.update(str(coordinates.shape).encode())
+        digest.update(coordinates.tobytes())
+        digest.update(json.dumps({'version': KDE_CACHE_VERSION, **params}, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def get(self, key):
+        """
+        Ambil hasil (dict array/skalar) dari cache, atau None jika miss
+        """
+        path = self.path(key)
+        try:
+            with np.load(path, allow_pickle=False) as stored:
+                result = {name: stored[name] for name in stored.files}
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # Tandai baru dipakai (urutan LRU)
+        os.utime(path)
+        self.hits += 1
+        return {name: value.item() if value.ndim == 0 else value for name, value in result.items()}
+
+    def put(self, key, result):
+        """
+        Simpan hasil; ditulis ke file sementara lalu rename agar tidak pernah setengah jadi
+        """
+        tmp_path = self.path(key) + '.tmp.npz'
+        np.savez_compressed(tmp_path, **result)
+        os.replace(tmp_path, self.path(key))
+        self.evict()
+
+    def evict(self):
+        """
+        Buang file paling lama tidak dipakai sampai total ukuran <= max_bytes
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.npz') and not name.endswith('.tmp.npz'):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+
+    def get_or_compute(self, coordinates, compute, **params):
+        """
+        Kembalikan hasil dari cache, atau hitung dengan compute(coordinates, **params) lalu simpan
+        (hasil None, mis. layer yang dilewati, tidak disimpan)
+        """
+        key = self.key(coordinates, **params)
+        result = self.get(key)
+        if result is None:
+            result = compute(coordinates, **params)
+            if result is not None:
+                self.put(key, result)
+        return result
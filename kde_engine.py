@@ -0,0 +1,493 @@
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from scipy.linalg import solve_triangular
+from scipy.signal import fftconvolve
+from scipy.spatial import cKDTree
+from scipy.stats import gaussian_kde
+
+def make_grid(coordinates, grid_size=80, padding=0.15):
+    """
+    Grid reguler lat/lng di sekitar titik, dengan padding relatif terhadap rentang data
+    """
+    lat_min, lat_max = coordinates[:, 0].min(), coordinates[:, 0].max()
+    lng_min, lng_max = coordinates[:, 1].min(), coordinates[:, 1].max()
+
+    lat_padding = (lat_max - lat_min) * padding
+    lng_padding = (lng_max - lng_min) * padding
+
+    lat_values = np.linspace(lat_min - lat_padding, lat_max + lat_padding, grid_size)
+    lng_values = np.linspace(lng_min - lng_padding, lng_max + lng_padding, grid_size)
+    return lat_values, lng_values
+
+def kde_covariance(coordinates, bandwidth):
+    """
+    Kovarians kernel Gaussian, sama seperti gaussian_kde(bw_method=bandwidth):
+    kovarians data dikali bandwidth^2
+    """
+    return np.atleast_2d(np.cov(coordinates.T)) * bandwidth ** 2
+
+def linear_binning(coordinates, lat_values, lng_values, weights=None):
+    """
+    Sebar bobot setiap titik ke 4 node grid terdekat (linear binning).
+    Mengembalikan array (len(lat_values), len(lng_values)).
+    """
+    n_lat, n_lng = len(lat_values), len(lng_values)
+    weights = np.ones(len(coordinates)) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    lat_pos = (coordinates[:, 0] - lat_values[0]) / (lat_values[1] - lat_values[0])
+    lng_pos = (coordinates[:, 1] - lng_values[0]) / (lng_values[1] - lng_values[0])
+
+    lat_index = np.clip(np.floor(lat_pos).astype(np.int64), 0, n_lat - 2)
+    lng_index = np.clip(np.floor(lng_pos).astype(np.int64), 0, n_lng - 2)
+    lat_frac = np.clip(lat_pos - lat_index, 0.0, 1.0)
+    lng_frac = np.clip(lng_pos - lng_index, 0.0, 1.0)
+
+    counts = np.zeros(n_lat * n_lng)
+    for lat_offset, lat_weight in ((0, 1 - lat_frac), (1, lat_frac)):
+        for lng_offset, lng_weight in ((0, 1 - lng_frac), (1, lng_frac)):
+            flat_index = (lat_index + lat_offset) * n_lng + (lng_index + lng_offset)
+            counts += np.bincount(flat_index, weights=weights * lat_weight * lng_weight,
+                                  minlength=n_lat * n_lng)
+
+    return counts.reshape(n_lat, n_lng)
+
+def gaussian_kernel_grid(covariance, lat_step, lng_step, max_lat_steps, max_lng_steps, truncate=4.0):
+    """
+    Kernel Gaussian 2D (kovarians penuh) pada offset grid, dipotong di `truncate`
+    standar deviasi per sumbu. Ukuran ganjil agar pusat kernel tepat di tengah.
+    """
+    half_lat = int(min(max_lat_steps, np.ceil(truncate * np.sqrt(covariance[0, 0]) / lat_step)))
+    half_lng = int(min(max_lng_steps, np.ceil(truncate * np.sqrt(covariance[1, 1]) / lng_step)))
+
+    d_lat = np.arange(-half_lat, half_lat + 1) * lat_step
+    d_lng = np.arange(-half_lng, half_lng + 1) * lng_step
+    d_lat, d_lng = np.meshgrid(d_lat, d_lng, indexing='ij')
+
+    inverse = np.linalg.inv(covariance)
+    mahalanobis = (inverse[0, 0] * d_lat ** 2 + 2 * inverse[0, 1] * d_lat * d_lng
+                   + inverse[1, 1] * d_lng ** 2)
+    norm = 2 * np.pi * np.sqrt(np.linalg.det(covariance))
+
+    return np.exp(-0.5 * mahalanobis) / norm
+
+def refinement_factor(values, variance, max_grid_size, steps_per_sigma=3):
+    """
+    Faktor perapatan grid agar jarak node paling besar sigma / steps_per_sigma
+    (dibatasi max_grid_size node per sumbu)
+    """
+    step = values[1] - values[0]
+    factor = int(np.ceil(step * steps_per_sigma / np.sqrt(variance)))
+    max_factor = max(1, (max_grid_size - 1) // (len(values) - 1))
+    return int(min(max(factor, 1), max_factor))
+
+def binned_kde(coordinates, lat_values, lng_values, bandwidth=None, covariance=None, truncate=4.0,
+               max_grid_size=4096):
+    """
+    KDE Gaussian pada grid dengan linear binning + konvolusi FFT: O(N + G log G),
+    bukan O(N x G) seperti evaluasi gaussian_kde langsung.
+    coordinates: array (N, 2) berisi [lat, lng]. Kernel memakai `covariance`, atau
+    kovarians data x bandwidth^2. Mengembalikan densitas (len(lat_values), len(lng_values)).
+    """
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    if covariance is None:
+        covariance = kde_covariance(coordinates, bandwidth)
+
+    # Jika kernel lebih sempit dari jarak grid, binning dilakukan di grid internal yang
+    # lebih rapat (node grid asli tetap termasuk), lalu hasilnya di-subsample
+    lat_factor = refinement_factor(lat_values, covariance[0, 0], max_grid_size)
+    lng_factor = refinement_factor(lng_values, covariance[1, 1], max_grid_size)
+    fine_lat = np.linspace(lat_values[0], lat_values[-1], (len(lat_values) - 1) * lat_factor + 1)
+    fine_lng = np.linspace(lng_values[0], lng_values[-1], (len(lng_values) - 1) * lng_factor + 1)
+
+    counts = linear_binning(coordinates, fine_lat, fine_lng)
+    kernel = gaussian_kernel_grid(covariance, fine_lat[1] - fine_lat[0], fine_lng[1] - fine_lng[0],
+                                  len(fine_lat) - 1, len(fine_lng) - 1, truncate)
+
+    density = fftconvolve(counts, kernel, mode='same')[::lat_factor, ::lng_factor] / len(coordinates)
+    # Buang noise negatif kecil dari FFT
+    return np.maximum(density, 0.0)
+
+def exact_kde(coordinates, lat_values, lng_values, bandwidth):
+    """
+    Referensi: gaussian_kde scipy dievaluasi langsung di setiap node grid
+    """
+    kde = gaussian_kde(np.asarray(coordinates).T, bw_method=bandwidth)
+    lat_grid, lng_grid = np.meshgrid(lat_values, lng_values, indexing='ij')
+    return kde(np.vstack([lat_grid.ravel(), lng_grid.ravel()])).reshape(lat_grid.shape)
+
+def compare_with_exact(coordinates, bandwidth, grid_size=80, padding=0.15):
+    """
+    Error binned_kde terhadap gaussian_kde pada grid yang sama, relatif terhadap
+    densitas maksimum. Mengembalikan (max_error, mean_error).
+    """
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    lat_values, lng_values = make_grid(coordinates, grid_size, padding)
+
+    fast = binned_kde(coordinates, lat_values, lng_values, bandwidth)
+    exact = exact_kde(coordinates, lat_values, lng_values, bandwidth)
+
+    error = np.abs(fast - exact) / exact.max()
+    return error.max(), error.mean()
+
+def scott_factor(n_points, dimensions=2):
+    """
+    Faktor bandwidth Scott (sama dengan gaussian_kde bw_method='scott')
+    """
+    return n_points ** (-1.0 / (dimensions + 4))
+
+def silverman_factor(n_points, dimensions=2):
+    """
+    Faktor bandwidth Silverman (sama dengan gaussian_kde bw_method='silverman')
+    """
+    return (n_points * (dimensions + 2) / 4.0) ** (-1.0 / (dimensions + 4))
+
+def gaussian_at_offsets(covariance, d_lat, d_lng):
+    """
+    Densitas Gaussian 2D (kovarians penuh) untuk offset d_lat/d_lng
+    """
+    inverse = np.linalg.inv(covariance)
+    mahalanobis = (inverse[0, 0] * d_lat ** 2 + 2 * inverse[0, 1] * d_lat * d_lng
+                   + inverse[1, 1] * d_lng ** 2)
+    return np.exp(-0.5 * mahalanobis) / (2 * np.pi * np.sqrt(np.linalg.det(covariance)))
+
+def lscv_bandwidth(coordinates, candidates=None, grid_size=None, max_grid_size=1024, padding=0.15):
+    """
+    Least-squares cross-validation pada hitungan binned.
+    Autokorelasi hitungan grid dihitung sekali via FFT, sehingga skor setiap kandidat
+    hanya berupa jumlah autokorelasi x kernel (tanpa FFT per kandidat). Kontribusi
+    titik ke dirinya sendiri dihitung persis dari bobot linear binning.
+    Mengembalikan (bandwidth terbaik, array kandidat, array skor LSCV).
+    """
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    n = len(coordinates)
+    data_covariance = kde_covariance(coordinates, 1.0)
+    if candidates is None:
+        candidates = np.geomspace(0.01, 1.0, 40)
+    candidates = np.asarray(candidates, dtype=np.float64)
+
+    # Jarak grid paling besar sigma/3 untuk kandidat terkecil (dibatasi max_grid_size)
+    if grid_size is None:
+        span = (1 + 2 * padding) * np.ptp(coordinates, axis=0).max() / np.sqrt(data_covariance.diagonal().min())
+        grid_size = int(np.clip(np.ceil(3 * span / candidates.min()), 64, max_grid_size))
+    lat_values, lng_values = make_grid(coordinates, grid_size, padding)
+    lat_step = lat_values[1] - lat_values[0]
+    lng_step = lng_values[1] - lng_values[0]
+
+    counts = linear_binning(coordinates, lat_values, lng_values)
+    autocorrelation = fftconvolve(counts, counts[::-1, ::-1], mode='full')
+    center_lat, center_lng = grid_size - 1, grid_size - 1
+
+    # Bobot pasangan node dari linear binning satu titik, untuk selisih node -1/0/+1
+    lat_frac = (coordinates[:, 0] - lat_values[0]) / lat_step
+    lat_frac -= np.clip(np.floor(lat_frac), 0, grid_size - 2)
+    lng_frac = (coordinates[:, 1] - lng_values[0]) / lng_step
+    lng_frac -= np.clip(np.floor(lng_frac), 0, grid_size - 2)
+    lat_pairs = {0: (1 - lat_frac) ** 2 + lat_frac ** 2, 1: lat_frac * (1 - lat_frac)}
+    lng_pairs = {0: (1 - lng_frac) ** 2 + lng_frac ** 2, 1: lng_frac * (1 - lng_frac)}
+
+    def pair_sums(covariance):
+        # Jumlah K(x_i - x_j) untuk semua pasangan binned, dan bagian i == j
+        half_lat = int(min(center_lat, np.ceil(4 * np.sqrt(covariance[0, 0]) / lat_step)))
+        half_lng = int(min(center_lng, np.ceil(4 * np.sqrt(covariance[1, 1]) / lng_step)))
+        d_lat, d_lng = np.meshgrid(np.arange(-half_lat, half_lat + 1) * lat_step,
+                                   np.arange(-half_lng, half_lng + 1) * lng_step, indexing='ij')
+        window = autocorrelation[center_lat - half_lat:center_lat + half_lat + 1,
+                                 center_lng - half_lng:center_lng + half_lng + 1]
+        total = np.sum(window * gaussian_at_offsets(covariance, d_lat, d_lng))
+
+        self_total = 0.0
+        for step_lat in (-1, 0, 1):
+            for step_lng in (-1, 0, 1):
+                kernel = gaussian_at_offsets(covariance, step_lat * lat_step, step_lng * lng_step)
+                self_total += kernel * np.sum(lat_pairs[abs(step_lat)] * lng_pairs[abs(step_lng)])
+        return total, self_total
+
+    scores = np.empty(len(candidates))
+    for i, factor in enumerate(candidates):
+        covariance = data_covariance * factor ** 2
+        total_2h, self_2h = pair_sums(2 * covariance)
+        total_h, self_h = pair_sums(covariance)
+
+        # integral f^2 (diagonal memakai nilai persis K_2H(0)) - 2/n * sum leave-one-out f(x_i)
+        integral_f2 = (total_2h - self_2h + n * gaussian_at_offsets(2 * covariance, 0.0, 0.0)) / n ** 2
+        leave_one_out = (total_h - self_h) / (n * (n - 1))
+        scores[i] = integral_f2 - 2 * leave_one_out
+
+    return float(candidates[np.argmin(scores)]), candidates, scores
+
+def select_bandwidth(coordinates, method='scott'):
+    """
+    Pilih faktor bandwidth (skala kovarians data, seperti bw_method gaussian_kde).
+    method: 'scott', 'silverman', 'lscv' atau angka tetap.
+    Mengembalikan (bandwidth, metode yang benar-benar dipakai).
+    """
+    n = len(coordinates)
+    if not isinstance(method, str):
+        return float(method), 'tetap'
+    if method == 'scott':
+        return scott_factor(n), 'scott'
+    if method == 'silverman':
+        return silverman_factor(n), 'silverman'
+    if method == 'lscv':
+        bandwidth, candidates, scores = lscv_bandwidth(coordinates)
+        # Minimum di ujung bawah biasanya karena titik duplikat; LSCV tidak bisa dipakai
+        if bandwidth == candidates[0]:
+            return scott_factor(n), 'scott (LSCV tidak konvergen)'
+        return bandwidth, 'lscv'
+    raise ValueError(f"Metode bandwidth tidak dikenal: {method}")
+
+def bandwidth_meters(coordinates, bandwidth):
+    """
+    Perkiraan lebar kernel (standar deviasi rata-rata geometrik, meter) untuk laporan
+    """
+    covariance = kde_covariance(np.asarray(coordinates, dtype=np.float64), bandwidth)
+    lat = np.radians(np.mean(coordinates[:, 0]))
+    scaled = covariance * np.outer([110540.0, 111320.0 * np.cos(lat)], [110540.0, 111320.0 * np.cos(lat)])
+    return np.linalg.det(scaled) ** 0.25
+
+class TruncatedKDE:
+    """
+    KDE Gaussian (kovarians penuh) yang dievaluasi di titik sembarang. Koordinat di-whitening
+    dengan Cholesky kovarians sehingga kernel menjadi isotropik, lalu hanya titik data
+    dalam radius `truncate` sigma (cKDTree) yang dijumlahkan.
+    """
+
+    def __init__(self, coordinates, covariance, truncate=4.0, chunk_size=4096):
+        coordinates = np.asarray(coordinates, dtype=np.float64)
+        self.cholesky = np.linalg.cholesky(covariance)
+        self.truncate = truncate
+        self.chunk_size = chunk_size
+        self.norm = 1.0 / (len(coordinates) * 2 * np.pi * np.sqrt(np.linalg.det(covariance)))
+        self.whitened = self.whiten(coordinates)
+        self.tree = cKDTree(self.whitened)
+
+    def whiten(self, points):
+        return solve_triangular(self.cholesky, np.asarray(points, dtype=np.float64).T, lower=True).T
+
+    def evaluate(self, points):
+        """
+        Densitas dan besar gradien (terhadap koordinat whitened) di setiap titik [lat, lng]
+        """
+        query = self.whiten(points)
+        density = np.zeros(len(query))
+        gradient = np.zeros((len(query), 2))
+
+        for start in range(0, len(query), self.chunk_size):
+            chunk = query[start:start + self.chunk_size]
+            pairs = self.tree.sparse_distance_matrix(cKDTree(chunk), self.truncate, output_type='ndarray')
+            weights = np.exp(-0.5 * pairs['v'] ** 2)
+            offsets = chunk[pairs['j']] - self.whitened[pairs['i']]
+
+            density[start:start + len(chunk)] = np.bincount(pairs['j'], weights, minlength=len(chunk))
+            for axis in range(2):
+                gradient[start:start + len(chunk), axis] = -np.bincount(
+                    pairs['j'], weights * offsets[:, axis], minlength=len(chunk))
+
+        return density * self.norm, np.hypot(gradient[:, 0], gradient[:, 1]) * self.norm
+
+def adaptive_kde_points(coordinates, covariance, lat_bounds, lng_bounds, base_size=16, max_depth=6,
+                        point_budget=3000, density_threshold=0.03, gradient_threshold=0.05, truncate=4.0):
+    """
+    Evaluasi KDE adaptif (quadtree): mulai dari grid base_size x base_size, lalu sel dengan
+    densitas atau perubahan densitas (gradien x ukuran sel) relatif di atas threshold dipecah
+    menjadi 4, prioritas terbesar dulu, sampai point_budget sel atau max_depth tercapai.
+    Mengembalikan (lats, lngs, weights) pusat sel daun dengan densitas ternormalisasi
+    >= density_threshold; weights dinormalisasi min-max seperti mode grid.
+    """
+    kde = TruncatedKDE(coordinates, covariance, truncate)
+    lat_size = (lat_bounds[1] - lat_bounds[0]) / base_size
+    lng_size = (lng_bounds[1] - lng_bounds[0]) / base_size
+
+    # Setengah diagonal sel level 0 dalam satuan whitened (skala perubahan densitas per sel)
+    half_diagonals = kde.whiten(np.array([[lat_size, lng_size], [lat_size, -lng_size]]) / 2)
+    base_reach = np.hypot(half_diagonals[:, 0], half_diagonals[:, 1]).max()
+
+    lat_centers = lat_bounds[0] + (np.arange(base_size) + 0.5) * lat_size
+    lng_centers = lng_bounds[0] + (np.arange(base_size) + 0.5) * lng_size
+    lat_centers, lng_centers = np.meshgrid(lat_centers, lng_centers, indexing='ij')
+    centers = np.column_stack([lat_centers.ravel(), lng_centers.ravel()])
+
+    density, gradient = kde.evaluate(centers)
+    max_density = max(density.max(), 1e-300)
+
+    # Sel: [lat, lng, depth, densitas]; heap berisi (-prioritas, id sel)
+    cells = [[lat, lng, 0, d] for (lat, lng), d in zip(centers, density)]
+    heap = []
+
+    def push(cell_id, d, g):
+        depth = cells[cell_id][2]
+        reach = base_reach * 0.5 ** depth
+        score = max(d / max_density, g * reach / max_density)
+        if depth < max_depth and (d / max_density >= density_threshold or g * reach / max_density >= gradient_threshold):
+            # Sel besar dengan skor tinggi dipecah lebih dulu
+            heapq.heappush(heap, (-score * 0.5 ** depth, cell_id))
+
+    for cell_id, (d, g) in enumerate(zip(density, gradient)):
+        push(cell_id, d, g)
+
+    leaves = set(range(len(cells)))
+    while heap and len(leaves) + 3 <= point_budget:
+        _, cell_id = heapq.heappop(heap)
+        lat, lng, depth, _ = cells[cell_id]
+        child_lat = lat_size * 0.5 ** (depth + 2)
+        child_lng = lng_size * 0.5 ** (depth + 2)
+        children = np.array([[lat - child_lat, lng - child_lng], [lat - child_lat, lng + child_lng],
+                             [lat + child_lat, lng - child_lng], [lat + child_lat, lng + child_lng]])
+
+        child_density, child_gradient = kde.evaluate(children)
+        max_density = max(max_density, child_density.max())
+
+        leaves.discard(cell_id)
+        for (child_lat_center, child_lng_center), d, g in zip(children, child_density, child_gradient):
+            cells.append([child_lat_center, child_lng_center, depth + 1, d])
+            leaves.add(len(cells) - 1)
+            push(len(cells) - 1, d, g)
+
+    leaf_cells = np.array([cells[cell_id] for cell_id in sorted(leaves)], dtype=np.float64)
+    leaf_density = leaf_cells[:, 3]
+    density_range = leaf_density.max() - leaf_density.min()
+    weights = ((leaf_density - leaf_density.min()) / density_range if density_range > 0
+               else np.zeros_like(leaf_density))
+    keep = weights >= density_threshold
+    return leaf_cells[keep, 0], leaf_cells[keep, 1], weights[keep]
+
+def emit_heat_points(lats, lngs, weights, threshold=0.03, max_points=None, coord_decimals=5,
+                     weight_decimals=2):
+    """
+    Bentuk data HeatMap [[lat, lng, weight], ...] secara vectorized: buang weight di bawah
+    threshold, kuantisasi koordinat/weight, gabungkan titik yang jatuh di koordinat
+    kuantisasi yang sama (weight maksimum), lalu ambil max_points weight terbesar (top-K).
+    """
+    lats = np.asarray(lats, dtype=np.float64).ravel()
+    lngs = np.asarray(lngs, dtype=np.float64).ravel()
+    weights = np.asarray(weights, dtype=np.float64).ravel()
+
+    keep = weights > threshold
+    scale = 10.0 ** coord_decimals
+    lat_keys = np.round(lats[keep] * scale).astype(np.int64)
+    lng_keys = np.round(lngs[keep] * scale).astype(np.int64)
+    weights = np.round(weights[keep], weight_decimals)
+
+    # Titik duplikat setelah kuantisasi: simpan weight terbesar
+    order = np.lexsort((-weights, lng_keys, lat_keys))
+    lat_keys, lng_keys, weights = lat_keys[order], lng_keys[order], weights[order]
+    first = np.ones(len(weights), dtype=bool)
+    first[1:] = (lat_keys[1:] != lat_keys[:-1]) | (lng_keys[1:] != lng_keys[:-1])
+    lat_keys, lng_keys, weights = lat_keys[first], lng_keys[first], weights[first]
+
+    if max_points is not None and len(weights) > max_points:
+        top = np.argpartition(-weights, max_points - 1)[:max_points]
+        top.sort()
+        lat_keys, lng_keys, weights = lat_keys[top], lng_keys[top], weights[top]
+
+    points = np.column_stack([np.round(lat_keys / scale, coord_decimals),
+                              np.round(lng_keys / scale, coord_decimals), weights])
+    return points.tolist()
+
+def is_degenerate(coordinates):
+    """
+    True jika kovarians titik singular (semua titik identik atau segaris):
+    kernel Gaussian 2D dan grid di sekitar titik tidak terdefinisi
+    """
+    eigenvalues = np.linalg.eigvalsh(np.atleast_2d(np.cov(coordinates.T)))
+    return not np.all(np.isfinite(eigenvalues)) or eigenvalues.min() <= eigenvalues.max() * 1e-10
+
+def compute_kde_layer(coordinates, bandwidth='lscv', grid_size=80, padding=0.15, evaluation='grid',
+                      point_budget=3000, threshold=0.03):
+    """
+    Hitung densitas satu layer heatmap: pilih bandwidth, lalu evaluasi di grid reguler
+    (binned FFT KDE) atau quadtree adaptif. Mengembalikan dict berisi array lats, lngs,
+    weights (densitas ternormalisasi 0-1) dan bandwidth/metode yang dipakai, atau None
+    jika titik kurang dari 3 atau sebarannya singular (lihat is_degenerate).
+    """
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    if len(coordinates) < 3 or is_degenerate(coordinates):
+        return None
+
+    bandwidth, bandwidth_method = select_bandwidth(coordinates, bandwidth)
+    lat_values, lng_values = make_grid(coordinates, grid_size, padding)
+
+    if evaluation == 'adaptive':
+        # Quadtree: sel kasar di area kosong, sel halus di inti padat
+        lats, lngs, weights = adaptive_kde_points(
+            coordinates, kde_covariance(coordinates, bandwidth),
+            (lat_values[0], lat_values[-1]), (lng_values[0], lng_values[-1]),
+            point_budget=point_budget, density_threshold=threshold)
+    else:
+        lats, lngs = np.meshgrid(lat_values, lng_values, indexing='ij')
+        density = binned_kde(coordinates, lat_values, lng_values, bandwidth)
+        density_range = density.max() - density.min()
+        weights = (density - density.min()) / density_range if density_range > 0 else np.zeros_like(density)
+
+    return {
+        'lats': lats.ravel(),
+        'lngs': lngs.ravel(),
+        'weights': weights.ravel(),
+        'bandwidth': float(bandwidth),
+        'method': bandwidth_method,
+        'kernel_meters': float(bandwidth_meters(coordinates, bandwidth))
+    }
+
+def _kde_layer_worker(shm_name, shape, start, stop, params):
+    """
+    Worker process: baca slice koordinat langsung dari shared memory (tanpa pickle)
+    lalu hitung satu layer
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        coordinates = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)[start:stop]
+        result = compute_kde_layer(coordinates, **params)
+        # View ke buffer shared memory harus dilepas sebelum close()
+        del coordinates
+        return result
+    finally:
+        shm.close()
+
+def compute_kde_layers(coordinates, layer_slices, params, max_workers=None, cache=None):
+    """
+    Hitung beberapa layer KDE sekaligus di process pool. coordinates diurutkan sehingga
+    setiap layer adalah slice (start, stop) yang bersambung; array dibagikan ke worker
+    lewat SharedMemory. Layer yang ada di cache tidak dihitung ulang.
+    Mengembalikan list hasil compute_kde_layer sesuai urutan layer_slices
+    (None untuk layer dengan kurang dari 3 titik atau sebaran singular).
+    """
+    coordinates = np.ascontiguousarray(coordinates, dtype=np.float64)
+    results = [None] * len(layer_slices)
+    keys = [None] * len(layer_slices)
+    pending = []
+
+    for i, (start, stop) in enumerate(layer_slices):
+        if stop - start < 3:
+            continue
+        if cache is not None:
+            keys[i] = cache.key(coordinates[start:stop], **params)
+            results[i] = cache.get(keys[i])
+        if results[i] is None:
+            pending.append(i)
+
+    if not pending:
+        return results
+
+    shm = shared_memory.SharedMemory(create=True, size=max(coordinates.nbytes, 1))
+    try:
+        np.ndarray(coordinates.shape, dtype=np.float64, buffer=shm.buf)[:] = coordinates
+        max_workers = max_workers or min(len(pending), os.cpu_count() or 1)
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # Layer terbesar dikirim dulu agar total waktu mendekati waktu layer terbesar
+            order = sorted(pending, key=lambda i: layer_slices[i][0] - layer_slices[i][1])
+            futures = {i: executor.submit(_kde_layer_worker, shm.name, coordinates.shape,
+                                          layer_slices[i][0], layer_slices[i][1], params)
+                       for i in order}
+            for i in pending:
+                results[i] = futures[i].result()
+                if cache is not None and results[i] is not None:
+                    cache.put(keys[i], results[i])
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return results
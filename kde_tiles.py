@@ -0,0 +1,200 @@
+import hashlib
+import json
+import math
+import os
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+TILE_SIZE = 256
+
+# Colormap tetap (mirip gradien default Leaflet.heat); naikkan versi jika diubah
+# agar semua tile dirender ulang
+COLORMAP_STOPS = [
+    (0.0, (0, 0, 255)),
+    (0.4, (0, 0, 255)),
+    (0.6, (0, 255, 255)),
+    (0.7, (0, 255, 0)),
+    (0.8, (255, 255, 0)),
+    (1.0, (255, 0, 0)),
+]
+COLORMAP_VERSION = 1
+
+def build_colormap(threshold=0.03, max_alpha=210):
+    """
+    Lookup table RGBA 256 level; level di bawah threshold transparan
+    """
+    levels = np.linspace(0.0, 1.0, 256)
+    positions = [stop for stop, _ in COLORMAP_STOPS]
+    colormap = np.zeros((256, 4), dtype=np.uint8)
+    for channel in range(3):
+        colormap[:, channel] = np.round(np.interp(levels, positions, [color[channel] for _, color in COLORMAP_STOPS]))
+    colormap[:, 3] = np.round(np.clip(levels / 0.4, 0.0, 1.0) * max_alpha)
+    colormap[levels < threshold, 3] = 0
+    return colormap
+
+def encode_png(rgba):
+    """
+    Encode array RGBA (tinggi, lebar, 4) uint8 menjadi PNG (hanya zlib + struct)
+    """
+    height, width, _ = rgba.shape
+    # Setiap baris diawali byte filter 0 (None)
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgba.reshape(height, width * 4)
+
+    def chunk(tag, data):
+        return (struct.pack('>I', len(data)) + tag + data
+                + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw.tobytes(), 6))
+            + chunk(b'IEND', b''))
+
+def lng_to_tile_x(lng, zoom):
+    return int(math.floor((lng + 180.0) / 360.0 * 2 ** zoom))
+
+def lat_to_tile_y(lat, zoom):
+    lat_rad = math.radians(lat)
+    return int(math.floor((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * 2 ** zoom))
+
+def tile_pixel_coordinates(zoom, x, y):
+    """
+    Lat (per baris) dan lng (per kolom) pusat piksel tile Web Mercator z/x/y
+    """
+    scale = TILE_SIZE * 2 ** zoom
+    pixels = np.arange(TILE_SIZE) + 0.5
+    lngs = (x * TILE_SIZE + pixels) / scale * 360.0 - 180.0
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * (y * TILE_SIZE + pixels) / scale))))
+    return lats, lngs
+
+def _axis_weights(values, grid_values):
+    # Index dan bobot interpolasi linear di satu sumbu; di luar grid bobotnya 0
+    position = (values - grid_values[0]) / (grid_values[1] - grid_values[0])
+    index = np.clip(np.floor(position).astype(np.int64), 0, len(grid_values) - 2)
+    frac = position - index
+    inside = (position >= 0) & (position <= len(grid_values) - 1)
+    return index, np.where(inside, 1 - frac, 0.0), np.where(inside, frac, 0.0)
+
+def render_tile(grid, lat_values, lng_values, zoom, x, y, colormap):
+    """
+    Sampling bilinear grid densitas (0-1) ke tile 256x256 lalu warnai dengan colormap.
+    Mengembalikan array RGBA, atau None jika tile seluruhnya transparan.
+    """
+    lats, lngs = tile_pixel_coordinates(zoom, x, y)
+    lat_index, lat_w0, lat_w1 = _axis_weights(lats, lat_values)
+    lng_index, lng_w0, lng_w1 = _axis_weights(lngs, lng_values)
+    if not lat_w0.any() and not lat_w1.any() or not lng_w0.any() and not lng_w1.any():
+        return None
+
+    # Cek cepat: jika nilai maksimum grid di area tile pun transparan, tile tidak perlu dirender
+    block = grid[lat_index.min():lat_index.max() + 2, lng_index.min():lng_index.max() + 2]
+    if colormap[int(np.clip(np.round(block.max() * 255), 0, 255)), 3] == 0:
+        return None
+
+    # Grid separable: ambil baris dulu, lalu kolom
+    rows = grid[lat_index] * lat_w0[:, None] + grid[lat_index + 1] * lat_w1[:, None]
+    values = rows[:, lng_index] * lng_w0 + rows[:, lng_index + 1] * lng_w1
+
+    rgba = colormap[np.clip(np.round(values * 255), 0, 255).astype(np.uint8)]
+    if not rgba[:, :, 3].any():
+        return None
+    return rgba
+
+_worker_state = {}
+
+def _init_tile_worker(grid, lat_values, lng_values, colormap):
+    _worker_state.update(grid=grid, lat_values=lat_values, lng_values=lng_values, colormap=colormap)
+
+def _render_tile_column(out_dir, zoom, x, y_range, previous_hashes):
+    """
+    Worker: render satu kolom tile (z, x); tile yang isinya sama dengan manifest lama tidak ditulis ulang
+    """
+    tiles = {}
+    written = 0
+    for y in range(y_range[0], y_range[1] + 1):
+        rgba = render_tile(_worker_state['grid'], _worker_state['lat_values'], _worker_state['lng_values'],
+                           zoom, x, y, _worker_state['colormap'])
+        if rgba is None:
+            continue
+
+        tile_key = f"{zoom}/{x}/{y}"
+        tile_hash = hashlib.sha1(rgba.tobytes()).hexdigest()
+        tiles[tile_key] = tile_hash
+
+        path = os.path.join(out_dir, str(zoom), str(x), f"{y}.png")
+        if previous_hashes.get(tile_key) == tile_hash and os.path.exists(path):
+            continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(encode_png(rgba))
+        os.replace(tmp_path, path)
+        written += 1
+
+    return tiles, written
+
+def generate_tile_pyramid(grid, lat_values, lng_values, out_dir, min_zoom=10, max_zoom=17,
+                          max_workers=None, threshold=0.03):
+    """
+    Render grid densitas ternormalisasi (len(lat_values), len(lng_values)) menjadi piramida
+    tile PNG z/x/y di out_dir, paralel per kolom tile. manifest.json menyimpan hash sumber
+    dan hash setiap tile: jika sumber sama seluruh layer dilewati, jika berbeda hanya tile
+    yang berubah yang ditulis ulang dan tile yang kini kosong dihapus.
+    Mengembalikan statistik (tiles, written, removed, skipped).
+    """
+    grid = np.ascontiguousarray(grid, dtype=np.float64)
+    lat_values = np.asarray(lat_values, dtype=np.float64)
+    lng_values = np.asarray(lng_values, dtype=np.float64)
+
+    source = hashlib.sha256()
+    for array in (grid, lat_values, lng_values):
+        source.update(array.tobytes())
+    source.update(json.dumps([COLORMAP_VERSION, min_zoom, max_zoom, threshold]).encode())
+    source_hash = source.hexdigest()
+
+    manifest_path = os.path.join(out_dir, 'manifest.json')
+    previous = {'source': None, 'tiles': {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    if previous['source'] == source_hash:
+        return {'tiles': len(previous['tiles']), 'written': 0, 'removed': 0, 'skipped': True}
+
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = []
+    for zoom in range(min_zoom, max_zoom + 1):
+        x_range = (lng_to_tile_x(lng_values[0], zoom), lng_to_tile_x(lng_values[-1], zoom))
+        y_range = (lat_to_tile_y(lat_values[-1], zoom), lat_to_tile_y(lat_values[0], zoom))
+        for x in range(x_range[0], x_range[1] + 1):
+            prefix = f"{zoom}/{x}/"
+            column_hashes = {key: value for key, value in previous['tiles'].items() if key.startswith(prefix)}
+            tasks.append((zoom, x, y_range, column_hashes))
+
+    tiles = {}
+    written = 0
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_tile_worker,
+                             initargs=(grid, lat_values, lng_values, build_colormap(threshold))) as executor:
+        futures = [executor.submit(_render_tile_column, out_dir, zoom, x, y_range, column_hashes)
+                   for zoom, x, y_range, column_hashes in tasks]
+        for future in futures:
+            column_tiles, column_written = future.result()
+            tiles.update(column_tiles)
+            written += column_written
+
+    # Tile lama yang sekarang kosong dihapus agar tidak tampil basi
+    removed = 0
+    for tile_key in previous['tiles']:
+        if tile_key not in tiles:
+            path = os.path.join(out_dir, *tile_key.split('/')) + '.png'
+            if os.path.exists(path):
+                os.remove(path)
+                removed += 1
+
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'source': source_hash, 'tiles': tiles}, f)
+    os.replace(tmp_path, manifest_path)
+
+    return {'tiles': len(tiles), 'written': written, 'removed': removed, 'skipped': False}
@@ -0,0 +1,72 @@
+import ast
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Format kolom Lokasi yang ditulis megi4: "{'lat': -5.1, 'lng': 119.4}"
+LOKASI_PATTERN = (
+    r"^\s*\{\s*['\"]lat['\"]\s*:\s*(?P<lat>[-+0-9.eE]+)\s*,"
+    r"\s*['\"]lng['\"]\s*:\s*(?P<lng>[-+0-9.eE]+)\s*\}\s*$"
+)
+
+def _to_float64(strings):
+    """
+    Cast kolom string Arrow ke float64; nilai yang tidak bisa di-cast menjadi NaN
+    """
+    try:
+        values = pc.cast(strings, pa.float64())
+    except pa.ArrowInvalid:
+        values = pa.array(pd.to_numeric(strings.to_pandas(), errors='coerce'), type=pa.float64())
+    return values.to_numpy(zero_copy_only=False).astype(np.float64, copy=True)
+
+def _parse_lokasi_fallback(value):
+    """
+    Parse satu nilai Lokasi dengan ast.literal_eval (hanya untuk format yang tidak
+    cocok dengan LOKASI_PATTERN, mis. urutan key berbeda)
+    """
+    try:
+        lokasi_dict = ast.literal_eval(value)
+        return float(lokasi_dict['lat']), float(lokasi_dict['lng']), None
+    except Exception as e:
+        return np.nan, np.nan, f"parse error: {e}"
+
+def parse_lokasi_column(lokasi):
+    """
+    Extract lat/lng dari seluruh kolom Lokasi dalam satu pass vectorized.
+    Mengembalikan DataFrame (index sama dengan input) berisi kolom Lat, Lng,
+    Valid (mask koordinat valid) dan Error (alasan jika tidak valid).
+    """
+    lokasi = pd.Series(lokasi)
+    missing = lokasi.isna()
+    text = lokasi.where(~missing, '').astype(str)
+
+    # Regex dijalankan di Arrow compute (RE2), bukan per baris di Python
+    extracted = pc.extract_regex(pa.array(text.to_numpy(dtype=object), type=pa.string()), LOKASI_PATTERN)
+    lat = _to_float64(pc.struct_field(extracted, 'lat'))
+    lng = _to_float64(pc.struct_field(extracted, 'lng'))
+    error = np.full(len(lokasi), None, dtype=object)
+
+    # Baris yang tidak cocok dengan pola cepat: fallback per baris
+    unmatched = np.flatnonzero((np.isnan(lat) | np.isnan(lng)) & ~missing.to_numpy())
+    for position in unmatched:
+        lat[position], lng[position], error[position] = _parse_lokasi_fallback(text.iat[position])
+
+    error[missing.to_numpy()] = "missing Lokasi"
+
+    parsed = ~np.isnan(lat) & ~np.isnan(lng)
+    in_range = parsed & (np.abs(lat) <= 90) & (np.abs(lng) <= 180)
+    error[parsed & ~in_range] = "coordinates out of range"
+
+    return pd.DataFrame({
+        'Lat': lat,
+        'Lng': lng,
+        'Valid': in_range,
+        'Error': error,
+    }, index=lokasi.index)
+
+def format_lokasi(lats, lngs):
+    """
+    Bentuk kolom Lokasi (format megi4) dari array lat/lng
+    """
+    return [f"{{'lat': {lat}, 'lng': {lng}}}" for lat, lng in zip(lats, lngs)]
@@ -0,0 +1,138 @@
+from branca.element import CssLink, JavascriptLink, MacroElement
+from folium.plugins import MarkerCluster
+from jinja2 import Template
+
+# Cara menggambar marker di browser:
+# "icon"    - DivIcon per titik (tampilan asli), cocok untuk beberapa ribu titik
+# "canvas"  - L.circleMarker di satu renderer canvas, tanpa elemen DOM per titik
+# "cluster" - DivIcon dalam Leaflet.markercluster, hanya cluster/titik yang terlihat di DOM
+MARKER_RENDERERS = ("icon", "canvas", "cluster")
+
+class SharedMarkerLayers(MacroElement):
+    """
+    Marker UMKM sebagai satu array data bersama (kolumnar) di HTML; setiap layer hanya
+    berisi daftar index ke array tersebut (None = semua titik). Marker, tooltip dan
+    popup dibuat di browser, popup baru dirender saat dibuka.
+    payload: dict kolom lat, lng, name, alamat, rating, reviews, color (index ke
+    icon_colors), price (index ke price_labels/price_colors), plus tabel warna/label.
+    layers: list (FeatureGroup, indices).
+    renderer: salah satu MARKER_RENDERERS.
+    """
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var poi = {{ this.payload|tojson }};
+
+            var icons = poi.icon_colors.map(function(color) {
+                return L.divIcon({
+                    html: '<div style="transform: scale(0.75); transform-origin: center bottom;">'
+                        + '<i class="fa fa-map-marker" style="color: ' + color + '; font-size: 30px; '
+                        + 'text-shadow: 1px 1px 1px rgba(0,0,0,0.5);"></i></div>',
+                    iconSize: [25, 35],
+                    iconAnchor: [12, 35],
+                    className: 'custom-marker'
+                });
+            });
+
+            function escapeHtml(text) {
+                return String(text).replace(/&/g, '&amp;').replace(/</g, '&lt;')
+                    .replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+            }
+
+            function tooltipText(i) {
+                return escapeHtml(poi.name[i]) + ' - Rating: ' + poi.rating[i].toFixed(1) + ' - Reviews: '
+                    + poi.reviews[i] + ' - Harga: ' + poi.price_labels[poi.price[i]];
+            }
+
+            function popupHtml(i) {
+                var name = escapeHtml(poi.name[i]);
+                var url = 'https://www.google.com/maps/search/?api=1&query=' + poi.lat[i] + ',' + poi.lng[i]
+                    + '+' + escapeHtml(poi.name[i].replace(/ /g, '+').replace(/,/g, ''));
+                return '<div style="width: 300px; font-family: Arial, sans-serif;">'
+                    + '<div style="background: #4285f4; color: white; padding: 12px; margin: -9px -9px 12px -9px;">'
+                    + '<h3 style="margin: 0; font-size: 16px;">' + name + '</h3></div>'
+                    + '<div style="padding: 0 8px;">'
+                    + '<p style="margin: 8px 0;"><strong>Alamat:</strong><br>' + escapeHtml(poi.alamat[i]) + '</p>'
+                    + '<div style="display: flex; justify-content: space-between; margin: 12px 0;">'
+                    + '<div style="text-align: center; flex: 1;"><div style="font-size: 20px; font-weight: bold; color: #ff6b6b;">'
+                    + poi.rating[i].toFixed(1) + '</div><div style="font-size: 12px;">Rating</div></div>'
+                    + '<div style="text-align: center; flex: 1;"><div style="font-size: 16px; font-weight: bold; color: #4ecdc4;">'
+                    + poi.reviews[i] + '</div><div style="font-size: 12px;">Reviews</div></div>'
+                    + '<div style="text-align: center; flex: 1;"><div style="font-size: 16px; font-weight: bold; color: '
+                    + poi.price_colors[poi.price[i]] + ';">' + poi.price_labels[poi.price[i]]
+                    + '</div><div style="font-size: 12px;">Harga</div></div></div>'
+                    + '<div style="background: #f8f9fa; padding: 8px; border-radius: 5px; margin: 10px 0;">'
+                    + '<p style="margin: 0; font-size: 12px; color: #666;"><strong>Koordinat:</strong> '
+                    + poi.lat[i].toFixed(6) + ', ' + poi.lng[i].toFixed(6) + '</p></div></div>'
+                    + '<div style="text-align: center; margin-top: 15px;">'
+                    + '<a href="' + url + '" target="_blank" style="background: #4285f4; color: white; padding: 10px 20px; '
+                    + 'text-decoration: none; border-radius: 5px; font-weight: bold; display: inline-block; width: 80%;">'
+                    + 'Buka di Google Maps</a></div></div>';
+            }
+
+            {% if this.renderer == "canvas" %}
+            var canvasRenderer = L.canvas({padding: 0.5});
+            {% endif %}
+
+            function createMarker(i) {
+                {% if this.renderer == "canvas" %}
+                var marker = L.circleMarker([poi.lat[i], poi.lng[i]], {
+                    renderer: canvasRenderer,
+                    radius: 5,
+                    color: '#ffffff',
+                    weight: 1,
+                    fillColor: poi.icon_colors[poi.color[i]],
+                    fillOpacity: 0.9
+                });
+                {% else %}
+                var marker = L.marker([poi.lat[i], poi.lng[i]], {icon: icons[poi.color[i]]});
+                {% endif %}
+                // Tooltip dan popup dibuat saat pertama kali ditampilkan
+                return marker
+                    .bindTooltip(tooltipText.bind(null, i))
+                    .bindPopup(popupHtml.bind(null, i), {maxWidth: 340});
+            }
+
+            function addMarkers(layer, indices) {
+                var count = indices === null ? poi.lat.length : indices.length;
+                var markers = new Array(count);
+                for (var k = 0; k < count; k++) {
+                    markers[k] = createMarker(indices === null ? k : indices[k]);
+                }
+                {% if this.renderer == "cluster" %}
+                var cluster = L.markerClusterGroup({chunkedLoading: true});
+                cluster.addLayers(markers);
+                cluster.addTo(layer);
+                {% else %}
+                for (var k = 0; k < count; k++) {
+                    layer.addLayer(markers[k]);
+                }
+                {% endif %}
+            }
+
+            {% for layer, indices in this.layers %}
+            addMarkers({{ layer.get_name() }}, {{ indices|tojson }});
+            {% endfor %}
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, payload, layers, renderer="icon"):
+        if renderer not in MARKER_RENDERERS:
+            raise ValueError(f"renderer harus salah satu dari {MARKER_RENDERERS}, bukan {renderer!r}")
+        super().__init__()
+        self._name = 'SharedMarkerLayers'
+        self.payload = payload
+        self.layers = layers
+        self.renderer = renderer
+
+    def render(self, **kwargs):
+        # Mode cluster butuh JS/CSS Leaflet.markercluster (versi yang sama dengan plugin folium)
+        if self.renderer == "cluster":
+            figure = self.get_root()
+            for name, url in MarkerCluster.default_js:
+                figure.header.add_child(JavascriptLink(url), name=name)
+            for name, url in MarkerCluster.default_css:
+                figure.header.add_child(CssLink(url), name=name)
+        super().render(**kwargs)
@@ -1,57 +1,102 @@
-import requests
 import json
 import csv
+import re
 import random
+import numpy as np
+import shapely
+from shapely.geometry import shape
+import os
+import hashlib
+import codecs
+import itertools
+import sqlite3
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from columnar_io import rows_to_table, write_columnar, open_columnar_writer
+from http_resilience import ResilientSession, AIMDLimiter, CircuitBreaker
 
-def query_osm_makassar():
+# Overpass API endpoint (bisa diarahkan ke server lokal untuk pengujian)
+OVERPASS_URL = "http://overpass-api.de/api/interpreter"
+
+# Format: south, west, north, east - mencakup seluruh Kota Makassar
+MAKASSAR_BBOX = (-5.28, 119.35, -5.05, 119.55)
+
+# Checkpoint tile Overpass hanya untuk melanjutkan run yang gagal di tengah jalan:
+# dihapus setelah semua tile berhasil, dan checkpoint yang lebih tua dari ini diabaikan
+OVERPASS_CHECKPOINT_MAX_AGE = 6 * 3600
+
+# Mode ingestion: "single" (satu query besar), "tiled" (per tile, paralel)
+# "stream" (parse response inkremental, tulis CSV per baris) atau
+# "incremental" (hanya delta terhadap snapshot Place_ID sebelumnya)
+INGESTION_MODE = "tiled"
+
+# Mode atribut sintetis: "sequential" (random.seed per element, perilaku lama),
+# "batch" (NumPy, semua element sekaligus) atau "stable" (diturunkan dari
+# Place_ID, tidak tergantung urutan element)
+SYNTHETIC_MODE = "sequential"
+
+# Polygon kecamatan (GeoJSON lokal) untuk menentukan kolom Area
+KECAMATAN_GEOJSON = "C:/Users/ASUS/OneDrive/Documents/Skripsi_Megi/skripsi_baru/kecamatan_makassar.geojson"
+KECAMATAN_NAME_FIELDS = ('kecamatan', 'KECAMATAN', 'WADMKC', 'NAMOBJ', 'name', 'NAME_3')
+
+# Snapshot Place_ID -> version/timestamp untuk mode incremental
+SNAPSHOT_DB = "C:/Users/ASUS/OneDrive/Documents/Skripsi_Megi/skripsi_baru/osm_snapshot.sqlite"
+
+# Jenis UMKM kuliner yang diambil (tanpa pub)
+AMENITY_TYPES = ['restaurant', 'cafe', 'food_court', 'fast_food', 'bar',
+                 'ice_cream', 'juice_bar']
+NODE_SHOP_TYPES = ['bakery', 'confectionery', 'coffee', 'tea', 'pastry',
+                   'chocolate', 'dairy']
+WAY_SHOP_TYPES = ['bakery', 'confectionery', 'coffee', 'tea', 'pastry',
+                  'chocolate']
+
+def overpass_session(max_concurrency=4):
+    """
+    Session Overpass dengan concurrency adaptif (maksimum max_concurrency request
+    paralel), Retry-After/backoff berjitter dan circuit breaker
+    """
+    return ResilientSession(
+        "Overpass",
+        limiter=AIMDLimiter(initial=min(2, max_concurrency), maximum=max_concurrency),
+        breaker=CircuitBreaker(failure_threshold=4, reset_timeout=60.0),
+        max_retries=4, base_delay=5.0, max_delay=120.0)
+
+def build_overpass_query(bbox, timeout=90, meta=False):
+    """
+    Bangun query Overpass untuk satu bbox dengan regex tag filter
+    (satu klausa per key, bukan satu klausa per nilai tag).
+    meta=True meminta version/timestamp element untuk mode incremental.
+    """
+    bbox_str = ','.join(f"{value:.6f}" for value in bbox)
+    amenity_regex = '|'.join(AMENITY_TYPES)
+    node_shop_regex = '|'.join(NODE_SHOP_TYPES)
+    way_shop_regex = '|'.join(WAY_SHOP_TYPES)
+    
+    return f"""
+    [out:json][timeout:{timeout}];
+    (
+      node["amenity"~"^({amenity_regex})$"]({bbox_str});
+      node["shop"~"^({node_shop_regex})$"]({bbox_str});
+      way["amenity"~"^({amenity_regex})$"]({bbox_str});
+      way["shop"~"^({way_shop_regex})$"]({bbox_str});
+    );
+    out {'meta ' if meta else ''}center geom;
+    """
+
+def query_osm_makassar(overpass_url=OVERPASS_URL, http=None):
     """
     Query OpenStreetMap untuk data UMKM kuliner di Makassar dengan coverage area yang diperluas
     """
     print("Mengambil data UMKM kuliner dari OpenStreetMap (Extended Coverage)...")
     
-    # Overpass API endpoint
-    overpass_url = "http://overpass-api.de/api/interpreter"
-    
     # Query khusus untuk UMKM kuliner di Makassar
     # Fokus pada tempat makan dan minuman, tanpa pub
-    # Format: south, west, north, east
-    # Coverage: (-5.28,119.35,-5.05,119.55) - mencakup seluruh Kota Makassar
-    query = """
-    [out:json][timeout:90];
-    (
-      node["amenity"="restaurant"](-5.28,119.35,-5.05,119.55);
-      node["amenity"="cafe"](-5.28,119.35,-5.05,119.55);
-      node["amenity"="food_court"](-5.28,119.35,-5.05,119.55);
-      node["amenity"="fast_food"](-5.28,119.35,-5.05,119.55);
-      node["amenity"="bar"](-5.28,119.35,-5.05,119.55);
-      node["amenity"="ice_cream"](-5.28,119.35,-5.05,119.55);
-      node["amenity"="juice_bar"](-5.28,119.35,-5.05,119.55);
-      node["shop"="bakery"](-5.28,119.35,-5.05,119.55);
-      node["shop"="confectionery"](-5.28,119.35,-5.05,119.55);
-      node["shop"="coffee"](-5.28,119.35,-5.05,119.55);
-      node["shop"="tea"](-5.28,119.35,-5.05,119.55);
-      node["shop"="pastry"](-5.28,119.35,-5.05,119.55);
-      node["shop"="chocolate"](-5.28,119.35,-5.05,119.55);
-      node["shop"="dairy"](-5.28,119.35,-5.05,119.55);
-      way["amenity"="restaurant"](-5.28,119.35,-5.05,119.55);
-      way["amenity"="cafe"](-5.28,119.35,-5.05,119.55);
-      way["amenity"="food_court"](-5.28,119.35,-5.05,119.55);
-      way["amenity"="fast_food"](-5.28,119.35,-5.05,119.55);
-      way["amenity"="bar"](-5.28,119.35,-5.05,119.55);
-      way["amenity"="ice_cream"](-5.28,119.35,-5.05,119.55);
-      way["amenity"="juice_bar"](-5.28,119.35,-5.05,119.55);
-      way["shop"="bakery"](-5.28,119.35,-5.05,119.55);
-      way["shop"="confectionery"](-5.28,119.35,-5.05,119.55);
-      way["shop"="coffee"](-5.28,119.35,-5.05,119.55);
-      way["shop"="tea"](-5.28,119.35,-5.05,119.55);
-      way["shop"="pastry"](-5.28,119.35,-5.05,119.55);
-      way["shop"="chocolate"](-5.28,119.35,-5.05,119.55);
-    );
-    out center geom;
-    """
+    query = build_overpass_query(MAKASSAR_BBOX, timeout=90)
+    http = http or overpass_session(max_concurrency=1)
     
     try:
-        response = requests.post(overpass_url, data=query, timeout=150)
+        response = http.post(overpass_url, data=query, timeout=150)
         
         if response.status_code == 200:
             data = response.json()
@@ -72,35 +117,289 @@ def query_osm_makassar():
         print(f"Error mengambil data: {e}")
         return []
 
+def split_bbox(bbox, tile_rows, tile_cols):
+    """
+    Bagi bbox (south, west, north, east) menjadi grid tile_rows x tile_cols
+    """
+    south, west, north, east = bbox
+    lat_step = (north - south) / tile_rows
+    lng_step = (east - west) / tile_cols
+    
+    tiles = []
+    for row in range(tile_rows):
+        for col in range(tile_cols):
+            tile_bbox = (
+                south + row * lat_step,
+                west + col * lng_step,
+                north if row == tile_rows - 1 else south + (row + 1) * lat_step,
+                east if col == tile_cols - 1 else west + (col + 1) * lng_step,
+            )
+            tiles.append((f"r{row}_c{col}", tile_bbox))
+    
+    return tiles
+
+def tile_checkpoint_path(checkpoint_dir, tile_id, query):
+    """
+    Path file checkpoint untuk satu tile; hash query ikut di nama file
+    supaya checkpoint lama tidak dipakai jika bbox/filter berubah
+    """
+    query_hash = hashlib.sha1(query.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(checkpoint_dir, f"tile_{tile_id}_{query_hash}.json")
+
+def fetch_overpass_tile(tile_id, tile_bbox, overpass_url=OVERPASS_URL,
+                        checkpoint_dir=None, server_timeout=60, client_timeout=90, meta=False,
+                        http=None, checkpoint_max_age=OVERPASS_CHECKPOINT_MAX_AGE):
+    """
+    Ambil satu tile dari Overpass, atau dari checkpoint jika tile sudah selesai di run
+    yang gagal sebelumnya (dan umurnya belum lewat checkpoint_max_age detik)
+    """
+    query = build_overpass_query(tile_bbox, timeout=server_timeout, meta=meta)
+    checkpoint_file = None
+    
+    if checkpoint_dir:
+        checkpoint_file = tile_checkpoint_path(checkpoint_dir, tile_id, query)
+        if (os.path.exists(checkpoint_file)
+                and time.time() - os.path.getmtime(checkpoint_file) <= checkpoint_max_age):
+            with open(checkpoint_file, 'r', encoding='utf-8') as f:
+                return json.load(f)['elements'], True
+    
+    http = http or overpass_session(max_concurrency=1)
+    response = http.post(overpass_url, data=query, timeout=client_timeout)
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code}")
+    
+    elements = response.json()['elements']
+    
+    if checkpoint_file:
+        # Tulis ke file sementara lalu rename agar checkpoint tidak pernah setengah jadi
+        tmp_file = checkpoint_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'tile_id': tile_id, 'bbox': list(tile_bbox), 'elements': elements}, f)
+        os.replace(tmp_file, checkpoint_file)
+    
+    return elements, False
+
+def query_osm_makassar_tiled(bbox=MAKASSAR_BBOX, tile_rows=3, tile_cols=3, max_workers=4,
+                             checkpoint_dir="overpass_checkpoints", overpass_url=OVERPASS_URL,
+                             server_timeout=60, client_timeout=90, allow_partial=False, meta=False,
+                             checkpoint_max_age=OVERPASS_CHECKPOINT_MAX_AGE):
+    """
+    Query OpenStreetMap per tile secara paralel dengan checkpoint per tile.
+    Jika ada tile yang gagal, tile yang sudah selesai tetap di disk sehingga rerun hanya
+    mengambil ulang tile yang gagal. Setelah semua tile berhasil checkpoint dihapus, jadi
+    run berikutnya selalu mengambil data baru dari Overpass.
+    max_workers adalah batas atas; jumlah request paralel sebenarnya menyesuaikan respons server.
+    """
+    tiles = split_bbox(bbox, tile_rows, tile_cols)
+    print(f"Mengambil data UMKM kuliner dari OpenStreetMap ({len(tiles)} tile, {max_workers} workers)...")
+    
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+    
+    tile_results = {}
+    failed_tiles = []
+    from_checkpoint = 0
+    http = overpass_session(max_concurrency=max_workers)
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        future_to_tile = {
+            executor.submit(fetch_overpass_tile, tile_id, tile_bbox, overpass_url,
+                            checkpoint_dir, server_timeout, client_timeout, meta, http,
+                            checkpoint_max_age): tile_id
+            for tile_id, tile_bbox in tiles
+        }
+        
+        for future in as_completed(future_to_tile):
+            tile_id = future_to_tile[future]
+            try:
+                elements, cached = future.result()
+            except Exception as e:
+                print(f"  Tile {tile_id} gagal: {e}")
+                failed_tiles.append(tile_id)
+                continue
+            
+            if cached:
+                from_checkpoint += 1
+            print(f"  Tile {tile_id}: {len(elements)} elemen{' (checkpoint)' if cached else ''}")
+            tile_results[tile_id] = elements
+    
+    print(f"Tile selesai: {len(tiles) - len(failed_tiles)}/{len(tiles)} "
+          f"({from_checkpoint} dari checkpoint, concurrency akhir {int(http.limiter.limit)})")
+    
+    if failed_tiles:
+        print(f"Tile gagal: {', '.join(sorted(failed_tiles))} - jalankan ulang untuk mengambil tile tersebut")
+        if not allow_partial:
+            return []
+    elif checkpoint_dir:
+        # Semua tile selesai: checkpoint tidak diperlukan lagi untuk resume
+        for tile_id, tile_bbox in tiles:
+            checkpoint_file = tile_checkpoint_path(
+                checkpoint_dir, tile_id, build_overpass_query(tile_bbox, timeout=server_timeout, meta=meta))
+            if os.path.exists(checkpoint_file):
+                os.remove(checkpoint_file)
+    
+    # Gabungkan dalam urutan tile (bukan urutan selesai) agar output deterministik.
+    # Elemen di perbatasan tile bisa muncul di dua tile.
+    elements_by_key = {}
+    for tile_id, _ in tiles:
+        for element in tile_results.get(tile_id, []):
+            elements_by_key.setdefault((element['type'], element['id']), element)
+    
+    print(f"Berhasil mengambil {len(elements_by_key)} tempat kuliner dari OSM")
+    return list(elements_by_key.values())
+
+def iter_json_array_items(chunks, key='elements'):
+    """
+    Parse JSON secara inkremental dan yield setiap item dari array `key` satu per satu,
+    tanpa pernah memuat seluruh response ke memori.
+    Return sisa teks setelah array; ValueError jika stream habis sebelum array ditutup.
+    """
+    decoder = json.JSONDecoder()
+    utf8_decoder = codecs.getincrementaldecoder('utf-8')()
+    marker = f'"{key}"'
+    buffer = ''
+    pos = 0
+    in_array = False
+    
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = utf8_decoder.decode(chunk)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        
+        if not in_array:
+            # Cari awal array: "elements" : [
+            key_pos = buffer.find(marker)
+            if key_pos == -1:
+                # Sisakan ekor buffer jika marker terpotong di antara chunk
+                pos = max(0, len(buffer) - len(marker))
+                continue
+            bracket_pos = buffer.find('[', key_pos + len(marker))
+            if bracket_pos == -1:
+                pos = key_pos
+                continue
+            pos = bracket_pos + 1
+            in_array = True
+        
+        while True:
+            # Lewati whitespace dan koma di antara item
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == ']':
+                return buffer[pos + 1:]
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Item belum lengkap, tunggu chunk berikutnya
+                break
+            yield item
+            pos = end
+    
+    raise ValueError(f"Response terpotong: array '{key}' tidak lengkap")
+
+def query_osm_streaming(bbox=MAKASSAR_BBOX, overpass_url=OVERPASS_URL,
+                        server_timeout=180, client_timeout=300, chunk_size=65536, http=None):
+    """
+    Query OpenStreetMap dan yield element satu per satu selagi response diterima.
+    Cocok untuk bbox besar (mis. seluruh Sulawesi Selatan).
+    Error HTTP, response terpotong, atau `remark` error dari Overpass (mis. timeout
+    di server setelah sebagian element terkirim) di-raise, bukan diam-diam berhenti.
+    """
+    print("Mengambil data UMKM kuliner dari OpenStreetMap (streaming)...")
+    query = build_overpass_query(bbox, timeout=server_timeout)
+    
+    http = http or overpass_session(max_concurrency=1)
+    
+    with http.post(overpass_url, data=query, timeout=client_timeout, stream=True) as response:
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        
+        chunks = response.iter_content(chunk_size=chunk_size)
+        tail = yield from iter_json_array_items(chunks)
+        tail += b''.join(chunks).decode('utf-8', errors='replace')
+        
+        remark = re.search(r'"remark"\s*:\s*"((?:[^"\\]|\\.)*)"', tail)
+        if remark and 'error' in remark.group(1).lower():
+            raise RuntimeError(f"Overpass: {remark.group(1)}")
+
+# Range rating rata-rata untuk setiap jenis UMKM kuliner
+RATING_RANGES = {
+    'restaurant': (3.5, 4.8),
+    'cafe': (3.8, 4.7),
+    'food_court': (3.2, 4.2),
+    'fast_food': (3.0, 4.0),
+    'bar': (3.3, 4.5),
+    'ice_cream': (3.6, 4.5),
+    'juice_bar': (3.4, 4.3),
+    'bakery': (3.8, 4.6),
+    'confectionery': (3.9, 4.7),
+    'coffee': (3.7, 4.5),
+    'tea': (3.5, 4.4),
+    'pastry': (3.8, 4.6),
+    'chocolate': (4.0, 4.8),
+    'dairy': (3.3, 4.2),
+}
+DEFAULT_RATING_RANGE = (3.0, 4.5)
+
+# Base jumlah user ratings berdasarkan jenis UMKM kuliner
+USER_RATING_BASES = {
+    'restaurant': (80, 400),
+    'cafe': (50, 250),
+    'food_court': (100, 500),
+    'fast_food': (120, 600),
+    'bar': (30, 180),
+    'ice_cream': (40, 200),
+    'juice_bar': (30, 150),
+    'bakery': (40, 200),
+    'confectionery': (35, 180),
+    'coffee': (60, 300),
+    'tea': (25, 120),
+    'pastry': (30, 150),
+    'chocolate': (20, 100),
+    'dairy': (15, 80),
+}
+DEFAULT_USER_RATING_BASE = (20, 150)
+
+# Multiplier user ratings per band rating: (rating minimum, (min, max))
+RATING_MULTIPLIER_BANDS = [
+    (4.5, (1.8, 3.5)),
+    (4.0, (1.2, 2.2)),
+    (3.5, (0.8, 1.5)),
+    (None, (0.3, 1.0)),
+]
+
+# Persentase price level [0, 1, 2, 3] per jenis UMKM kuliner
+PRICE_LEVEL_DISTRIBUTIONS = {
+    'restaurant': [10, 30, 40, 20],
+    'cafe': [15, 60, 25, 0],
+    'food_court': [40, 60, 0, 0],
+    'fast_food': [60, 40, 0, 0],
+    'bar': [0, 20, 60, 20],
+    'ice_cream': [30, 60, 10, 0],
+    'juice_bar': [40, 50, 10, 0],
+    'bakery': [20, 70, 10, 0],
+    'confectionery': [15, 70, 15, 0],
+    'coffee': [10, 70, 20, 0],
+    'tea': [25, 65, 10, 0],
+    'pastry': [20, 60, 20, 0],
+    'chocolate': [10, 40, 40, 10],
+    'dairy': [50, 40, 10, 0],
+}
+DEFAULT_PRICE_LEVEL_DISTRIBUTION = [25, 50, 25, 0]
+
 def generate_rating_by_type(amenity_type, shop_type=None):
     """
     Generate rating berdasarkan jenis UMKM kuliner
     """
-    # Rating rata-rata untuk setiap jenis UMKM kuliner
-    rating_map = {
-        'restaurant': (3.5, 4.8),
-        'cafe': (3.8, 4.7),
-        'food_court': (3.2, 4.2),
-        'fast_food': (3.0, 4.0),
-        'bar': (3.3, 4.5),
-        'ice_cream': (3.6, 4.5),
-        'juice_bar': (3.4, 4.3),
-        'bakery': (3.8, 4.6),
-        'confectionery': (3.9, 4.7),
-        'coffee': (3.7, 4.5),
-        'tea': (3.5, 4.4),
-        'pastry': (3.8, 4.6),
-        'chocolate': (4.0, 4.8),
-        'dairy': (3.3, 4.2),
-    }
-    
     # Pilih range rating
-    if amenity_type in rating_map:
-        min_rating, max_rating = rating_map[amenity_type]
-    elif shop_type in rating_map:
-        min_rating, max_rating = rating_map[shop_type]
+    if amenity_type in RATING_RANGES:
+        min_rating, max_rating = RATING_RANGES[amenity_type]
+    elif shop_type in RATING_RANGES:
+        min_rating, max_rating = RATING_RANGES[shop_type]
     else:
-        min_rating, max_rating = (3.0, 4.5)
+        min_rating, max_rating = DEFAULT_RATING_RANGE
     
     # Generate rating random dalam range
     rating = random.uniform(min_rating, max_rating)
@@ -112,35 +411,13 @@ def generate_user_ratings(rating, place_type):
     """
     Generate jumlah user ratings berdasarkan rating dan jenis UMKM kuliner
     """
-    # Base multiplier berdasarkan jenis UMKM kuliner
-    type_multipliers = {
-        'restaurant': (80, 400),
-        'cafe': (50, 250),
-        'food_court': (100, 500),
-        'fast_food': (120, 600),
-        'bar': (30, 180),
-        'ice_cream': (40, 200),
-        'juice_bar': (30, 150),
-        'bakery': (40, 200),
-        'confectionery': (35, 180),
-        'coffee': (60, 300),
-        'tea': (25, 120),
-        'pastry': (30, 150),
-        'chocolate': (20, 100),
-        'dairy': (15, 80),
-    }
-    
-    min_base, max_base = type_multipliers.get(place_type, (20, 150))
+    min_base, max_base = USER_RATING_BASES.get(place_type, DEFAULT_USER_RATING_BASE)
     
     # Rating multiplier
-    if rating >= 4.5:
-        multiplier = random.uniform(1.8, 3.5)
-    elif rating >= 4.0:
-        multiplier = random.uniform(1.2, 2.2)
-    elif rating >= 3.5:
-        multiplier = random.uniform(0.8, 1.5)
-    else:
-        multiplier = random.uniform(0.3, 1.0)
+    for min_band_rating, (min_multiplier, max_multiplier) in RATING_MULTIPLIER_BANDS:
+        if min_band_rating is None or rating >= min_band_rating:
+            multiplier = random.uniform(min_multiplier, max_multiplier)
+            break
     
     base_count = random.randint(min_base, max_base)
     final_count = int(base_count * multiplier)
@@ -152,25 +429,7 @@ def generate_price_level(place_type):
     """
     Generate price level berdasarkan jenis UMKM kuliner
     """
-    price_levels = {
-        'restaurant': [10, 30, 40, 20],    # [0, 1, 2, 3] percentages
-        'cafe': [15, 60, 25, 0],
-        'food_court': [40, 60, 0, 0],
-        'fast_food': [60, 40, 0, 0],
-        'bar': [0, 20, 60, 20],
-        'ice_cream': [30, 60, 10, 0],
-        'juice_bar': [40, 50, 10, 0],
-        'bakery': [20, 70, 10, 0],
-        'confectionery': [15, 70, 15, 0],
-        'coffee': [10, 70, 20, 0],
-        'tea': [25, 65, 10, 0],
-        'pastry': [20, 60, 20, 0],
-        'chocolate': [10, 40, 40, 10],
-        'dairy': [50, 40, 10, 0],
-    }
-    
-    # Default distribution
-    distribution = price_levels.get(place_type, [25, 50, 25, 0])
+    distribution = PRICE_LEVEL_DISTRIBUTIONS.get(place_type, DEFAULT_PRICE_LEVEL_DISTRIBUTION)
     
     # Weighted random choice
     rand_num = random.randint(1, 100)
@@ -183,6 +442,155 @@ def generate_price_level(place_type):
     
     return 1  # Default
 
+# Tabel parameter per jenis tempat untuk generator batch (NumPy).
+# Indeks terakhir (len(SYNTHETIC_PLACE_TYPES)) dipakai untuk jenis yang tidak dikenal.
+SYNTHETIC_PLACE_TYPES = sorted(RATING_RANGES)
+_SYNTHETIC_TYPE_ARRAY = np.array(SYNTHETIC_PLACE_TYPES)
+_RATING_TABLE = np.array(
+    [RATING_RANGES[t] for t in SYNTHETIC_PLACE_TYPES] + [DEFAULT_RATING_RANGE], dtype=np.float64)
+_USER_BASE_TABLE = np.array(
+    [USER_RATING_BASES.get(t, DEFAULT_USER_RATING_BASE) for t in SYNTHETIC_PLACE_TYPES]
+    + [DEFAULT_USER_RATING_BASE], dtype=np.int64)
+_PRICE_CUMULATIVE_TABLE = np.cumsum(np.array(
+    [PRICE_LEVEL_DISTRIBUTIONS.get(t, DEFAULT_PRICE_LEVEL_DISTRIBUTION) for t in SYNTHETIC_PLACE_TYPES]
+    + [DEFAULT_PRICE_LEVEL_DISTRIBUTION], dtype=np.int64), axis=1)
+
+# Band multiplier diurutkan naik: threshold rating dan (min, max) per band
+_MULTIPLIER_THRESHOLDS = np.array(
+    sorted(band for band, _ in RATING_MULTIPLIER_BANDS if band is not None))
+_MULTIPLIER_TABLE = np.array(
+    [dict(RATING_MULTIPLIER_BANDS)[None]]
+    + [dict(RATING_MULTIPLIER_BANDS)[band] for band in _MULTIPLIER_THRESHOLDS], dtype=np.float64)
+
+def encode_place_types(place_types):
+    """
+    Ubah array nama jenis tempat menjadi indeks tabel parameter (tanpa loop Python)
+    """
+    values = np.asarray(place_types, dtype=str)
+    codes = np.searchsorted(_SYNTHETIC_TYPE_ARRAY, values)
+    codes = np.minimum(codes, len(SYNTHETIC_PLACE_TYPES) - 1)
+    known = _SYNTHETIC_TYPE_ARRAY[codes] == values
+    return np.where(known, codes, len(SYNTHETIC_PLACE_TYPES))
+
+def synthesize_from_uniforms(rating_codes, place_codes, u_rating, u_multiplier, u_base, u_price):
+    """
+    Hitung Rating, User_Ratings_Total, dan Price_Level dari bilangan uniform [0, 1).
+    Distribusinya sama dengan generate_rating_by_type, generate_user_ratings,
+    dan generate_price_level.
+    """
+    # Rating: uniform dalam range per jenis, dibulatkan 1 desimal
+    rating_range = _RATING_TABLE[rating_codes]
+    ratings = np.round(rating_range[:, 0] + (rating_range[:, 1] - rating_range[:, 0]) * u_rating, 1)
+    
+    # Multiplier berdasarkan band rating
+    band_codes = np.searchsorted(_MULTIPLIER_THRESHOLDS, ratings, side='right')
+    multiplier_range = _MULTIPLIER_TABLE[band_codes]
+    multipliers = multiplier_range[:, 0] + (multiplier_range[:, 1] - multiplier_range[:, 0]) * u_multiplier
+    
+    # Base count: integer uniform inklusif [min_base, max_base]
+    base_range = _USER_BASE_TABLE[place_codes]
+    base_counts = base_range[:, 0] + np.floor(
+        u_base * (base_range[:, 1] - base_range[:, 0] + 1)).astype(np.int64)
+    user_ratings = np.minimum((base_counts * multipliers).astype(np.int64), 999)
+    
+    # Price level: angka 1-100 dibandingkan dengan persentase kumulatif
+    rand_nums = np.floor(u_price * 100).astype(np.int64) + 1
+    cumulative = _PRICE_CUMULATIVE_TABLE[place_codes]
+    price_levels = np.zeros(len(rand_nums), dtype=np.int8)
+    for level in range(cumulative.shape[1]):
+        price_levels += cumulative[:, level] < rand_nums
+    price_levels[price_levels > 3] = 1
+    
+    return {
+        'Rating': ratings,
+        'User_Ratings_Total': user_ratings,
+        'Price_Level': price_levels,
+    }
+
+def generate_synthetic_batch(amenity_types, shop_types, seed=42):
+    """
+    Generate Rating, User_Ratings_Total, dan Price_Level untuk banyak tempat sekaligus.
+    Setiap kolom memakai stream Generator sendiri yang diturunkan dari seed.
+    """
+    amenity_types = np.asarray(amenity_types, dtype=str)
+    shop_types = np.asarray(shop_types, dtype=str)
+    
+    amenity_codes = encode_place_types(amenity_types)
+    shop_codes = encode_place_types(shop_types)
+    unknown = len(SYNTHETIC_PLACE_TYPES)
+    
+    # Rating: amenity dulu, lalu shop; jenis tempat: amenity jika ada, selain itu shop
+    rating_codes = np.where(amenity_codes != unknown, amenity_codes, shop_codes)
+    place_codes = np.where(amenity_types != '', amenity_codes, shop_codes)
+    
+    n = len(amenity_types)
+    rating_rng, multiplier_rng, base_rng, price_rng = [
+        np.random.Generator(np.random.PCG64(child))
+        for child in np.random.SeedSequence(seed).spawn(4)
+    ]
+    
+    return synthesize_from_uniforms(
+        rating_codes, place_codes,
+        rating_rng.random(n), multiplier_rng.random(n),
+        base_rng.random(n), price_rng.random(n),
+    )
+
+def place_id_keys(place_ids, seed=42):
+    """
+    Kunci 64-bit yang stabil untuk setiap Place_ID (tidak tergantung PYTHONHASHSEED)
+    """
+    keys = np.empty(len(place_ids), dtype=np.uint64)
+    for i, place_id in enumerate(place_ids):
+        digest = hashlib.blake2b(f"{seed}:{place_id}".encode('utf-8'), digest_size=8).digest()
+        keys[i] = int.from_bytes(digest, 'little')
+    return keys
+
+def counter_uniforms(keys, counter):
+    """
+    RNG berbasis counter (SplitMix64): bilangan uniform [0, 1) yang hanya bergantung
+    pada (kunci, counter), sehingga setiap POI punya stream acak sendiri
+    """
+    with np.errstate(over='ignore'):
+        z = keys + np.uint64(0x9E3779B97F4A7C15) * np.uint64(counter + 1)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+def generate_stable_attributes_batch(place_ids, amenity_types, shop_types, seed=42):
+    """
+    Generate Rating, User_Ratings_Total, dan Price_Level yang hanya bergantung pada
+    Place_ID dan jenis tempat. Hasilnya identik apa pun urutan, sharding, atau
+    jumlah element lain dalam satu run.
+    """
+    amenity_types = np.asarray(amenity_types, dtype=str)
+    shop_types = np.asarray(shop_types, dtype=str)
+    
+    amenity_codes = encode_place_types(amenity_types)
+    shop_codes = encode_place_types(shop_types)
+    unknown = len(SYNTHETIC_PLACE_TYPES)
+    
+    rating_codes = np.where(amenity_codes != unknown, amenity_codes, shop_codes)
+    place_codes = np.where(amenity_types != '', amenity_codes, shop_codes)
+    
+    keys = place_id_keys(place_ids, seed=seed)
+    
+    return synthesize_from_uniforms(
+        rating_codes, place_codes,
+        counter_uniforms(keys, 0), counter_uniforms(keys, 1),
+        counter_uniforms(keys, 2), counter_uniforms(keys, 3),
+    )
+
+def generate_stable_attributes(place_id, amenity_type, shop_type='', seed=42):
+    """
+    Versi satu tempat dari generate_stable_attributes_batch.
+    Mengembalikan (rating, user_ratings_total, price_level).
+    """
+    attributes = generate_stable_attributes_batch([place_id], [amenity_type], [shop_type], seed=seed)
+    return (float(attributes['Rating'][0]),
+            int(attributes['User_Ratings_Total'][0]),
+            int(attributes['Price_Level'][0]))
+
 def get_area_name(lat, lng):
     """
     Tentukan nama area berdasarkan koordinat untuk alamat yang lebih spesifik
@@ -217,9 +625,104 @@ def get_area_name(lat, lng):
         else:
             return "Makassar Selatan"
 
-def process_osm_element(element):
+# Band lat/lng lama; dipakai jika polygon kecamatan tidak tersedia atau titik di luar polygon
+_AREA_BAND_LNG = np.array([119.40, 119.45, 119.50])
+_AREA_BAND_LAT = np.array([-5.18, -5.12])
+_AREA_BAND_NAMES = np.array([
+    # lat < -5.18, -5.18 <= lat < -5.12, lat >= -5.12
+    ["Makassar Selatan", "Makassar Tengah", "Makassar Utara"],   # lng < 119.40
+    ["Panakkukang", "Rappocini", "Tallo"],                       # 119.40 <= lng < 119.45
+    ["Manggala", "Daya", "Biringkanaya"],                        # 119.45 <= lng < 119.50
+    ["Antang", "BTP/Sudiang", "Tamalanrea"],                     # lng >= 119.50
+], dtype=object)
+
+def get_area_name_batch(lats, lngs):
+    """
+    Versi vectorized dari get_area_name untuk array koordinat
+    """
+    lng_codes = np.searchsorted(_AREA_BAND_LNG, np.asarray(lngs, dtype=np.float64), side='right')
+    lat_codes = np.searchsorted(_AREA_BAND_LAT, np.asarray(lats, dtype=np.float64), side='right')
+    return _AREA_BAND_NAMES[lng_codes, lat_codes]
+
+def load_area_index(geojson_path=KECAMATAN_GEOJSON, name_fields=KECAMATAN_NAME_FIELDS):
     """
-    Proses setiap element dari OSM dengan alamat yang lebih spesifik
+    Load polygon kecamatan dari file GeoJSON lokal dan bangun STRtree sekali saja
+    """
+    if not geojson_path or not os.path.exists(geojson_path):
+        print(f"File polygon kecamatan tidak ditemukan ({geojson_path}), memakai band lat/lng")
+        return None
+    
+    with open(geojson_path, 'r', encoding='utf-8') as f:
+        features = json.load(f)['features']
+    
+    geometries = []
+    names = []
+    for feature in features:
+        properties = feature.get('properties') or {}
+        name = next((properties[field] for field in name_fields if properties.get(field)), None)
+        if name is None or not feature.get('geometry'):
+            continue
+        geometries.append(shape(feature['geometry']))
+        names.append(str(name).strip())
+    
+    if not geometries:
+        print(f"Tidak ada polygon kecamatan yang valid di {geojson_path}, memakai band lat/lng")
+        return None
+    
+    geometries = np.array(geometries, dtype=object)
+    shapely.prepare(geometries)
+    
+    print(f"Polygon kecamatan dimuat: {len(geometries)} area dari {geojson_path}")
+    return {
+        'tree': shapely.STRtree(geometries),
+        'geometries': geometries,
+        'names': np.array(names, dtype=object),
+    }
+
+def assign_areas(area_index, lats, lngs):
+    """
+    Tentukan nama area untuk seluruh array koordinat dalam satu panggilan.
+    Titik di luar semua polygon (atau tanpa index) memakai band lat/lng lama.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    areas = get_area_name_batch(lats, lngs)
+    
+    if area_index is None or len(lats) == 0:
+        return areas
+    
+    points = shapely.points(lngs, lats)
+    point_idx, geom_idx = area_index['tree'].query(points, predicate='intersects')
+    
+    # Titik di perbatasan bisa cocok dengan dua polygon; ambil yang pertama
+    order = np.lexsort((geom_idx, point_idx))
+    point_idx, geom_idx = point_idx[order], geom_idx[order]
+    matched, first = np.unique(point_idx, return_index=True)
+    areas[matched] = area_index['names'][geom_idx[first]]
+    
+    return areas
+
+def get_element_coordinates(element):
+    """
+    Ambil (lat, lon) dari element OSM yang punya nama, atau None jika tidak valid
+    """
+    if 'tags' not in element or 'name' not in element['tags']:
+        return None
+    
+    if element['type'] == 'node':
+        return element['lat'], element['lon']
+    elif element['type'] == 'way' and 'center' in element:
+        return element['center']['lat'], element['center']['lon']
+    
+    return None
+
+def process_osm_element(element, attribute_mode="sequential", area_name=None):
+    """
+    Proses setiap element dari OSM dengan alamat yang lebih spesifik.
+    attribute_mode menentukan cara Rating/User_Ratings_Total/Price_Level dibuat:
+    "sequential" (modul random), "stable" (per Place_ID, tidak tergantung urutan),
+    atau "deferred" (dibiarkan kosong untuk diisi generator batch).
+    area_name bisa diisi dari assign_areas; jika kosong dipakai get_area_name.
     """
     # Skip jika tidak ada tags
     if 'tags' not in element:
@@ -251,9 +754,15 @@ def process_osm_element(element):
     place_type = amenity if amenity else shop
     
     # Generate data
-    rating = generate_rating_by_type(amenity, shop)
-    user_ratings_total = generate_user_ratings(rating, place_type)
-    price_level = generate_price_level(place_type)
+    if attribute_mode == "stable":
+        rating, user_ratings_total, price_level = generate_stable_attributes(
+            f"osm_{element['id']}", amenity, shop)
+    elif attribute_mode == "deferred":
+        rating = user_ratings_total = price_level = None
+    else:
+        rating = generate_rating_by_type(amenity, shop)
+        user_ratings_total = generate_user_ratings(rating, place_type)
+        price_level = generate_price_level(place_type)
     
     # Format alamat dengan area yang lebih spesifik
     address_parts = []
@@ -263,7 +772,8 @@ def process_osm_element(element):
         address_parts.append(tags['addr:housenumber'])
     
     # Tentukan area berdasarkan koordinat
-    area_name = get_area_name(lat, lon)
+    if area_name is None:
+        area_name = get_area_name(lat, lon)
     
     if address_parts:
         address = ', '.join(address_parts) + f', {area_name}, Makassar'
@@ -273,13 +783,79 @@ def process_osm_element(element):
     return {
         'Nama': name,
         'Alamat': address,
+        'Area': area_name,
         'Rating': rating,
         'User_Ratings_Total': user_ratings_total,
         'Price_Level': price_level,
         'Place_ID': f"osm_{element['id']}",
-        'Lokasi': f"{{'lat': {lat}, 'lng': {lon}}}"
+        'Lokasi': f"{{'lat': {lat}, 'lng': {lon}}}",
+        # Kolom tambahan untuk output kolumnar (tidak ditulis ke CSV)
+        'Place_Type': place_type,
+        'Lat': lat,
+        'Lng': lon,
     }
 
+def process_osm_chunk(elements, area_index=None, attribute_mode="sequential", return_elements=False):
+    """
+    Proses sekumpulan element dengan penentuan area sekaligus lewat assign_areas.
+    Jika return_elements=True, dikembalikan juga element valid dengan urutan sama seperti baris.
+    """
+    valid_elements = []
+    lats = []
+    lngs = []
+    
+    for element in elements:
+        coordinates = get_element_coordinates(element)
+        if coordinates is None:
+            continue
+        valid_elements.append(element)
+        lats.append(coordinates[0])
+        lngs.append(coordinates[1])
+    
+    areas = assign_areas(area_index, lats, lngs)
+    
+    rows = [
+        process_osm_element(element, attribute_mode=attribute_mode, area_name=area)
+        for element, area in zip(valid_elements, areas)
+    ]
+    if return_elements:
+        return rows, valid_elements
+    return rows
+
+def process_osm_elements_batch(elements, seed=42, stable=False, area_index=None):
+    """
+    Proses semua element, lalu generate atribut sintetis sekaligus dengan NumPy.
+    Jika stable=True, atribut diturunkan dari Place_ID sehingga tidak tergantung urutan element.
+    """
+    processed_data, valid_elements = process_osm_chunk(elements, area_index, attribute_mode="deferred",
+                                                       return_elements=True)
+    
+    if not processed_data:
+        return processed_data
+    
+    # Tag diambil per posisi, bukan per id: node dan way bisa punya id numerik yang sama
+    amenity_types = [element['tags'].get('amenity', '') for element in valid_elements]
+    shop_types = [element['tags'].get('shop', '') for element in valid_elements]
+    
+    if stable:
+        place_ids = [row['Place_ID'] for row in processed_data]
+        attributes = generate_stable_attributes_batch(place_ids, amenity_types, shop_types, seed=seed)
+    else:
+        attributes = generate_synthetic_batch(amenity_types, shop_types, seed=seed)
+    ratings = attributes['Rating'].tolist()
+    user_ratings = attributes['User_Ratings_Total'].tolist()
+    price_levels = attributes['Price_Level'].tolist()
+    
+    for i, row in enumerate(processed_data):
+        row['Rating'] = ratings[i]
+        row['User_Ratings_Total'] = user_ratings[i]
+        row['Price_Level'] = price_levels[i]
+    
+    return processed_data
+
+CSV_FIELDNAMES = ['Nama', 'Alamat', 'Area', 'Rating', 'User_Ratings_Total',
+                  'Price_Level', 'Place_ID', 'Lokasi']
+
 def save_data_to_csv(data, filename):
     """
     Simpan data ke file CSV
@@ -288,9 +864,7 @@ def save_data_to_csv(data, filename):
     
     try:
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['Nama', 'Alamat', 'Rating', 'User_Ratings_Total', 
-                         'Price_Level', 'Place_ID', 'Lokasi']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES, extrasaction='ignore')
             
             # Tulis header
             writer.writeheader()
@@ -306,80 +880,381 @@ def save_data_to_csv(data, filename):
         print(f"Error menyimpan file: {e}")
         return False
 
-def print_summary(data):
+def save_data_to_columnar(data, filename):
     """
-    Tampilkan ringkasan data dengan breakdown per area
+    Simpan data ke file Parquet/Arrow IPC dengan kolom Lat/Lng bertipe float64
+    """
+    print(f"Menyimpan {len(data)} tempat kuliner ke {filename}...")
+    
+    try:
+        write_columnar(rows_to_table(data), filename)
+        print(f"Data berhasil disimpan ke {filename}")
+        return True
+        
+    except Exception as e:
+        print(f"Error menyimpan file: {e}")
+        return False
+
+def stream_osm_to_csv(elements, filename, chunk_size=1000, attribute_mode="sequential",
+                      area_index=None, columnar_file=None):
+    """
+    Proses element per chunk kecil dan langsung tulis ke CSV
+    (dan ke file kolumnar per batch jika columnar_file diisi).
+    Hanya statistik ringkasan yang disimpan, sehingga memori tetap datar.
+    Output ditulis ke file sementara dan baru menggantikan file lama setelah stream
+    selesai tanpa error, jadi kegagalan di tengah jalan tidak merusak output sebelumnya.
+    """
+    print(f"Memproses dan menulis data UMKM kuliner ke {filename} (streaming)...")
+    stats = new_summary_stats()
+    outputs = [filename] + ([columnar_file] if columnar_file else [])
+    # Ekstensi dipertahankan karena format kolumnar ditentukan dari ekstensi file
+    tmp_files = {path: '{0}.tmp{1}'.format(*os.path.splitext(path)) for path in outputs}
+    columnar_writer = None
+    upstream_error = None
+    
+    try:
+        if columnar_file:
+            columnar_writer = open_columnar_writer(tmp_files[columnar_file])
+        
+        with open(tmp_files[filename], 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES, extrasaction='ignore')
+            writer.writeheader()
+            
+            elements = iter(elements)
+            while True:
+                try:
+                    chunk = list(itertools.islice(elements, chunk_size))
+                except Exception as e:
+                    # Gagal mengambil data (koneksi putus, remark error, upstream down)
+                    upstream_error = e
+                    break
+                if not chunk:
+                    break
+                
+                rows = process_osm_chunk(chunk, area_index, attribute_mode)
+                for processed in rows:
+                    writer.writerow(processed)
+                    update_summary_stats(stats, processed)
+                
+                if columnar_writer is not None and rows:
+                    columnar_writer.write_table(rows_to_table(rows))
+                
+                csvfile.flush()
+                print(f"  {stats['total']} UMKM kuliner ditulis...")
+        
+        if columnar_writer is not None:
+            columnar_writer.close()
+            columnar_writer = None
+        
+        if upstream_error is None:
+            for path in outputs:
+                os.replace(tmp_files[path], path)
+            print(f"Data berhasil disimpan ke {filename}")
+            return stats
+        
+        print(f"Error mengambil data dari OSM: {upstream_error} - file output lama tidak diubah")
+        return None
+        
+    except Exception as e:
+        print(f"Error menyimpan file: {e}")
+        return None
+    
+    finally:
+        if columnar_writer is not None:
+            columnar_writer.close()
+        for tmp_file in tmp_files.values():
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+# OSM_Key ("node/123", "way/123") membedakan node dan way dengan id numerik sama
+DELTA_FIELDNAMES = CSV_FIELDNAMES + ['OSM_Key', 'Change']
+
+def osm_element_key(element):
+    """
+    Key unik element OSM: id numerik hanya unik per tipe (node/way)
+    """
+    return f"{element['type']}/{element['id']}"
+
+def open_snapshot_store(db_path=SNAPSHOT_DB):
+    """
+    Buka (atau buat) store SQLite snapshot POI. Kolom place_id berisi osm_element_key;
+    snapshot lama yang masih ber-key Place_ID akan terbaca sebagai dihapus + ditambah
+    sekali, lalu tersimpan dengan key baru.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS osm_snapshot (
+            place_id TEXT PRIMARY KEY,
+            version INTEGER,
+            timestamp TEXT,
+            row_json TEXT NOT NULL
+        )
+    """)
+    return conn
+
+def compute_osm_delta(elements, conn, area_index=None, seed=42):
+    """
+    Bandingkan element OSM (dengan meta) terhadap snapshot sebelumnya.
+    Hanya element yang baru/berubah yang diproses; atribut sintetis memakai mode
+    stable agar baris yang tidak berubah tetap identik dengan snapshot.
+    """
+    previous = {
+        osm_key: (version, timestamp)
+        for osm_key, version, timestamp in conn.execute(
+            "SELECT place_id, version, timestamp FROM osm_snapshot")
+    }
+    
+    seen = set()
+    pending_elements = []
+    change_types = {}
+    versions = {}
+    
+    for element in elements:
+        if get_element_coordinates(element) is None:
+            continue
+        
+        osm_key = osm_element_key(element)
+        if osm_key in seen:
+            continue
+        seen.add(osm_key)
+        
+        current = (element.get('version'), element.get('timestamp'))
+        if osm_key not in previous:
+            change_types[osm_key] = 'added'
+        elif previous[osm_key] != current:
+            change_types[osm_key] = 'changed'
+        else:
+            continue
+        
+        versions[osm_key] = current
+        pending_elements.append(element)
+    
+    # Baris dan element valid berurutan sama (process_osm_chunk)
+    rows = process_osm_elements_batch(pending_elements, seed=seed, stable=True, area_index=area_index)
+    for row, element in zip(rows, pending_elements):
+        row['OSM_Key'] = osm_element_key(element)
+        row['Change'] = change_types[row['OSM_Key']]
+    
+    deleted = []
+    for osm_key in previous.keys() - seen:
+        row_json, = conn.execute(
+            "SELECT row_json FROM osm_snapshot WHERE place_id = ?", (osm_key,)).fetchone()
+        row = json.loads(row_json)
+        row['OSM_Key'] = osm_key
+        row['Change'] = 'deleted'
+        deleted.append(row)
+    
+    return {
+        'added': [row for row in rows if row['Change'] == 'added'],
+        'changed': [row for row in rows if row['Change'] == 'changed'],
+        'deleted': sorted(deleted, key=lambda row: row['OSM_Key']),
+        'versions': versions,
+    }
+
+def versioned_delta_path(delta_file, run_time=None):
+    """
+    Nama file delta per run ingestion: <delta_file tanpa ekstensi>_<YYYYmmdd_HHMMSS_ffffff>.csv.
+    Urutan nama = urutan run, dan run baru tidak pernah menimpa delta yang belum dibersihkan.
+    """
+    base, ext = os.path.splitext(delta_file)
+    run_time = run_time or datetime.now()
+    return f"{base}_{run_time.strftime('%Y%m%d_%H%M%S_%f')}{ext}"
+
+def save_delta_to_csv(delta, filename):
+    """
+    Simpan delta (added/changed/deleted) ke CSV dengan kolom Change.
+    Ditulis ke file sementara lalu rename, agar cleaning tidak pernah membaca file setengah jadi.
+    """
+    total = len(delta['added']) + len(delta['changed']) + len(delta['deleted'])
+    print(f"Menyimpan delta {total} tempat kuliner ke {filename}...")
+    
+    try:
+        tmp_filename = filename + '.tmp'
+        with open(tmp_filename, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=DELTA_FIELDNAMES, extrasaction='ignore')
+            writer.writeheader()
+            for change in ('added', 'changed', 'deleted'):
+                for row in delta[change]:
+                    writer.writerow(row)
+        os.replace(tmp_filename, filename)
+        
+        print(f"Delta berhasil disimpan ke {filename}")
+        return True
+        
+    except Exception as e:
+        print(f"Error menyimpan file: {e}")
+        return False
+
+def commit_osm_delta(conn, delta):
+    """
+    Terapkan delta ke snapshot store dalam satu transaksi
+    """
+    upserts = []
+    for row in delta['added'] + delta['changed']:
+        version, timestamp = delta['versions'][row['OSM_Key']]
+        snapshot_row = {key: row[key] for key in CSV_FIELDNAMES}
+        upserts.append((row['OSM_Key'], version, timestamp, json.dumps(snapshot_row)))
+    
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO osm_snapshot (place_id, version, timestamp, row_json) "
+            "VALUES (?, ?, ?, ?)", upserts)
+        conn.executemany(
+            "DELETE FROM osm_snapshot WHERE place_id = ?",
+            [(row['OSM_Key'],) for row in delta['deleted']])
+
+def run_incremental_ingestion(delta_file, db_path=SNAPSHOT_DB):
+    """
+    Ambil data OSM dengan meta, hitung delta terhadap snapshot, tulis delta ke file
+    baru per run (versioned_delta_path), lalu perbarui snapshot. Snapshot hanya diperbarui
+    jika delta berhasil ditulis; file delta dihapus oleh cleaning setelah diproses
+    (run_delta_cleaning), sehingga beberapa run ingestion berturut-turut tidak kehilangan delta.
+    Path file delta yang ditulis disimpan di delta['file'].
+    """
+    # Tanpa checkpoint: setiap run incremental harus melihat data OSM terkini
+    elements = query_osm_makassar_tiled(meta=True, checkpoint_dir=None)
+    if not elements:
+        print("Tidak ada data UMKM kuliner yang ditemukan dari OSM")
+        return None
+    
+    conn = open_snapshot_store(db_path)
+    try:
+        delta = compute_osm_delta(elements, conn, area_index=load_area_index())
+        
+        print(f"\nDelta terhadap snapshot sebelumnya:")
+        print(f"  Baru: {len(delta['added'])} tempat")
+        print(f"  Berubah: {len(delta['changed'])} tempat")
+        print(f"  Dihapus: {len(delta['deleted'])} tempat")
+        
+        if not (delta['added'] or delta['changed'] or delta['deleted']):
+            print("Tidak ada perubahan sejak snapshot terakhir")
+            return delta
+        
+        delta['file'] = versioned_delta_path(delta_file)
+        if save_delta_to_csv(delta, delta['file']):
+            commit_osm_delta(conn, delta)
+        return delta
+    finally:
+        conn.close()
+
+def get_summary_area(alamat):
+    """
+    Kelompokkan alamat ke area ringkasan
+    """
+    if 'Tamalanrea' in alamat:
+        return 'Tamalanrea/UNHAS'
+    elif 'BTP' in alamat or 'Sudiang' in alamat:
+        return 'BTP/Sudiang'
+    elif 'Daya' in alamat:
+        return 'Daya'
+    elif 'Antang' in alamat:
+        return 'Antang'
+    elif 'Biringkanaya' in alamat:
+        return 'Biringkanaya'
+    elif 'Manggala' in alamat:
+        return 'Manggala'
+    elif 'Panakkukang' in alamat:
+        return 'Panakkukang'
+    elif 'Rappocini' in alamat:
+        return 'Rappocini'
+    else:
+        return 'Pusat Kota'
+
+def new_summary_stats():
+    """
+    Statistik ringkasan kosong yang bisa di-update per baris (untuk mode streaming)
+    """
+    return {
+        'total': 0,
+        'area_counts': {},
+        'rating_max': None,
+        'rating_min': None,
+        'rating_sum': 0.0,
+        'user_ratings_max': None,
+        'user_ratings_min': None,
+        'user_ratings_sum': 0,
+        'merah': 0,
+        'orange': 0,
+        'biru': 0,
+        'price_counts': [0, 0, 0, 0],
+    }
+
+def update_summary_stats(stats, item):
+    """
+    Tambahkan satu baris data ke statistik ringkasan
+    """
+    stats['total'] += 1
+    
+    area = item.get('Area') or get_summary_area(item['Alamat'])
+    stats['area_counts'][area] = stats['area_counts'].get(area, 0) + 1
+    
+    rating = item['Rating']
+    stats['rating_max'] = rating if stats['rating_max'] is None else max(stats['rating_max'], rating)
+    stats['rating_min'] = rating if stats['rating_min'] is None else min(stats['rating_min'], rating)
+    stats['rating_sum'] += rating
+    
+    user_ratings = item['User_Ratings_Total']
+    stats['user_ratings_max'] = user_ratings if stats['user_ratings_max'] is None else max(stats['user_ratings_max'], user_ratings)
+    stats['user_ratings_min'] = user_ratings if stats['user_ratings_min'] is None else min(stats['user_ratings_min'], user_ratings)
+    stats['user_ratings_sum'] += user_ratings
+    
+    # Distribusi untuk warna marker
+    if user_ratings >= 500:
+        stats['merah'] += 1
+    elif user_ratings >= 100:
+        stats['orange'] += 1
+    else:
+        stats['biru'] += 1
+    
+    stats['price_counts'][item['Price_Level']] += 1
+
+def print_summary_stats(stats):
+    """
+    Tampilkan ringkasan dari statistik yang sudah diakumulasi
     """
     print("\n" + "="*60)
     print("RINGKASAN DATA KULINER MAKASSAR - EXTENDED COVERAGE")
     print("="*60)
     
-    print(f"Total tempat kuliner: {len(data)}")
+    print(f"Total tempat kuliner: {stats['total']}")
     
-    # Hitung distribusi per area
-    area_counts = {}
-    for item in data:
-        alamat = item['Alamat']
-        # Extract area name dari alamat
-        if 'Tamalanrea' in alamat:
-            area = 'Tamalanrea/UNHAS'
-        elif 'BTP' in alamat or 'Sudiang' in alamat:
-            area = 'BTP/Sudiang'
-        elif 'Daya' in alamat:
-            area = 'Daya'
-        elif 'Antang' in alamat:
-            area = 'Antang'
-        elif 'Biringkanaya' in alamat:
-            area = 'Biringkanaya'
-        elif 'Manggala' in alamat:
-            area = 'Manggala'
-        elif 'Panakkukang' in alamat:
-            area = 'Panakkukang'
-        elif 'Rappocini' in alamat:
-            area = 'Rappocini'
-        else:
-            area = 'Pusat Kota'
-        
-        area_counts[area] = area_counts.get(area, 0) + 1
+    if stats['total'] == 0:
+        return
     
     print(f"\nDistribusi per Area:")
-    for area, count in sorted(area_counts.items(), key=lambda x: x[1], reverse=True):
+    for area, count in sorted(stats['area_counts'].items(), key=lambda x: x[1], reverse=True):
         print(f"  {area}: {count} tempat")
     
-    # Hitung distribusi rating
-    ratings = [item['Rating'] for item in data]
     print(f"\nStatistik Rating:")
-    print(f"  Tertinggi: {max(ratings)}")
-    print(f"  Terendah: {min(ratings)}")
-    print(f"  Rata-rata: {sum(ratings)/len(ratings):.1f}")
+    print(f"  Tertinggi: {stats['rating_max']}")
+    print(f"  Terendah: {stats['rating_min']}")
+    print(f"  Rata-rata: {stats['rating_sum']/stats['total']:.1f}")
     
-    # Hitung distribusi user ratings
-    user_ratings = [item['User_Ratings_Total'] for item in data]
     print(f"\nStatistik User Ratings:")
-    print(f"  Tertinggi: {max(user_ratings)}")
-    print(f"  Terendah: {min(user_ratings)}")
-    print(f"  Rata-rata: {sum(user_ratings)/len(user_ratings):.0f}")
-    
-    # Distribusi untuk warna marker
-    merah = len([x for x in user_ratings if x >= 500])
-    orange = len([x for x in user_ratings if 100 <= x < 500])
-    biru = len([x for x in user_ratings if x < 100])
+    print(f"  Tertinggi: {stats['user_ratings_max']}")
+    print(f"  Terendah: {stats['user_ratings_min']}")
+    print(f"  Rata-rata: {stats['user_ratings_sum']/stats['total']:.0f}")
     
     print(f"\nDistribusi Warna Marker:")
-    print(f"  Merah (>= 500 reviews): {merah} tempat")
-    print(f"  Orange (100-499 reviews): {orange} tempat")
-    print(f"  Biru (< 100 reviews): {biru} tempat")
-    
-    # Distribusi price level
-    price_counts = [0, 0, 0, 0]
-    for item in data:
-        price_counts[item['Price_Level']] += 1
+    print(f"  Merah (>= 500 reviews): {stats['merah']} tempat")
+    print(f"  Orange (100-499 reviews): {stats['orange']} tempat")
+    print(f"  Biru (< 100 reviews): {stats['biru']} tempat")
     
     print(f"\nDistribusi Price Level:")
     price_labels = ['Murah (0)', 'Terjangkau (1)', 'Sedang (2)', 'Mahal (3)']
-    for i, count in enumerate(price_counts):
+    for i, count in enumerate(stats['price_counts']):
         print(f"  {price_labels[i]}: {count} tempat")
 
+def print_summary(data):
+    """
+    Tampilkan ringkasan data dengan breakdown per area
+    """
+    stats = new_summary_stats()
+    for item in data:
+        update_summary_stats(stats, item)
+    
+    print_summary_stats(stats)
+
 def main():
     """
     Fungsi utama dengan coverage area yang diperluas - fokus UMKM kuliner
@@ -397,21 +1272,54 @@ def main():
     # Set random seed untuk hasil yang konsisten
     random.seed(42)
     
+    output_file = "C:/Users/ASUS/OneDrive/Documents/Skripsi_Megi/skripsi_baru/kuliner_makassar_osm.csv"
+    # Output kolumnar di samping CSV (Lat/Lng float64, tanpa string Lokasi)
+    columnar_output_file = "C:/Users/ASUS/OneDrive/Documents/Skripsi_Megi/skripsi_baru/kuliner_makassar_osm.parquet"
+    
+    if INGESTION_MODE == "incremental":
+        # Hanya POI yang baru/berubah/dihapus yang diteruskan ke tahap berikutnya
+        delta_file = "C:/Users/ASUS/OneDrive/Documents/Skripsi_Megi/skripsi_baru/kuliner_makassar_osm_delta.csv"
+        delta = run_incremental_ingestion(delta_file)
+        if delta is not None and 'file' in delta:
+            print(f"\nFile delta: {delta['file']}")
+        return
+    
+    if INGESTION_MODE == "stream":
+        # Query, proses, dan tulis sekaligus tanpa menyimpan daftar element di memori
+        attribute_mode = "stable" if SYNTHETIC_MODE == "stable" else "sequential"
+        stats = stream_osm_to_csv(query_osm_streaming(), output_file, attribute_mode=attribute_mode,
+                                  area_index=load_area_index(), columnar_file=columnar_output_file)
+        
+        if stats is None:
+            return
+        if stats['total'] == 0:
+            print("Tidak ada data UMKM kuliner yang valid untuk diproses")
+            return
+        
+        print_summary_stats(stats)
+        print(f"\nFile output: {output_file}")
+        return
+    
     # 1. Query data dari OSM dengan area yang diperluas - khusus kuliner
-    elements = query_osm_makassar()
+    if INGESTION_MODE == "tiled":
+        elements = query_osm_makassar_tiled()
+    else:
+        elements = query_osm_makassar()
     
     if not elements:
         print("Tidak ada data UMKM kuliner yang ditemukan dari OSM")
         return
     
     # 2. Proses setiap element
-    processed_data = []
     print("Memproses data UMKM kuliner...")
     
-    for element in elements:
-        processed = process_osm_element(element)
-        if processed:
-            processed_data.append(processed)
+    area_index = load_area_index()
+    
+    if SYNTHETIC_MODE in ("batch", "stable"):
+        processed_data = process_osm_elements_batch(elements, seed=42, stable=SYNTHETIC_MODE == "stable",
+                                                    area_index=area_index)
+    else:
+        processed_data = process_osm_chunk(elements, area_index)
     
     if not processed_data:
         print("Tidak ada data UMKM kuliner yang valid untuk diproses")
@@ -419,15 +1327,16 @@ def main():
     
     print(f"Berhasil memproses {len(processed_data)} UMKM kuliner")
     
-    # 3. Simpan ke CSV
-    output_file = "C:/Users/ASUS/OneDrive/Documents/Skripsi_Megi/skripsi_baru/kuliner_makassar_osm.csv"
+    # 3. Simpan ke CSV dan format kolumnar
     success = save_data_to_csv(processed_data, output_file)
+    save_data_to_columnar(processed_data, columnar_output_file)
     
     if success:
         # 4. Tampilkan ringkasan
         print_summary(processed_data)
         
         print(f"\nFile output: {output_file}")
+        print(f"File output kolumnar: {columnar_output_file}")
         print("Data UMKM kuliner siap untuk digunakan dalam visualisasi hotspot!")
         print("Coverage area sudah diperluas untuk mencakup seluruh Kota Makassar")
         print("Data fokus pada UMKM kuliner, tidak termasuk retail umum")
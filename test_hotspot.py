@@ -1,61 +1,249 @@
+import os
+import re
 import pandas as pd
-import ast
 import folium
 from folium.plugins import HeatMap
-from scipy.stats import gaussian_kde
 import numpy as np
-
-# Load the dataset
-file_path = r"C:/Users/ASUS/OneDrive/Documents/Skripsi_Megi/skripsi_baru/kuliner_makassar_clean.csv"
-data = pd.read_csv(file_path)
-
-# Extract latitude and longitude from the 'Lokasi' column
-data['Lat'] = data['Lokasi'].apply(lambda x: ast.literal_eval(x)['lat'])
-data['Lng'] = data['Lokasi'].apply(lambda x: ast.literal_eval(x)['lng'])
-
-def create_kde_heatmap(filtered_data, map_object, layer_name):
+from lokasi_parser import parse_lokasi_column
+from columnar_io import is_columnar_path, read_columnar
+from kde_engine import compute_kde_layer, compute_kde_layers, emit_heat_points
+from kde_cache import KDECache
+from kde_tiles import generate_tile_pyramid
+from marker_layers import SharedMarkerLayers
+
+# Evaluasi KDE: "grid" (grid reguler, binned FFT KDE) atau "adaptive" (quadtree yang
+# hanya memperhalus sel padat/curam, dengan batas jumlah titik heatmap per layer)
+KDE_EVALUATION = "grid"
+
+# Grid KDE per sumbu (binned FFT KDE, grid rapat mis. 1000 tetap cepat)
+KDE_GRID_SIZE = 80
+
+# Mode adaptive: maksimum titik yang dievaluasi quadtree per layer
+KDE_POINT_BUDGET = 3000
+
+# Cache densitas KDE per layer (key: hash koordinat + parameter); rerun tanpa perubahan
+# data (mis. hanya ganti legenda/warna) tidak menghitung KDE lagi
+KDE_CACHE_DIR = "kde_cache"
+KDE_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Payload heatmap: maksimum titik per layer (top-K weight) dan presisi kuantisasi
+# (4 desimal koordinat ~11 m, lebih halus dari jarak grid KDE; 2 desimal weight)
+HEAT_MAX_POINTS = 600
+HEAT_COORD_DECIMALS = 4
+HEAT_WEIGHT_DECIMALS = 2
+
+# Bandwidth per layer: 'lscv' (cross-validation pada hitungan binned), 'scott',
+# 'silverman', atau angka tetap (mis. 0.025 seperti sebelumnya)
+KDE_BANDWIDTH = 'lscv'
+
+# Render heatmap: "points" (HeatMap Leaflet, titik di dalam HTML) atau "tiles"
+# (piramida tile PNG z/x/y pre-render di TILE_DIR, ditambahkan sebagai TileLayer)
+HEATMAP_RENDER_MODE = "points"
+
+# Mode tiles: grid densitas rapat yang di-sampling ke tile, rentang zoom, folder output
+# (relatif terhadap file HTML)
+TILE_GRID_SIZE = 1024
+TILE_MIN_ZOOM = 10
+TILE_MAX_ZOOM = 17
+TILE_DIR = "kde_tiles"
+
+# Render marker: "folium" (satu folium.Marker per layer, popup ikut diserialisasi per
+# layer), "shared" (satu array data bersama, layer berupa daftar index), atau untuk
+# puluhan ribu UMKM ke atas "canvas" (circle marker di canvas) / "cluster" (markercluster)
+MARKER_RENDER_MODE = "shared"
+MARKER_RENDERER_BY_MODE = {"shared": "icon", "canvas": "canvas", "cluster": "cluster"}
+
+# Semua layer KDE dihitung paralel di process pool (None = jumlah CPU)
+KDE_WORKERS = None
+
+# Dataset (CSV, atau Parquet/Arrow hasil cleaning kolumnar)
+DATA_FILE = r"C:/Users/ASUS/OneDrive/Documents/Skripsi_Megi/skripsi_baru/kuliner_makassar_clean.csv"
+
+def load_hotspot_data(file_path):
     """
-    Create KDE-based heatmap for filtered data
+    Load the dataset dengan kolom Lat/Lng
     """
-    if len(filtered_data) < 3:  # Need at least 3 points for KDE
-        return
-    
-    # Prepare coordinates for filtered data
-    filter_coordinates = filtered_data[['Lat', 'Lng']].values
+    if is_columnar_path(file_path):
+        # Lat/Lng sudah bertipe float64, tidak perlu parse 'Lokasi'
+        return read_columnar(file_path)
     
-    # Create KDE model
-    kde = gaussian_kde(filter_coordinates.T, bw_method=0.025)
+    data = pd.read_csv(file_path)
     
-    # Create grid for density estimation
-    lat_min, lat_max = filter_coordinates[:, 0].min(), filter_coordinates[:, 0].max()
-    lng_min, lng_max = filter_coordinates[:, 1].min(), filter_coordinates[:, 1].max()
+    # Extract latitude and longitude from the 'Lokasi' column (satu pass vectorized)
+    parsed = parse_lokasi_column(data['Lokasi'])
+    data = data[parsed['Valid'].to_numpy()].copy()
+    data['Lat'] = parsed.loc[parsed['Valid'], 'Lat'].to_numpy()
+    data['Lng'] = parsed.loc[parsed['Valid'], 'Lng'].to_numpy()
+    return data
+
+def create_kde_heatmap(filtered_data, map_object, layer_name, grid_size=KDE_GRID_SIZE, bandwidth=KDE_BANDWIDTH,
+                       evaluation=KDE_EVALUATION, point_budget=KDE_POINT_BUDGET, cache=None, kde=None):
+    """
+    Create KDE-based heatmap for filtered data (binned FFT KDE, lihat kde_engine).
+    Densitas diambil dari cache jika koordinat dan parameternya sama dengan run sebelumnya,
+    atau dari `kde` yang sudah dihitung (compute_heatmap_layers).
+    Mengembalikan info layer (jumlah titik, bandwidth terpilih dan metodenya).
+    """
+    if len(filtered_data) < 3:  # Need at least 3 points for KDE
+        return None
     
-    # Add padding to grid
-    lat_padding = (lat_max - lat_min) * 0.15
-    lng_padding = (lng_max - lng_min) * 0.15
+    # Prepare coordinates for filtered data
+    filter_coordinates = filtered_data[['Lat', 'Lng']].to_numpy(dtype=np.float64)
     
-    lat_values = np.linspace(lat_min - lat_padding, lat_max + lat_padding, 80)
-    lng_values = np.linspace(lng_min - lng_padding, lng_max + lng_padding, 80)
-    lat_grid, lng_grid = np.meshgrid(lat_values, lng_values)
+    # Bandwidth dipilih per layer sesuai jumlah dan sebaran titiknya; grid dengan 15% padding
+    params = {'bandwidth': bandwidth, 'grid_size': grid_size, 'padding': 0.15,
+              'evaluation': evaluation, 'point_budget': point_budget}
+    if kde is None:
+        kde = (cache.get_or_compute(filter_coordinates, compute_kde_layer, **params) if cache is not None
+               else compute_kde_layer(filter_coordinates, **params))
     
-    # Evaluate KDE on the grid
-    density = kde(np.vstack([lat_grid.ravel(), lng_grid.ravel()]))
-    density = density.reshape(lat_grid.shape)
+    # Titik identik/segaris: KDE 2D tidak terdefinisi, layer dilewati
+    if kde is None:
+        return None
     
-    # Normalize density
-    density_normalized = (density - density.min()) / (density.max() - density.min())
+    if HEATMAP_RENDER_MODE == "tiles":
+        return add_kde_tile_layer(kde, filtered_data, map_object, layer_name)
     
-    # Create heatmap data
-    heat_data = []
-    for lat, lng, d in zip(lat_grid.ravel(), lng_grid.ravel(), density_normalized.ravel()):
-        if d > 0.03:  # Filter out very low-density areas
-            heat_data.append([lat, lng, d])
+    # Create heatmap data: filter out very low-density areas, quantize, top-K per layer
+    heat_data = emit_heat_points(kde['lats'], kde['lngs'], kde['weights'], threshold=0.03, max_points=HEAT_MAX_POINTS,
+                                 coord_decimals=HEAT_COORD_DECIMALS, weight_decimals=HEAT_WEIGHT_DECIMALS)
     
     # Create heatmap layer with minimal parameters
     heatmap_layer = folium.FeatureGroup(name=layer_name, show=False)  # Default hidden
     HeatMap(heat_data, radius=20, blur=25).add_to(heatmap_layer)
     
     heatmap_layer.add_to(map_object)
+    
+    return {
+        'layer': layer_name,
+        'n_points': len(filtered_data),
+        'bandwidth': kde['bandwidth'],
+        'method': kde['method'],
+        'kernel_meters': kde['kernel_meters'],
+        'heat_points': len(heat_data)
+    }
+
+def add_kde_tile_layer(kde, filtered_data, map_object, layer_name):
+    """
+    Render grid densitas layer ke piramida tile PNG (hanya tile yang berubah) lalu
+    tambahkan ke peta sebagai TileLayer
+    """
+    grid_size = int(round(np.sqrt(len(kde['weights']))))
+    grid = kde['weights'].reshape(grid_size, grid_size)
+    lat_values = kde['lats'].reshape(grid_size, grid_size)[:, 0]
+    lng_values = kde['lngs'].reshape(grid_size, grid_size)[0]
+    
+    slug = re.sub(r'[^a-z0-9]+', '_', layer_name.lower().replace('<', 'lt')).strip('_')
+    stats = generate_tile_pyramid(grid, lat_values, lng_values, os.path.join(TILE_DIR, slug),
+                                  min_zoom=TILE_MIN_ZOOM, max_zoom=TILE_MAX_ZOOM, threshold=0.03)
+    print(f"Tile {layer_name}: {stats['tiles']} tile, {stats['written']} ditulis, "
+          f"{stats['removed']} dihapus{' (tidak berubah)' if stats['skipped'] else ''}")
+    
+    folium.TileLayer(
+        tiles=f"{TILE_DIR}/{slug}/{{z}}/{{x}}/{{y}}.png",
+        attr='KDE UMKM',
+        name=layer_name,
+        overlay=True,
+        show=False,  # Default hidden
+        min_zoom=TILE_MIN_ZOOM,
+        max_native_zoom=TILE_MAX_ZOOM,
+        opacity=0.8
+    ).add_to(map_object)
+    
+    return {
+        'layer': layer_name,
+        'n_points': len(filtered_data),
+        'bandwidth': kde['bandwidth'],
+        'method': kde['method'],
+        'kernel_meters': kde['kernel_meters'],
+        'heat_points': stats['tiles']
+    }
+
+def marker_layer_indices(ratings):
+    """
+    Index baris untuk setiap layer marker rating (aturan sama dengan loop marker folium):
+    Rating 5.0, 4.5-4.9, 4.0-4.4, < 4.0 (di atas 0), 0
+    """
+    ratings = np.asarray(ratings, dtype=np.float64)
+    return [
+        np.flatnonzero(ratings == 5.0),
+        np.flatnonzero((ratings >= 4.5) & (ratings < 5.0)),
+        np.flatnonzero((ratings >= 4.0) & (ratings < 4.5)),
+        np.flatnonzero((ratings < 4.0) & (ratings > 0)),
+        np.flatnonzero(ratings == 0),
+    ]
+
+def build_marker_payload(data):
+    """
+    Data marker kolumnar untuk SharedMarkerLayers: setiap UMKM hanya sekali di HTML,
+    warna dan label harga sebagai index ke tabel kecil
+    """
+    icon_colors = [get_marker_icon_color(name) for name in ('red', 'orange', 'lightblue')]
+    reviews = data['User_Ratings_Total'].to_numpy()
+    color = np.select([reviews >= 500, reviews >= 100], [0, 1], default=2)
+    
+    # Index 4 = level harga tidak dikenal
+    price_levels = data['Price_Level'].to_numpy()
+    price = np.full(len(data), 4)
+    for level in range(4):
+        price[price_levels == level] = level
+    
+    return {
+        'lat': data['Lat'].round(6).tolist(),
+        'lng': data['Lng'].round(6).tolist(),
+        'name': data['Nama'].astype(str).tolist(),
+        'alamat': data['Alamat'].astype(str).tolist(),
+        'rating': data['Rating'].astype(float).tolist(),
+        'reviews': data['User_Ratings_Total'].astype(int).tolist(),
+        'color': color.tolist(),
+        'price': price.tolist(),
+        'icon_colors': icon_colors,
+        'price_labels': [get_price_label(level) for level in range(5)],
+        'price_colors': [get_price_color(level) for level in range(5)],
+    }
+
+def rating_band_order(ratings):
+    """
+    Urutan baris agar setiap layer rating menjadi slice bersambung:
+    5.0 | 4.5-4.9 | 4.0-4.4 | < 4.0 (bukan 0) | 0 | lainnya.
+    Layer "< 4.0" mencakup band < 4.0 dan 0 yang berdampingan.
+    """
+    ratings = np.asarray(ratings, dtype=np.float64)
+    band = np.full(len(ratings), 5)
+    band[ratings == 0] = 4
+    band[(ratings < 4.0) & (ratings != 0)] = 3
+    band[(ratings >= 4.0) & (ratings < 4.5)] = 2
+    band[(ratings >= 4.5) & (ratings < 5.0)] = 1
+    band[ratings == 5.0] = 0
+    
+    order = np.argsort(band, kind='stable')
+    bounds = np.searchsorted(band[order], np.arange(7))
+    return order, bounds
+
+def compute_heatmap_layers(data, cache=None, max_workers=KDE_WORKERS):
+    """
+    Hitung KDE semua layer heatmap sekaligus di process pool (koordinat dibagikan lewat
+    shared memory). Mengembalikan list dengan urutan tetap: Semua Data, Rating 5.0,
+    Rating 4.5-4.9, Rating 4.0-4.4, Rating < 4.0, Rating 0.
+    """
+    order, bounds = rating_band_order(data['Rating'])
+    coordinates = data[['Lat', 'Lng']].to_numpy(dtype=np.float64)[order]
+    
+    layer_slices = [
+        (0, len(data)),            # Semua Data
+        (bounds[0], bounds[1]),    # Rating 5.0
+        (bounds[1], bounds[2]),    # Rating 4.5-4.9
+        (bounds[2], bounds[3]),    # Rating 4.0-4.4
+        (bounds[3], bounds[5]),    # Rating < 4.0 (termasuk 0)
+        (bounds[4], bounds[5]),    # Rating 0
+    ]
+    params = {'bandwidth': KDE_BANDWIDTH, 'grid_size': KDE_GRID_SIZE, 'padding': 0.15,
+              'evaluation': KDE_EVALUATION, 'point_budget': KDE_POINT_BUDGET}
+    if HEATMAP_RENDER_MODE == "tiles":
+        # Tile di-sampling dari grid reguler yang rapat
+        params.update(grid_size=TILE_GRID_SIZE, evaluation='grid')
+    
+    return compute_kde_layers(coordinates, layer_slices, params, max_workers=max_workers, cache=cache)
 
 def get_marker_color_by_ratings(user_ratings_total):
     """
@@ -132,304 +320,343 @@ def create_google_maps_url(lat, lng, place_name):
     place_name_encoded = place_name.replace(' ', '+').replace(',', '')
     return f"https://www.google.com/maps/search/?api=1&query={lat},{lng}+{place_name_encoded}"
 
-# Create main map with Google Streets as the only basemap
-map_center = [data['Lat'].mean(), data['Lng'].mean()]
-m = folium.Map(
-    location=map_center, 
-    zoom_start=12,
-    tiles='https://mt1.google.com/vt/lyrs=m&x={x}&y={y}&z={z}',
-    attr='Google Streets'
-)
-
-# Prepare data categories
-rating_5_data = data[data['Rating'] == 5.0]
-rating_45_49_data = data[(data['Rating'] >= 4.5) & (data['Rating'] < 5.0)]
-rating_40_44_data = data[(data['Rating'] >= 4.0) & (data['Rating'] < 4.5)]
-rating_below_4_data = data[data['Rating'] < 4.0]
-rating_0_data = data[data['Rating'] == 0]
-
-# ============= HEATMAP LAYERS =============
-# Create heatmap layers (all hidden by default to avoid overlap)
-
-# All data heatmap - show by default
-all_heatmap_layer = folium.FeatureGroup(name='Heatmap - Semua Data', show=True)
-create_kde_heatmap(data, m, 'Heatmap - Semua Data')
-
-# Rating-specific heatmaps - hidden by default
-if len(rating_5_data) > 0:
-    rating_5_heatmap = folium.FeatureGroup(name='Heatmap - Rating 5.0', show=False)
-    create_kde_heatmap(rating_5_data, m, 'Heatmap - Rating 5.0')
-
-if len(rating_45_49_data) > 0:
-    rating_45_49_heatmap = folium.FeatureGroup(name='Heatmap - Rating 4.5-4.9', show=False)
-    create_kde_heatmap(rating_45_49_data, m, 'Heatmap - Rating 4.5-4.9')
-
-if len(rating_40_44_data) > 0:
-    rating_40_44_heatmap = folium.FeatureGroup(name='Heatmap - Rating 4.0-4.4', show=False)
-    create_kde_heatmap(rating_40_44_data, m, 'Heatmap - Rating 4.0-4.4')
-
-if len(rating_below_4_data) > 0:
-    rating_below_4_heatmap = folium.FeatureGroup(name='Heatmap - Rating < 4.0', show=False)
-    create_kde_heatmap(rating_below_4_data, m, 'Heatmap - Rating < 4.0')
-
-if len(rating_0_data) > 0:
-    rating_0_heatmap = folium.FeatureGroup(name='Heatmap - Rating 0', show=False)
+def main():
+    """
+    Buat peta hotspot UMKM (dipanggil dari __main__ agar aman untuk process pool spawn di Windows)
+    """
+    data = load_hotspot_data(DATA_FILE)
+    
+    # Create main map with Google Streets as the only basemap
+    map_center = [data['Lat'].mean(), data['Lng'].mean()]
+    m = folium.Map(
+        location=map_center, 
+        zoom_start=12,
+        tiles='https://mt1.google.com/vt/lyrs=m&x={x}&y={y}&z={z}',
+        attr='Google Streets'
+    )
+
+    # Prepare data categories
+    rating_5_data = data[data['Rating'] == 5.0]
+    rating_45_49_data = data[(data['Rating'] >= 4.5) & (data['Rating'] < 5.0)]
+    rating_40_44_data = data[(data['Rating'] >= 4.0) & (data['Rating'] < 4.5)]
+    rating_below_4_data = data[data['Rating'] < 4.0]
+    rating_0_data = data[data['Rating'] == 0]
+
+    # ============= HEATMAP LAYERS =============
+    # Create heatmap layers (all hidden by default to avoid overlap)
+
+    # Densitas semua layer dihitung paralel dulu (urutan hasil tetap), lalu dirender
+    kde_cache = KDECache(KDE_CACHE_DIR, max_bytes=KDE_CACHE_MAX_BYTES)
+    (all_kde, rating_5_kde, rating_45_49_kde, rating_40_44_kde,
+     rating_below_4_kde, rating_0_kde) = compute_heatmap_layers(data, cache=kde_cache)
+    kde_layers = []
+
+    # All data heatmap - show by default
+    kde_layers.append(create_kde_heatmap(data, m, 'Heatmap - Semua Data', kde=all_kde))
+
+    # Rating-specific heatmaps - hidden by default
+    if len(rating_5_data) > 0:
+        kde_layers.append(create_kde_heatmap(rating_5_data, m, 'Heatmap - Rating 5.0', kde=rating_5_kde))
+
+    if len(rating_45_49_data) > 0:
+        kde_layers.append(create_kde_heatmap(rating_45_49_data, m, 'Heatmap - Rating 4.5-4.9', kde=rating_45_49_kde))
+
+    if len(rating_40_44_data) > 0:
+        kde_layers.append(create_kde_heatmap(rating_40_44_data, m, 'Heatmap - Rating 4.0-4.4', kde=rating_40_44_kde))
+
+    if len(rating_below_4_data) > 0:
+        kde_layers.append(create_kde_heatmap(rating_below_4_data, m, 'Heatmap - Rating < 4.0', kde=rating_below_4_kde))
+
     if len(rating_0_data) >= 3:
-        create_kde_heatmap(rating_0_data, m, 'Heatmap - Rating 0')
-
-# ============= MARKER LAYERS =============
-# Create marker layers - only show "All Markers" by default
-markers_all_layer = folium.FeatureGroup(name='Markers - Semua Data', show=True)
-markers_rating_5_layer = folium.FeatureGroup(name='Markers - Rating 5.0', show=False) 
-markers_rating_45_49_layer = folium.FeatureGroup(name='Markers - Rating 4.5-4.9', show=False)
-markers_rating_40_44_layer = folium.FeatureGroup(name='Markers - Rating 4.0-4.4', show=False)
-markers_rating_below_4_layer = folium.FeatureGroup(name='Markers - Rating < 4.0', show=False)
-markers_rating_0_layer = folium.FeatureGroup(name='Markers - Rating 0', show=False)
-
-# Add markers with improved styling
-for _, row in data.iterrows():
-    # Determine marker color based on user_ratings_total
-    marker_color = get_marker_color_by_ratings(row['User_Ratings_Total'])
+        kde_layers.append(create_kde_heatmap(rating_0_data, m, 'Heatmap - Rating 0', kde=rating_0_kde))
+
+    # ============= MARKER LAYERS =============
+    # Create marker layers - only show "All Markers" by default
+    markers_all_layer = folium.FeatureGroup(name='Markers - Semua Data', show=True)
+    markers_rating_5_layer = folium.FeatureGroup(name='Markers - Rating 5.0', show=False) 
+    markers_rating_45_49_layer = folium.FeatureGroup(name='Markers - Rating 4.5-4.9', show=False)
+    markers_rating_40_44_layer = folium.FeatureGroup(name='Markers - Rating 4.0-4.4', show=False)
+    markers_rating_below_4_layer = folium.FeatureGroup(name='Markers - Rating < 4.0', show=False)
+    markers_rating_0_layer = folium.FeatureGroup(name='Markers - Rating 0', show=False)
+
+    band_layers = [markers_rating_5_layer, markers_rating_45_49_layer, markers_rating_40_44_layer,
+                   markers_rating_below_4_layer, markers_rating_0_layer]
+    shared_markers = None
+    
+    if MARKER_RENDER_MODE in MARKER_RENDERER_BY_MODE:
+        # Setiap UMKM sekali di array bersama; layer rating hanya daftar index
+        band_indices = marker_layer_indices(data['Rating'])
+        shared_markers = SharedMarkerLayers(
+            build_marker_payload(data),
+            [(markers_all_layer, None)] + [(layer, indices.tolist()) for layer, indices in zip(band_layers, band_indices)],
+            renderer=MARKER_RENDERER_BY_MODE[MARKER_RENDER_MODE])
+    else:
+        # Add markers with improved styling
+        for _, row in data.iterrows():
+            # Determine marker color based on user_ratings_total
+            marker_color = get_marker_color_by_ratings(row['User_Ratings_Total'])
     
-    # Get price label and color
-    price_label = get_price_label(row['Price_Level'])
-    price_color = get_price_color(row['Price_Level'])
+            # Get price label and color
+            price_label = get_price_label(row['Price_Level'])
+            price_color = get_price_color(row['Price_Level'])
     
-    # Create Google Maps URL
-    google_maps_url = create_google_maps_url(row['Lat'], row['Lng'], row['Nama'])
+            # Create Google Maps URL
+            google_maps_url = create_google_maps_url(row['Lat'], row['Lng'], row['Nama'])
     
-    # Create popup content with enhanced price level display
-    popup_content = f"""
-    <div style="width: 300px; font-family: Arial, sans-serif;">
-        <div style="background: #4285f4; color: white; padding: 12px; margin: -9px -9px 12px -9px;">
-            <h3 style="margin: 0; font-size: 16px;">{row['Nama']}</h3>
-        </div>
+            # Create popup content with enhanced price level display
+            popup_content = f"""
+            <div style="width: 300px; font-family: Arial, sans-serif;">
+                <div style="background: #4285f4; color: white; padding: 12px; margin: -9px -9px 12px -9px;">
+                    <h3 style="margin: 0; font-size: 16px;">{row['Nama']}</h3>
+                </div>
         
-        <div style="padding: 0 8px;">
-            <p style="margin: 8px 0;"><strong>Alamat:</strong><br>{row['Alamat']}</p>
+                <div style="padding: 0 8px;">
+                    <p style="margin: 8px 0;"><strong>Alamat:</strong><br>{row['Alamat']}</p>
             
-            <div style="display: flex; justify-content: space-between; margin: 12px 0;">
-                <div style="text-align: center; flex: 1;">
-                    <div style="font-size: 20px; font-weight: bold; color: #ff6b6b;">
-                        {row['Rating']}
+                    <div style="display: flex; justify-content: space-between; margin: 12px 0;">
+                        <div style="text-align: center; flex: 1;">
+                            <div style="font-size: 20px; font-weight: bold; color: #ff6b6b;">
+                                {row['Rating']}
+                            </div>
+                            <div style="font-size: 12px;">Rating</div>
+                        </div>
+                        <div style="text-align: center; flex: 1;">
+                            <div style="font-size: 16px; font-weight: bold; color: #4ecdc4;">
+                                {row['User_Ratings_Total']}
+                            </div>
+                            <div style="font-size: 12px;">Reviews</div>
+                        </div>
+                        <div style="text-align: center; flex: 1;">
+                            <div style="font-size: 16px; font-weight: bold; color: {price_color};">
+                                {price_label}
+                            </div>
+                            <div style="font-size: 12px;">Harga</div>
+                        </div>
                     </div>
-                    <div style="font-size: 12px;">Rating</div>
-                </div>
-                <div style="text-align: center; flex: 1;">
-                    <div style="font-size: 16px; font-weight: bold; color: #4ecdc4;">
-                        {row['User_Ratings_Total']}
+            
+                    <div style="background: #f8f9fa; padding: 8px; border-radius: 5px; margin: 10px 0;">
+                        <p style="margin: 0; font-size: 12px; color: #666;">
+                            <strong>Koordinat:</strong> {row['Lat']:.6f}, {row['Lng']:.6f}
+                        </p>
                     </div>
-                    <div style="font-size: 12px;">Reviews</div>
                 </div>
-                <div style="text-align: center; flex: 1;">
-                    <div style="font-size: 16px; font-weight: bold; color: {price_color};">
-                        {price_label}
-                    </div>
-                    <div style="font-size: 12px;">Harga</div>
+        
+                <div style="text-align: center; margin-top: 15px;">
+                    <a href="{google_maps_url}" target="_blank" 
+                       style="background: #4285f4; color: white; padding: 10px 20px; 
+                              text-decoration: none; border-radius: 5px; font-weight: bold;
+                              display: inline-block; width: 80%;">
+                       Buka di Google Maps
+                    </a>
                 </div>
             </div>
-            
-            <div style="background: #f8f9fa; padding: 8px; border-radius: 5px; margin: 10px 0;">
-                <p style="margin: 0; font-size: 12px; color: #666;">
-                    <strong>Koordinat:</strong> {row['Lat']:.6f}, {row['Lng']:.6f}
-                </p>
-            </div>
-        </div>
-        
-        <div style="text-align: center; margin-top: 15px;">
-            <a href="{google_maps_url}" target="_blank" 
-               style="background: #4285f4; color: white; padding: 10px 20px; 
-                      text-decoration: none; border-radius: 5px; font-weight: bold;
-                      display: inline-block; width: 80%;">
-               Buka di Google Maps
-            </a>
-        </div>
-    </div>
-    """
+            """
     
-    # Get marker icon color
-    icon_color = get_marker_icon_color(marker_color)
+            # Get marker icon color
+            icon_color = get_marker_icon_color(marker_color)
     
-    # Create marker for all markers layer
-    marker = folium.Marker(
-        location=[row['Lat'], row['Lng']],
-        popup=folium.Popup(popup_content, max_width=340),
-        tooltip=f"{row['Nama']} - Rating: {row['Rating']} - Reviews: {row['User_Ratings_Total']} - Harga: {price_label}",
-        icon=create_custom_icon(icon_color)
-    )
-    marker.add_to(markers_all_layer)
+            # Create marker for all markers layer
+            marker = folium.Marker(
+                location=[row['Lat'], row['Lng']],
+                popup=folium.Popup(popup_content, max_width=340),
+                tooltip=f"{row['Nama']} - Rating: {row['Rating']} - Reviews: {row['User_Ratings_Total']} - Harga: {price_label}",
+                icon=create_custom_icon(icon_color)
+            )
+            marker.add_to(markers_all_layer)
     
-    # Add to specific rating layers
-    if row['Rating'] == 5.0:
-        marker_copy = folium.Marker(
-            location=[row['Lat'], row['Lng']],
-            popup=folium.Popup(popup_content, max_width=340),
-            tooltip=f"{row['Nama']} - Rating: {row['Rating']} - Reviews: {row['User_Ratings_Total']} - Harga: {price_label}",
-            icon=create_custom_icon(icon_color)
-        )
-        marker_copy.add_to(markers_rating_5_layer)
-    elif 4.5 <= row['Rating'] < 5.0:
-        marker_copy = folium.Marker(
-            location=[row['Lat'], row['Lng']],
-            popup=folium.Popup(popup_content, max_width=340),
-            tooltip=f"{row['Nama']} - Rating: {row['Rating']} - Reviews: {row['User_Ratings_Total']} - Harga: {price_label}",
-            icon=create_custom_icon(icon_color)
-        )
-        marker_copy.add_to(markers_rating_45_49_layer)
-    elif 4.0 <= row['Rating'] < 4.5:
-        marker_copy = folium.Marker(
-            location=[row['Lat'], row['Lng']],
-            popup=folium.Popup(popup_content, max_width=340),
-            tooltip=f"{row['Nama']} - Rating: {row['Rating']} - Reviews: {row['User_Ratings_Total']} - Harga: {price_label}",
-            icon=create_custom_icon(icon_color)
-        )
-        marker_copy.add_to(markers_rating_40_44_layer)
-    elif row['Rating'] < 4.0 and row['Rating'] > 0:
-        marker_copy = folium.Marker(
-            location=[row['Lat'], row['Lng']],
-            popup=folium.Popup(popup_content, max_width=340),
-            tooltip=f"{row['Nama']} - Rating: {row['Rating']} - Reviews: {row['User_Ratings_Total']} - Harga: {price_label}",
-            icon=create_custom_icon(icon_color)
-        )
-        marker_copy.add_to(markers_rating_below_4_layer)
-    elif row['Rating'] == 0:
-        marker_copy = folium.Marker(
-            location=[row['Lat'], row['Lng']],
-            popup=folium.Popup(popup_content, max_width=340),
-            tooltip=f"{row['Nama']} - Rating: {row['Rating']} - Reviews: {row['User_Ratings_Total']} - Harga: {price_label}",
-            icon=create_custom_icon(icon_color)
-        )
-        marker_copy.add_to(markers_rating_0_layer)
-
-# Add all layers to map
-markers_all_layer.add_to(m)
-markers_rating_5_layer.add_to(m)
-markers_rating_45_49_layer.add_to(m)
-markers_rating_40_44_layer.add_to(m)
-markers_rating_below_4_layer.add_to(m)
-markers_rating_0_layer.add_to(m)
-
-# Add collapsible legend with close/open functionality
-legend_html = '''
-<div id="legend-container" style="position: fixed; 
-            top: 15px; right: 15px; z-index: 9999;">
+            # Add to specific rating layers
+            if row['Rating'] == 5.0:
+                marker_copy = folium.Marker(
+                    location=[row['Lat'], row['Lng']],
+                    popup=folium.Popup(popup_content, max_width=340),
+                    tooltip=f"{row['Nama']} - Rating: {row['Rating']} - Reviews: {row['User_Ratings_Total']} - Harga: {price_label}",
+                    icon=create_custom_icon(icon_color)
+                )
+                marker_copy.add_to(markers_rating_5_layer)
+            elif 4.5 <= row['Rating'] < 5.0:
+                marker_copy = folium.Marker(
+                    location=[row['Lat'], row['Lng']],
+                    popup=folium.Popup(popup_content, max_width=340),
+                    tooltip=f"{row['Nama']} - Rating: {row['Rating']} - Reviews: {row['User_Ratings_Total']} - Harga: {price_label}",
+                    icon=create_custom_icon(icon_color)
+                )
+                marker_copy.add_to(markers_rating_45_49_layer)
+            elif 4.0 <= row['Rating'] < 4.5:
+                marker_copy = folium.Marker(
+                    location=[row['Lat'], row['Lng']],
+                    popup=folium.Popup(popup_content, max_width=340),
+                    tooltip=f"{row['Nama']} - Rating: {row['Rating']} - Reviews: {row['User_Ratings_Total']} - Harga: {price_label}",
+                    icon=create_custom_icon(icon_color)
+                )
+                marker_copy.add_to(markers_rating_40_44_layer)
+            elif row['Rating'] < 4.0 and row['Rating'] > 0:
+                marker_copy = folium.Marker(
+                    location=[row['Lat'], row['Lng']],
+                    popup=folium.Popup(popup_content, max_width=340),
+                    tooltip=f"{row['Nama']} - Rating: {row['Rating']} - Reviews: {row['User_Ratings_Total']} - Harga: {price_label}",
+                    icon=create_custom_icon(icon_color)
+                )
+                marker_copy.add_to(markers_rating_below_4_layer)
+            elif row['Rating'] == 0:
+                marker_copy = folium.Marker(
+                    location=[row['Lat'], row['Lng']],
+                    popup=folium.Popup(popup_content, max_width=340),
+                    tooltip=f"{row['Nama']} - Rating: {row['Rating']} - Reviews: {row['User_Ratings_Total']} - Harga: {price_label}",
+                    icon=create_custom_icon(icon_color)
+                )
+                marker_copy.add_to(markers_rating_0_layer)
+
+    # Add all layers to map
+    markers_all_layer.add_to(m)
+    markers_rating_5_layer.add_to(m)
+    markers_rating_45_49_layer.add_to(m)
+    markers_rating_40_44_layer.add_to(m)
+    markers_rating_below_4_layer.add_to(m)
+    markers_rating_0_layer.add_to(m)
     
-    <!-- Collapsed state button -->
-    <div id="legend-collapsed" style="
-        width: 50px; height: 50px; 
-        background-color: white; border: 2px solid #333; 
-        border-radius: 6px; box-shadow: 0 3px 6px rgba(0,0,0,0.2);
-        display: none; cursor: pointer;
-        justify-content: center; align-items: center;
-        font-size: 20px; font-weight: bold; color: #333;">
-        📍
-    </div>
+    # Script marker bersama dirender setelah FeatureGroup-nya terdefinisi
+    if shared_markers is not None:
+        shared_markers.add_to(m)
+
+    # Bandwidth KDE terpilih per layer heatmap (ditampilkan di legenda)
+    kde_layers = [info for info in kde_layers if info is not None]
+    bandwidth_legend_html = '<div style="margin-top: 8px; font-size: 10px; color: #666;"><strong>Bandwidth KDE:</strong><br>'
+    for info in kde_layers:
+        bandwidth_legend_html += (f"{info['layer'].replace('Heatmap - ', '').replace('<', '&lt;')}: {info['bandwidth']:.3f} "
+                                  f"(~{info['kernel_meters']:.0f} m, {info['method']})<br>")
+    bandwidth_legend_html += '</div>'
+
+    # Add collapsible legend with close/open functionality
+    legend_html = '''
+    <div id="legend-container" style="position: fixed; 
+                top: 15px; right: 15px; z-index: 9999;">
     
-    <!-- Expanded legend -->
-    <div id="legend-expanded" style="
-        width: 220px; height: auto; 
-        background-color: white; border: 2px solid #333; 
-        font-size: 12px; padding: 12px;
-        border-radius: 6px; box-shadow: 0 3px 6px rgba(0,0,0,0.2);">
-        
-        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 8px;">
-            <h3 style="margin: 0; color: #333; font-size: 14px;">Legenda Warna Marker</h3>
-            <button id="close-legend" style="
-                background: none; border: none; font-size: 16px; 
-                cursor: pointer; color: #666; padding: 0;
-                width: 20px; height: 20px; display: flex;
-                justify-content: center; align-items: center;">
-                ✕
-            </button>
+        <!-- Collapsed state button -->
+        <div id="legend-collapsed" style="
+            width: 50px; height: 50px; 
+            background-color: white; border: 2px solid #333; 
+            border-radius: 6px; box-shadow: 0 3px 6px rgba(0,0,0,0.2);
+            display: none; cursor: pointer;
+            justify-content: center; align-items: center;
+            font-size: 20px; font-weight: bold; color: #333;">
+            📍
         </div>
+    
+        <!-- Expanded legend -->
+        <div id="legend-expanded" style="
+            width: 220px; height: auto; 
+            background-color: white; border: 2px solid #333; 
+            font-size: 12px; padding: 12px;
+            border-radius: 6px; box-shadow: 0 3px 6px rgba(0,0,0,0.2);">
+        
+            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 8px;">
+                <h3 style="margin: 0; color: #333; font-size: 14px;">Legenda Warna Marker</h3>
+                <button id="close-legend" style="
+                    background: none; border: none; font-size: 16px; 
+                    cursor: pointer; color: #666; padding: 0;
+                    width: 20px; height: 20px; display: flex;
+                    justify-content: center; align-items: center;">
+                    ✕
+                </button>
+            </div>
 
-        <div style="margin: 5px 0;">
-            <span style="color: red; font-size: 14px;">●</span> 
-            <strong>≥ 500 reviews</strong> - Sangat Populer
-        </div>
-        <div style="margin: 5px 0;">
-            <span style="color: orange; font-size: 14px;">●</span> 
-            <strong>100-499 reviews</strong> - Populer
-        </div>
-        <div style="margin: 5px 0;">
-            <span style="color: lightblue; font-size: 14px;">●</span> 
-            <strong>< 100 reviews</strong> - Kurang Populer
-        </div>
+            <div style="margin: 5px 0;">
+                <span style="color: red; font-size: 14px;">●</span> 
+                <strong>≥ 500 reviews</strong> - Sangat Populer
+            </div>
+            <div style="margin: 5px 0;">
+                <span style="color: orange; font-size: 14px;">●</span> 
+                <strong>100-499 reviews</strong> - Populer
+            </div>
+            <div style="margin: 5px 0;">
+                <span style="color: lightblue; font-size: 14px;">●</span> 
+                <strong>< 100 reviews</strong> - Kurang Populer
+            </div>
 
-        <hr style="margin: 10px 0; border: 1px solid #ddd;">
+            <hr style="margin: 10px 0; border: 1px solid #ddd;">
 
-        <div style="background: #f8f9fa; padding: 8px; border-radius: 4px;">
-            <p style="margin: 0; font-size: 10px; color: #666;">
-                <strong>Hotspot:</strong> Berdasarkan Algoritma KDE<br>
-                <strong>Basemap:</strong> Google Street Maps<br>
-                <strong>Filter:</strong> Per kategori rating
-            </p>
+            <div style="background: #f8f9fa; padding: 8px; border-radius: 4px;">
+                <p style="margin: 0; font-size: 10px; color: #666;">
+                    <strong>Hotspot:</strong> Berdasarkan Algoritma KDE<br>
+                    <strong>Basemap:</strong> Google Street Maps<br>
+                    <strong>Filter:</strong> Per kategori rating
+                </p>
+            </div>
+    ''' + bandwidth_legend_html + '''
         </div>
     </div>
-</div>
 
-<script>
-document.addEventListener('DOMContentLoaded', function() {
-    const legendCollapsed = document.getElementById('legend-collapsed');
-    const legendExpanded = document.getElementById('legend-expanded');
-    const closeButton = document.getElementById('close-legend');
+    <script>
+    document.addEventListener('DOMContentLoaded', function() {
+        const legendCollapsed = document.getElementById('legend-collapsed');
+        const legendExpanded = document.getElementById('legend-expanded');
+        const closeButton = document.getElementById('close-legend');
     
-    // Close legend function
-    closeButton.addEventListener('click', function() {
-        legendExpanded.style.display = 'none';
-        legendCollapsed.style.display = 'flex';
-    });
+        // Close legend function
+        closeButton.addEventListener('click', function() {
+            legendExpanded.style.display = 'none';
+            legendCollapsed.style.display = 'flex';
+        });
     
-    // Open legend function
-    legendCollapsed.addEventListener('click', function() {
-        legendCollapsed.style.display = 'none';
-        legendExpanded.style.display = 'block';
+        // Open legend function
+        legendCollapsed.addEventListener('click', function() {
+            legendCollapsed.style.display = 'none';
+            legendExpanded.style.display = 'block';
+        });
     });
-});
-</script>
-'''
-
-# Add legend and standard layer control
-m.get_root().html.add_child(folium.Element(legend_html))
-
-# Add layer control with improved settings
-folium.LayerControl(
-    collapsed=False,
-    position='topleft'
-).add_to(m)
-
-# Print enhanced statistics
-print("="*60)
-print("VISUALISASI HOTSPOT UMKM MAKASSAR - GOOGLE STREET MAPS")
-print("="*60)
-print(f"Total UMKM: {len(data)}")
-print(f"Rating 5.0: {len(rating_5_data)} UMKM")
-print(f"Rating 4.5-4.9: {len(rating_45_49_data)} UMKM") 
-print(f"Rating 4.0-4.4: {len(rating_40_44_data)} UMKM")
-print(f"Rating < 4.0: {len(rating_below_4_data)} UMKM")
-print(f"Rating 0: {len(rating_0_data)} UMKM")
-
-print(f"\nDistribusi Warna Marker (berdasarkan jumlah reviews):")
-merah = len(data[data['User_Ratings_Total'] >= 500])
-orange = len(data[(data['User_Ratings_Total'] >= 100) & (data['User_Ratings_Total'] < 500)])
-biru = len(data[data['User_Ratings_Total'] < 100])
-print(f"Merah (≥500 reviews): {merah} UMKM")
-print(f"Orange (100-499 reviews): {orange} UMKM")
-print(f"Biru (<100 reviews): {biru} UMKM")
-
-# Enhanced statistics - Price Level Distribution
-print(f"\nDistribusi Level Harga:")
-murah = len(data[data['Price_Level'] == 0])
-terjangkau = len(data[data['Price_Level'] == 1])
-sedang = len(data[data['Price_Level'] == 2])
-mahal = len(data[data['Price_Level'] == 3])
-print(f"Murah: {murah} UMKM ({murah/len(data)*100:.1f}%)")
-print(f"Terjangkau: {terjangkau} UMKM ({terjangkau/len(data)*100:.1f}%)")
-print(f"Sedang: {sedang} UMKM ({sedang/len(data)*100:.1f}%)")
-print(f"Mahal: {mahal} UMKM ({mahal/len(data)*100:.1f}%)")
-
-# Save the map
-output_file = "hotspot_umkm_makassar_final.html"
-m.save(output_file)
-
-print(f"\nPeta berhasil disimpan sebagai '{output_file}'")
\ No newline at end of file
+    </script>
+    '''
+
+    # Add legend and standard layer control
+    m.get_root().html.add_child(folium.Element(legend_html))
+
+    # Add layer control with improved settings
+    folium.LayerControl(
+        collapsed=False,
+        position='topleft'
+    ).add_to(m)
+
+    # Print enhanced statistics
+    print("="*60)
+    print("VISUALISASI HOTSPOT UMKM MAKASSAR - GOOGLE STREET MAPS")
+    print("="*60)
+    print(f"Total UMKM: {len(data)}")
+    print(f"Rating 5.0: {len(rating_5_data)} UMKM")
+    print(f"Rating 4.5-4.9: {len(rating_45_49_data)} UMKM") 
+    print(f"Rating 4.0-4.4: {len(rating_40_44_data)} UMKM")
+    print(f"Rating < 4.0: {len(rating_below_4_data)} UMKM")
+    print(f"Rating 0: {len(rating_0_data)} UMKM")
+
+    print(f"\nBandwidth KDE per layer (cache: {kde_cache.hits} hit, {kde_cache.misses} dihitung):")
+    for info in kde_layers:
+        print(f"{info['layer']}: {info['bandwidth']:.4f} (~{info['kernel_meters']:.0f} m, "
+              f"{info['method']}, {info['n_points']} titik, {info['heat_points']} "
+              f"{'tile' if HEATMAP_RENDER_MODE == 'tiles' else 'titik heatmap'})")
+
+    print(f"\nDistribusi Warna Marker (berdasarkan jumlah reviews):")
+    merah = len(data[data['User_Ratings_Total'] >= 500])
+    orange = len(data[(data['User_Ratings_Total'] >= 100) & (data['User_Ratings_Total'] < 500)])
+    biru = len(data[data['User_Ratings_Total'] < 100])
+    print(f"Merah (≥500 reviews): {merah} UMKM")
+    print(f"Orange (100-499 reviews): {orange} UMKM")
+    print(f"Biru (<100 reviews): {biru} UMKM")
+
+    # Enhanced statistics - Price Level Distribution
+    print(f"\nDistribusi Level Harga:")
+    murah = len(data[data['Price_Level'] == 0])
+    terjangkau = len(data[data['Price_Level'] == 1])
+    sedang = len(data[data['Price_Level'] == 2])
+    mahal = len(data[data['Price_Level'] == 3])
+    print(f"Murah: {murah} UMKM ({murah/len(data)*100:.1f}%)")
+    print(f"Terjangkau: {terjangkau} UMKM ({terjangkau/len(data)*100:.1f}%)")
+    print(f"Sedang: {sedang} UMKM ({sedang/len(data)*100:.1f}%)")
+    print(f"Mahal: {mahal} UMKM ({mahal/len(data)*100:.1f}%)")
+
+    # Save the map
+    output_file = "hotspot_umkm_makassar_final.html"
+    m.save(output_file)
+
+    print(f"\nPeta berhasil disimpan sebagai '{output_file}'")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,99 @@
+import json
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+from async_geocoder import benchmark_geocoder, geocode_points
+
+def classify_echo(data):
+    return True, f"{data['lat']},{data['lon']}"
+
+def nominatim_stub(log, throttle_once=(), retry_after='1'):
+    """
+    Stub /reverse yang mengembalikan koordinat request; lat di throttle_once
+    dibalas 429 + Retry-After pada request pertamanya
+    """
+    lock = threading.Lock()
+    throttled = set()
+
+    def handler(method, path, body):
+        query = parse_qs(urlparse(path).query)
+        lat, lng = query['lat'][0], query['lon'][0]
+        with lock:
+            log.append((time.monotonic(), lat))
+            if lat in throttle_once and lat not in throttled:
+                throttled.add(lat)
+                return 429, {'Retry-After': retry_after}, b''
+        return 200, {'Content-Type': 'application/json'}, json.dumps({'lat': lat, 'lon': lng}).encode()
+
+    return handler
+
+def make_points(n_points):
+    return [(f"row{i}", -5.1 - i * 0.001, 119.4 + i * 0.001) for i in range(n_points)]
+
+def test_results_match_their_points(stub_server):
+    log = []
+    base_url = stub_server(nominatim_stub(log)) + '/reverse'
+    points = make_points(60)
+    seen = []
+
+    results = geocode_points(points, classify_echo, on_result=lambda key, *result: seen.append(key),
+                             base_url=base_url, concurrency=8, rate_per_second=1000.0)
+
+    # Hasil selesai tidak berurutan, tapi setiap key harus memegang hasil titiknya sendiri
+    assert sorted(seen) == sorted(key for key, _, _ in points)
+    for key, lat, lng in points:
+        assert results[key] == (True, f"{lat},{lng}")
+
+def test_global_rate_limit(stub_server):
+    log = []
+    base_url = stub_server(nominatim_stub(log)) + '/reverse'
+    rate = 20.0
+
+    start = time.monotonic()
+    results = geocode_points(make_points(40), classify_echo, base_url=base_url,
+                             concurrency=16, rate_per_second=rate)
+    elapsed = time.monotonic() - start
+
+    assert all(is_makassar for is_makassar, _ in results.values())
+    # Token bucket: burst sebesar rate, sisanya dibatasi rate per detik
+    assert elapsed >= (40 - rate) / rate * 0.9
+    # Dalam 0.5 detik pertama paling banyak burst + isi ulang 0.5 detik
+    first = log[0][0]
+    assert sum(1 for timestamp, _ in log if timestamp - first < 0.5) <= rate + rate * 0.5 + 1
+
+def test_retry_after_on_429(stub_server):
+    log = []
+    points = make_points(5)
+    throttled_lat = str(points[2][1])
+    base_url = stub_server(nominatim_stub(log, throttle_once={throttled_lat})) + '/reverse'
+
+    results = geocode_points(points, classify_echo, base_url=base_url,
+                             concurrency=4, rate_per_second=1000.0)
+
+    attempts = [timestamp for timestamp, lat in log if lat == throttled_lat]
+    assert len(attempts) == 2
+    assert attempts[1] - attempts[0] >= 0.95
+    assert results[points[2][0]] == (True, f"{points[2][1]},{points[2][2]}")
+
+def test_failed_point_after_all_retries(stub_server):
+    def always_unavailable(method, path, body):
+        return 503, {'Retry-After': '0'}, b''
+
+    base_url = stub_server(always_unavailable) + '/reverse'
+
+    start = time.monotonic()
+    results = geocode_points(make_points(1), classify_echo, base_url=base_url,
+                             concurrency=1, rate_per_second=1000.0, max_retries=2)
+
+    assert results == {'row0': (None, "Geocoding failed")}
+    # Tidak ada backoff setelah percobaan terakhir
+    assert time.monotonic() - start < 1.0
+
+def test_benchmark_against_stub(stub_server):
+    log = []
+    base_url = stub_server(nominatim_stub(log)) + '/reverse'
+
+    throughput = benchmark_geocoder(base_url, n_points=50, concurrency=8, rate_per_second=1000.0)
+
+    assert throughput > 0
+    assert len(log) == 50
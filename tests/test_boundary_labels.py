@@ -0,0 +1,15 @@
+from cleaning_data_new import (build_boundary_engine, create_gowa_boundary, create_makassar_boundary,
+                               create_maros_boundary, label_points)
+
+def test_neighbour_polygons_do_not_claim_makassar():
+    makassar = create_makassar_boundary()
+    assert not makassar.intersects(create_gowa_boundary())
+    assert not makassar.intersects(create_maros_boundary())
+    assert not create_gowa_boundary().overlaps(create_maros_boundary())
+
+def test_label_points():
+    # Biringkanaya (Makassar, di luar polygon Makassar yang kasar), pusat kota, Gowa, Maros
+    lats = [-5.10, -5.09, -5.15, -5.30, -5.06]
+    lngs = [119.52, 119.50, 119.42, 119.50, 119.60]
+    labels = label_points(build_boundary_engine(), lats, lngs)
+    assert list(labels) == [None, None, 'Makassar', 'Gowa', 'Maros']
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from kde_engine import (adaptive_kde_points, compare_with_exact, compute_kde_layer, kde_covariance,
+                        make_grid, select_bandwidth)
+
+def makassar_sample(n_points=2000, seed=42):
+    """
+    Sampel sintetis berkelompok di sekitar Makassar (tiga pusat keramaian)
+    """
+    rng = np.random.default_rng(seed)
+    centers = np.array([[-5.14, 119.42], [-5.17, 119.44], [-5.10, 119.49]])
+    sizes = [n_points // 2, n_points * 3 // 10, n_points - n_points // 2 - n_points * 3 // 10]
+    return np.vstack([rng.normal(center, [0.01, 0.012], (size, 2)) for center, size in zip(centers, sizes)])
+
+@pytest.mark.parametrize('bandwidth', ['scott', 'lscv', 0.1, 0.3])
+def test_binned_kde_matches_exact_scipy(bandwidth):
+    coordinates = makassar_sample()
+    bandwidth, _ = select_bandwidth(coordinates, bandwidth)
+
+    max_error, mean_error = compare_with_exact(coordinates, bandwidth)
+
+    # Error relatif terhadap densitas maksimum gaussian_kde
+    assert max_error < 0.02
+    assert mean_error < 0.001
+
+def test_kernel_narrower_than_grid_step_stays_accurate():
+    # Bandwidth kecil di grid kasar memaksa binning di grid internal yang lebih rapat
+    max_error, mean_error = compare_with_exact(makassar_sample(), 0.05, grid_size=40)
+
+    assert max_error < 0.02
+    assert mean_error < 0.001
+
+@pytest.mark.parametrize('coordinates', [
+    [[-5.14, 119.42]] * 5,                                   # identik
+    [[-5.14, 119.42 + i * 0.01] for i in range(5)],          # satu garis lintang
+    [[-5.14 + i * 0.01, 119.42 + i * 0.01] for i in range(5)],  # segaris miring
+    [[-5.14, 119.42], [-5.15, 119.43]],                      # kurang dari 3 titik
+])
+def test_degenerate_layer_is_skipped(coordinates):
+    assert compute_kde_layer(np.array(coordinates)) is None
+
+def test_layer_weights_are_normalized():
+    kde = compute_kde_layer(makassar_sample(500), bandwidth='scott', grid_size=40)
+
+    assert kde['weights'].min() == 0.0
+    assert kde['weights'].max() == 1.0
+    assert len(kde['lats']) == len(kde['lngs']) == len(kde['weights']) == 40 * 40
+
+def test_adaptive_weights_use_grid_normalization():
+    # Bandwidth lebar: densitas minimum di grid jauh di atas nol
+    coordinates = makassar_sample(500)
+    bandwidth, _ = select_bandwidth(coordinates, 1.0)
+    lat_values, lng_values = make_grid(coordinates, 40, 0.15)
+
+    _, _, weights = adaptive_kde_points(
+        coordinates, kde_covariance(coordinates, bandwidth),
+        (lat_values[0], lat_values[-1]), (lng_values[0], lng_values[-1]), density_threshold=0.0)
+
+    assert weights.min() == 0.0
+    assert weights.max() == 1.0
@@ -0,0 +1,26 @@
+from megi4 import commit_osm_delta, compute_osm_delta, open_snapshot_store
+
+def element(element_type, element_id, name, version=1):
+    coords = ({'lat': -5.15, 'lon': 119.45} if element_type == 'node'
+              else {'center': {'lat': -5.16, 'lon': 119.43}})
+    return {'type': element_type, 'id': element_id, 'version': version,
+            'timestamp': f'2026-01-0{version}T00:00:00Z',
+            'tags': {'name': name, 'amenity': 'restaurant'}, **coords}
+
+def test_node_and_way_with_same_id_are_separate(tmp_path):
+    conn = open_snapshot_store(str(tmp_path / 'snapshot.sqlite'))
+    elements = [element('node', 7, 'Warung Tujuh'), element('way', 7, 'Rumah Makan Tujuh')]
+
+    delta = compute_osm_delta(elements, conn)
+    assert sorted(row['OSM_Key'] for row in delta['added']) == ['node/7', 'way/7']
+    commit_osm_delta(conn, delta)
+
+    # Data tidak berubah: delta kosong
+    delta = compute_osm_delta(elements, conn)
+    assert delta['added'] == delta['changed'] == delta['deleted'] == []
+
+    # Way berubah versi, node hilang
+    delta = compute_osm_delta([element('way', 7, 'Rumah Makan Tujuh', version=2)], conn)
+    assert [row['OSM_Key'] for row in delta['changed']] == ['way/7']
+    assert [row['OSM_Key'] for row in delta['deleted']] == ['node/7']
+    conn.close()
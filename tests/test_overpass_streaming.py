@@ -0,0 +1,52 @@
+import json
+import os
+from megi4 import query_osm_streaming, stream_osm_to_csv
+
+ELEMENTS = [{'type': 'node', 'id': element_id, 'lat': -5.15, 'lon': 119.42 + element_id / 1000,
+             'tags': {'name': f'Warung {element_id}', 'amenity': 'restaurant'}}
+            for element_id in range(1, 6)]
+
+def overpass_body(remark=None):
+    payload = {'version': 0.6, 'elements': ELEMENTS}
+    if remark:
+        payload['remark'] = remark
+    return json.dumps(payload).encode()
+
+def stream_to(tmp_path, base_url):
+    filename = tmp_path / 'kuliner.csv'
+    columnar_file = tmp_path / 'kuliner.parquet'
+    stats = stream_osm_to_csv(query_osm_streaming(overpass_url=base_url), str(filename),
+                              chunk_size=2, columnar_file=str(columnar_file))
+    return stats, filename, columnar_file
+
+def test_clean_stream_replaces_output(tmp_path, stub_server):
+    base_url = stub_server(lambda method, path, body: (200, {}, overpass_body()))
+    stats, filename, columnar_file = stream_to(tmp_path, base_url)
+
+    assert stats['total'] == len(ELEMENTS)
+    assert len(filename.read_text(encoding='utf-8').splitlines()) == len(ELEMENTS) + 1
+    assert columnar_file.exists()
+    assert sorted(os.listdir(tmp_path)) == ['kuliner.csv', 'kuliner.parquet']
+
+def test_remark_error_keeps_previous_output(tmp_path, stub_server, capsys):
+    remark = 'runtime error: Query timed out in "query" at line 3 after 61 seconds.'
+    base_url = stub_server(lambda method, path, body: (200, {}, overpass_body(remark)))
+    (tmp_path / 'kuliner.csv').write_text('output lama', encoding='utf-8')
+
+    stats, filename, columnar_file = stream_to(tmp_path, base_url)
+
+    assert stats is None
+    assert filename.read_text(encoding='utf-8') == 'output lama'
+    assert not columnar_file.exists()
+    assert os.listdir(tmp_path) == ['kuliner.csv']
+    output = capsys.readouterr().out
+    assert 'Error mengambil data dari OSM' in output
+    assert 'Error menyimpan file' not in output
+
+def test_truncated_response_is_upstream_error(tmp_path, stub_server, capsys):
+    base_url = stub_server(lambda method, path, body: (200, {}, overpass_body()[:-40]))
+    stats, filename, _ = stream_to(tmp_path, base_url)
+
+    assert stats is None
+    assert not filename.exists()
+    assert 'Error mengambil data dari OSM' in capsys.readouterr().out
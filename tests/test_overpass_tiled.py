@@ -0,0 +1,103 @@
+import glob
+import json
+import os
+import re
+import threading
+from megi4 import query_osm_makassar_tiled, split_bbox
+
+BBOX = (-5.20, 119.40, -5.10, 119.50)
+
+def node(element_id, lat, lon, name):
+    return {'type': 'node', 'id': element_id, 'lat': lat, 'lon': lon,
+            'tags': {'name': name, 'amenity': 'restaurant'}}
+
+# Node 1 ada di perbatasan dua tile; way 1 punya id numerik sama dengan node 1
+CANNED_TILES = {
+    'r0_c0': [node(1, -5.15, 119.45, 'Warung Perbatasan'), node(2, -5.15, 119.42, 'Warung Barat'),
+              {'type': 'way', 'id': 1, 'center': {'lat': -5.16, 'lon': 119.43},
+               'tags': {'name': 'Toko Roti', 'shop': 'bakery'}}],
+    'r0_c1': [node(1, -5.15, 119.45, 'Warung Perbatasan'), node(3, -5.15, 119.48, 'Warung Timur')],
+}
+
+def overpass_stub(requested, failing=()):
+    """
+    Stub Overpass: tile dikenali dari bbox di query, dijawab dengan CANNED_TILES;
+    tile di `failing` dibalas 400
+    """
+    tile_by_bbox = {','.join(f"{value:.6f}" for value in tile_bbox): tile_id
+                    for tile_id, tile_bbox in split_bbox(BBOX, 1, 2)}
+    lock = threading.Lock()
+
+    def handler(method, path, body):
+        tile_id = tile_by_bbox[re.search(r'\(([-\d.,]+)\)', body.decode()).group(1)]
+        with lock:
+            requested.append(tile_id)
+        if tile_id in failing:
+            return 400, {}, b'{"remark": "bad request"}'
+        return 200, {'Content-Type': 'application/json'}, json.dumps({'elements': CANNED_TILES[tile_id]}).encode()
+
+    return handler
+
+def fetch(base_url, checkpoint_dir, allow_partial=False, **kwargs):
+    return query_osm_makassar_tiled(bbox=BBOX, tile_rows=1, tile_cols=2, max_workers=2,
+                                    checkpoint_dir=checkpoint_dir, overpass_url=base_url + '/api/interpreter',
+                                    allow_partial=allow_partial, **kwargs)
+
+def checkpoint_files(checkpoint_dir, tile_id='*'):
+    return glob.glob(os.path.join(checkpoint_dir, f"tile_{tile_id}_*.json"))
+
+def element_keys(elements):
+    return sorted((element['type'], element['id']) for element in elements)
+
+def test_tiles_are_deduplicated_by_type_and_id(stub_server, tmp_path):
+    requested = []
+    elements = fetch(stub_server(overpass_stub(requested)), str(tmp_path))
+
+    assert sorted(requested) == ['r0_c0', 'r0_c1']
+    assert element_keys(elements) == [('node', 1), ('node', 2), ('node', 3), ('way', 1)]
+
+def test_checkpoints_kept_only_for_failed_run(stub_server, tmp_path):
+    fetch(stub_server(overpass_stub([], failing={'r0_c1'})), str(tmp_path))
+
+    # Run gagal: tile yang selesai tersimpan utuh untuk resume
+    checkpoints = checkpoint_files(tmp_path, 'r0_c0')
+    assert len(checkpoints) == 1
+    with open(checkpoints[0], encoding='utf-8') as f:
+        assert json.load(f)['elements'] == CANNED_TILES['r0_c0']
+    assert not checkpoint_files(tmp_path, 'r0_c1')
+    assert not glob.glob(os.path.join(tmp_path, '*.tmp'))
+
+    # Run berhasil: semua checkpoint dihapus
+    fetch(stub_server(overpass_stub([])), str(tmp_path))
+    assert not checkpoint_files(tmp_path)
+
+def test_rerun_only_refetches_failed_tiles(stub_server, tmp_path):
+    requested = []
+    assert fetch(stub_server(overpass_stub(requested, failing={'r0_c1'})), str(tmp_path)) == []
+    assert sorted(requested) == ['r0_c0', 'r0_c1']
+
+    # Rerun: tile yang sudah selesai diambil dari checkpoint
+    requested.clear()
+    elements = fetch(stub_server(overpass_stub(requested)), str(tmp_path))
+    assert requested == ['r0_c1']
+    assert element_keys(elements) == [('node', 1), ('node', 2), ('node', 3), ('way', 1)]
+
+    # Run berikutnya setelah sukses mengambil data baru, bukan data checkpoint lama
+    requested.clear()
+    assert element_keys(fetch(stub_server(overpass_stub(requested)), str(tmp_path))) == element_keys(elements)
+    assert sorted(requested) == ['r0_c0', 'r0_c1']
+
+def test_stale_checkpoint_is_refetched(stub_server, tmp_path):
+    fetch(stub_server(overpass_stub([], failing={'r0_c1'})), str(tmp_path))
+    old = os.path.getmtime(checkpoint_files(tmp_path, 'r0_c0')[0]) - 3600
+    os.utime(checkpoint_files(tmp_path, 'r0_c0')[0], (old, old))
+
+    requested = []
+    fetch(stub_server(overpass_stub(requested)), str(tmp_path), checkpoint_max_age=600)
+
+    assert sorted(requested) == ['r0_c0', 'r0_c1']
+
+def test_partial_result_when_allowed(stub_server, tmp_path):
+    elements = fetch(stub_server(overpass_stub([], failing={'r0_c1'})), str(tmp_path), allow_partial=True)
+
+    assert element_keys(elements) == [('node', 1), ('node', 2), ('way', 1)]
@@ -0,0 +1,26 @@
+import json
+import cleaning_data_new
+from cleaning_data_new import reverse_geocode_check
+
+MAKASSAR_ADDRESS = {'address': {'city': 'Makassar', 'state': 'Sulawesi Selatan'}}
+
+def test_empty_response_is_retried(stub_server, monkeypatch):
+    monkeypatch.setattr(cleaning_data_new, 'backoff_delay', lambda *args, **kwargs: 0)
+    responses = [{}, {'error': 'Unable to geocode'}, MAKASSAR_ADDRESS]
+    base_url = stub_server(lambda method, path, body: (200, {}, json.dumps(responses.pop(0)).encode()))
+
+    assert reverse_geocode_check(-5.14, 119.42, base_url=base_url + '/reverse') == (True, "Kota Makassar")
+    assert responses == []
+
+def test_gives_up_after_max_retries(stub_server, monkeypatch):
+    monkeypatch.setattr(cleaning_data_new, 'backoff_delay', lambda *args, **kwargs: 0)
+    requests_seen = []
+
+    def handler(method, path, body):
+        requests_seen.append(path)
+        return 200, {}, b'{}'
+
+    base_url = stub_server(handler)
+    assert reverse_geocode_check(-5.14, 119.42, max_retries=3,
+                                 base_url=base_url + '/reverse') == (None, "Geocoding failed")
+    assert len(requests_seen) == 3